@@ -1,76 +1,154 @@
 from flask import Flask, request, jsonify
 import logging
 
+from src.business_logic.sync import (
+    DEFAULT_BATCH_SIZE,
+    MAX_BATCH_SIZE,
+    MAX_STREAM_ITEMS,
+    NdjsonBatcher,
+    SyncError,
+    iter_ndjson_lines,
+    ndjson_response,
+    sync_error_response,
+    sync_json_bytes,
+)
+from src.business_logic.sync_index import get_sync_index
+from src.business_logic.sync_jobs import (
+    MAX_SPOOL_BYTES,
+    RETRY_AFTER_SECONDS,
+    SyncBodyTooLargeError,
+    SyncQueueFullError,
+    accepted_response,
+    body_too_large,
+    copy_body,
+    get_sync_job_queue,
+    json_job,
+    ndjson_job,
+    spool_body,
+    wants_async,
+)
+from src.metrics import instrument_flask
+
 app = Flask(__name__)
+instrument_flask(app, 'sync')
+app.config.setdefault('SYNC_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+app.config.setdefault('SYNC_STREAM_MAX_ITEMS', MAX_STREAM_ITEMS)
+# Content-hash index für Delta-Sync, None = gemeinsamer Index in data/sync_index.db
+app.config.setdefault('SYNC_INDEX', None)
+# Worker-Pool für asynchrone Syncs (Prefer: respond-async), None = gemeinsame Queue
+app.config.setdefault('SYNC_JOB_QUEUE', None)
+# Größere asynchrone Uploads werden mit 413 abgelehnt
+app.config.setdefault('SYNC_JOB_MAX_BODY_BYTES', MAX_SPOOL_BYTES)
 logging.basicConfig(level=logging.INFO)
 
+def _sync_index():
+    index = app.config['SYNC_INDEX']
+    return get_sync_index() if index is None else index
+
+def _sync_job_queue():
+    queue = app.config['SYNC_JOB_QUEUE']
+    return get_sync_job_queue() if queue is None else queue
+
+def _queue_full(error):
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+    return response, 503
+
+def _enqueue(kind, work, cleanup=None, reserved=False):
+    """
+    Asynchroner Modus: Job einreihen und sofort mit 202 antworten,
+    bei voller Queue 503 mit Retry-After
+    """
+    try:
+        job = _sync_job_queue().submit(kind, work, cleanup, reserved)
+    except SyncQueueFullError as e:
+        return _queue_full(e)
+    status_url = f'/api/sync/{job.id}'
+    response = jsonify(accepted_response(job, status_url))
+    response.headers['Location'] = status_url
+    return response, 202
+
+def _sync_ndjson(run_async=False):
+    """
+    Streaming-Modus: ein Datensatz pro Zeile (application/x-ndjson),
+    Verarbeitung in Batches mit begrenztem Speicher
+    """
+    batch_size = request.args.get('batch_size', app.config['SYNC_BATCH_SIZE'], type=int)
+    if batch_size is None or not 1 <= batch_size <= MAX_BATCH_SIZE:
+        return jsonify({
+            'error': f'batch_size must be between 1 and {MAX_BATCH_SIZE}'
+        }), 400
+    
+    if run_async:
+        max_bytes = app.config['SYNC_JOB_MAX_BODY_BYTES']
+        if (request.content_length or 0) > max_bytes:
+            return jsonify({'error': str(body_too_large(max_bytes))}), 413
+        # Platz in der Queue vor dem Lesen reservieren, dann den Body puffern;
+        # der Job läuft nach Ende des Requests
+        index, queue = _sync_index(), _sync_job_queue()
+        try:
+            queue.reserve()
+        except SyncQueueFullError as e:
+            return _queue_full(e)
+        body = spool_body()
+        try:
+            copy_body(request.stream, body, max_bytes)
+        except SyncBodyTooLargeError as e:
+            body.close()
+            queue.release()
+            return jsonify({'error': str(e)}), 413
+        except BaseException:
+            body.close()
+            queue.release()
+            raise
+        work = ndjson_job(body, index, batch_size, app.config['SYNC_STREAM_MAX_ITEMS'])
+        return _enqueue('ndjson', work, body.close, reserved=True)
+    
+    batcher = NdjsonBatcher(batch_size, app.config['SYNC_STREAM_MAX_ITEMS'], index=_sync_index())
+    try:
+        for line in iter_ndjson_lines(request.stream.readline):
+            batcher.add_line(line)
+        synced_count, batches = batcher.finish()
+    except SyncError as e:
+        return jsonify(sync_error_response(e)), 400
+    
+    return jsonify(ndjson_response(synced_count, batches, batcher.counts)), 200
+
 @app.route('/api/sync', methods=['POST'])
 def sync_data():
     """
     Synchronisiert lokale Daten mit Cloud
     """
     try:
+        run_async = wants_async(request.headers.get('Prefer'), request.args.get('mode'))
+        
+        # Streaming upload
+        if request.mimetype == 'application/x-ndjson':
+            return _sync_ndjson(run_async)
+        
         # Input validation
         if not request.is_json:
             return jsonify({
                 'error': 'Content-Type must be application/json'
             }), 400
         
-        data = request.get_json()
-        
-        if data is None:
-            return jsonify({
-                'error': 'Invalid JSON payload'
-            }), 400
-        
-        # Validate required fields
-        if 'data' not in data:
-            return jsonify({
-                'error': 'Missing required field: data'
-            }), 400
-        
-        if not isinstance(data['data'], list):
-            return jsonify({
-                'error': 'Field "data" must be an array'
-            }), 400
-        
-        # Edge case: empty data array
-        if len(data['data']) == 0:
-            return jsonify({
-                'message': 'No data to sync',
-                'synced_count': 0,
-                'status': 'success'
-            }), 200
-        
-        # Edge case: data array too large
-        if len(data['data']) > 1000:
-            return jsonify({
-                'error': 'Data array too large. Maximum 1000 items allowed'
-            }), 400
-        
-        # Validate each data item
-        for i, item in enumerate(data['data']):
-            if not isinstance(item, dict):
-                return jsonify({
-                    'error': f'Data item at index {i} must be an object'
-                }), 400
-            
-            if 'id' not in item:
-                return jsonify({
-                    'error': f'Data item at index {i} missing required field: id'
-                }), 400
-        
-        # Simulate sync process
-        synced_count = len(data['data'])
+        if run_async:
+            index, queue = _sync_index(), _sync_job_queue()
+            try:
+                queue.reserve()
+            except SyncQueueFullError as e:
+                return _queue_full(e)
+            try:
+                raw = request.get_data()
+            except BaseException:
+                queue.release()
+                raise
+            return _enqueue('json', json_job(raw, index), reserved=True)
         
-        # Log sync operation
-        logging.info(f"Synced {synced_count} items to cloud")
+        raw = request.get_data()
         
-        return jsonify({
-            'message': 'Data synchronized successfully',
-            'synced_count': synced_count,
-            'status': 'success'
-        }), 200
+        body, status = sync_json_bytes(raw, _sync_index())
+        return jsonify(body), status
         
     except ValueError as e:
         # Handle JSON parsing errors
@@ -85,5 +163,17 @@ def sync_data():
             'error': 'Internal server error during sync'
         }), 500
 
+@app.route('/api/sync/<job_id>', methods=['GET'])
+def sync_job_status(job_id):
+    """
+    Status, Fortschritt und Ergebnis eines asynchronen Syncs
+    """
+    status = _sync_job_queue().status(job_id)
+    if status is None:
+        return jsonify({
+            'error': 'Sync job not found'
+        }), 404
+    return jsonify(status), 200
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,5 @@
+"""
+Micro-benchmarks for the hot paths of Pizza Calculator.
+
+Run from the repository root, e.g. ``python -m benchmarks.bench_domain_allowlist``.
+"""
@@ -0,0 +1,93 @@
+"""
+Benchmark: precompiled domain allowlist vs. the former linear scan.
+
+    python -m benchmarks.bench_domain_allowlist [--domains 5000]
+"""
+
+import argparse
+import timeit
+from typing import Dict, List
+
+from src.business_logic.widget_embed import WidgetEmbedService
+from src.models.widget import Widget
+from src.repositories.widget_repository import WidgetRepository
+
+
+def linear_is_allowed(allowed_domains: List[str], domain: str) -> bool:
+    """Former WidgetEmbedService._is_domain_allowed, kept as the baseline."""
+    normalized_domain = domain.lower()
+    if '://' in normalized_domain:
+        normalized_domain = normalized_domain.split('://', 1)[1]
+    if ':' in normalized_domain:
+        normalized_domain = normalized_domain.split(':', 1)[0]
+    for allowed_domain in allowed_domains:
+        allowed_normalized = allowed_domain.lower()
+        if normalized_domain == allowed_normalized:
+            return True
+        if allowed_normalized.startswith('*.'):
+            wildcard_domain = allowed_normalized[2:]
+            if normalized_domain.endswith('.' + wildcard_domain) or normalized_domain == wildcard_domain:
+                return True
+    return False
+
+
+def make_allowlist(size: int) -> List[str]:
+    """Half exact domains, half wildcards."""
+    return [
+        f'*.partner{i}.example.com' if i % 2 else f'Shop{i}.Example.org'
+        for i in range(size)
+    ]
+
+
+QUERIES = {
+    'exact_last': lambda size: f'https://shop{size - 2}.example.org',
+    'wildcard_last': lambda size: f'www.eu.partner{size - 1}.example.com:443',
+    'miss': lambda size: 'unknown.example.net'
+}
+
+
+def run(size: int = 5000, number: int = 200, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """
+    Time both implementations for every query.
+
+    Returns:
+        query -> {'linear_us': ..., 'matcher_us': ..., 'speedup': ...}
+        with the best per-call time in microseconds
+    """
+    repository = WidgetRepository()
+    service = WidgetEmbedService(repository)
+    widget = repository.save(Widget(id=None, key='bench', name='Bench', allowed_domains=make_allowlist(size)))
+
+    results = {}
+    for name, make_query in QUERIES.items():
+        domain = make_query(size)
+        expected = linear_is_allowed(widget.allowed_domains, domain)
+        assert service._is_domain_allowed(widget, domain) == expected
+
+        linear = min(timeit.repeat(
+            lambda: linear_is_allowed(widget.allowed_domains, domain), number=number, repeat=repeat
+        )) / number
+        matcher = min(timeit.repeat(
+            lambda: service._is_domain_allowed(widget, domain), number=number, repeat=repeat
+        )) / number
+        results[name] = {
+            'linear_us': linear * 1e6,
+            'matcher_us': matcher * 1e6,
+            'speedup': linear / matcher
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--domains', type=int, default=5000, help='size of the allowlist')
+    args = parser.parse_args()
+
+    print(f"Allowlist with {args.domains} entries")
+    for name, result in run(args.domains).items():
+        print(f"{name:>14}: linear {result['linear_us']:9.2f} us   "
+              f"matcher {result['matcher_us']:6.2f} us   x{result['speedup']:.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: validation of /api/sync JSON payloads.
+
+    python -m benchmarks.bench_sync_payload [--items 1000 10000 100000]
+
+Compares the former per-item loop, a compiled pydantic TypeAdapter
+(validate_json on the raw bytes) and parse_json_payload().
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any, Dict, List, Optional
+
+from src.business_logic.sync import parse_json_payload
+
+
+def loop_validate(raw: bytes) -> List[Any]:
+    """Former path: json.loads() and one validate_item() call per item, kept as the baseline."""
+    items = json.loads(raw)['data']
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f'Data item at index {i} must be an object')
+        if 'id' not in item:
+            raise ValueError(f'Data item at index {i} missing required field: id')
+    return items
+
+
+def make_adapter(max_items: int):
+    """TypeAdapter for {"data": [{"id": ...}, ...]} that keeps extra fields."""
+    from pydantic import ConfigDict, Field, TypeAdapter
+    from typing_extensions import Annotated, TypedDict
+
+    class SyncItem(TypedDict):
+        __pydantic_config__ = ConfigDict(extra='allow')
+        id: Any
+
+    class SyncPayload(TypedDict):
+        __pydantic_config__ = ConfigDict(extra='allow')
+        data: Annotated[List[SyncItem], Field(max_length=max_items)]
+
+    return TypeAdapter(Optional[SyncPayload])
+
+
+def make_payload(count: int) -> bytes:
+    items = [{'id': i, 'name': f'Item {i}', 'value': i * 0.5} for i in range(count)]
+    return json.dumps({'data': items}).encode('utf-8')
+
+
+def run(sizes: List[int], repeat: int = 5) -> Dict[int, Dict[str, float]]:
+    """
+    Time all three variants per payload size.
+
+    Returns:
+        size -> {'loop_ms': ..., 'pydantic_ms': ..., 'parse_ms': ...}
+        with the best per-call time in milliseconds
+    """
+    results = {}
+    for size in sizes:
+        raw = make_payload(size)
+        adapter = make_adapter(size)
+        assert adapter.validate_json(raw)['data'] == loop_validate(raw) == parse_json_payload(raw, size)
+
+        number = max(1, 10000 // size)
+        timings = {}
+        for name, func in (('loop', lambda: loop_validate(raw)),
+                           ('pydantic', lambda: adapter.validate_json(raw)),
+                           ('parse', lambda: parse_json_payload(raw, size))):
+            timings[f'{name}_ms'] = min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e3
+        results[size] = timings
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, nargs='+', default=[1000, 10000, 100000], help='payload sizes')
+    args = parser.parse_args()
+
+    for size, result in run(args.items).items():
+        print(f"{size:>7} items: loop {result['loop_ms']:8.2f} ms   "
+              f"pydantic {result['pydantic_ms']:8.2f} ms   parse_json_payload {result['parse_ms']:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
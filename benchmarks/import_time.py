@@ -0,0 +1,135 @@
+"""
+Startup profiler: cold import time of the entry points.
+
+    python -m benchmarks.import_time                 # all entry points, top 15 modules each
+    python -m benchmarks.import_time src.main --top 30
+    python -m benchmarks.import_time --check         # exit 1 if a budget is exceeded
+
+Every entry point is imported in a fresh interpreter with ``-X importtime``;
+the report lists the modules with the highest cumulative import cost.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry point file -> module imported by the server / CLI
+ENTRY_POINTS = {
+    'app.py': 'app',
+    'src/app.py': 'src.app',
+    'src/main.py': 'src.main',
+    'src/converter.py': 'src.converter'
+}
+
+# Cold-import budget per module in milliseconds; the framework imports
+# (flask, fastapi/pydantic) take most of it
+IMPORT_BUDGETS_MS = {
+    'app': 350.0,
+    'src.app': 350.0,
+    'src.main': 1200.0,
+    'src.converter': 50.0
+}
+# Multiplies all budgets, e.g. IMPORT_BUDGET_SCALE=2 on slow CI machines
+BUDGET_SCALE_ENV = 'IMPORT_BUDGET_SCALE'
+
+
+class ModuleTime(NamedTuple):
+    name: str
+    depth: int
+    self_ms: float
+    cumulative_ms: float
+
+
+class ImportProfile(NamedTuple):
+    module: str
+    total_ms: float
+    modules: List[ModuleTime]
+
+
+def parse_importtime(output: str) -> List[ModuleTime]:
+    """Parse the stderr of ``python -X importtime``."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        stripped = name.lstrip(' ')
+        depth = (len(name) - len(stripped) - 1) // 2
+        modules.append(ModuleTime(stripped.rstrip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return modules
+
+
+def profile_import(module: str, python: str = sys.executable) -> ImportProfile:
+    """Import ``module`` in a fresh interpreter and collect the per-module times."""
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    modules = parse_importtime(result.stderr)
+    end = next(i for i, m in enumerate(modules) if m.name == module and m.depth == 0)
+    # Kinder stehen vor ihrem Elternmodul; Interpreterstart (site) gehört nicht dazu
+    start = end
+    while start > 0 and modules[start - 1].depth > 0:
+        start -= 1
+    return ImportProfile(module, modules[end].cumulative_ms, modules[start:end + 1])
+
+
+def best_profile(module: str, repeat: int = 3) -> ImportProfile:
+    """Fastest of ``repeat`` cold imports, to filter out scheduling noise."""
+    return min((profile_import(module) for _ in range(repeat)), key=lambda profile: profile.total_ms)
+
+
+def budget_ms(module: str) -> Optional[float]:
+    budget = IMPORT_BUDGETS_MS.get(module)
+    if budget is None:
+        return None
+    return budget * float(os.environ.get(BUDGET_SCALE_ENV, 1))
+
+
+def loaded_modules(module: str, candidates: List[str]) -> List[str]:
+    """Which of ``candidates`` are in sys.modules after a cold ``import module``."""
+    code = f"import sys, {module}; print(' '.join(m for m in {candidates!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def report(profile: ImportProfile, top: int) -> str:
+    budget = budget_ms(profile.module)
+    lines = [f"{profile.module}: {profile.total_ms:.1f} ms" + (f" (budget {budget:.0f} ms)" if budget else '')]
+    heaviest = sorted((m for m in profile.modules if m.name != profile.module),
+                      key=lambda m: m.cumulative_ms, reverse=True)[:top]
+    for m in heaviest:
+        lines.append(f"  {m.cumulative_ms:9.1f} ms cumulative {m.self_ms:8.1f} ms self  {'  ' * m.depth}{m.name}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('modules', nargs='*', help='modules to import (default: all entry points)')
+    parser.add_argument('--top', type=int, default=15, help='modules listed per entry point')
+    parser.add_argument('--repeat', type=int, default=3, help='cold imports per entry point, the fastest counts')
+    parser.add_argument('--check', action='store_true', help='exit 1 if an entry point exceeds its budget')
+    args = parser.parse_args(argv)
+
+    over_budget: Dict[str, float] = {}
+    for module in args.modules or ENTRY_POINTS.values():
+        profile = best_profile(module, args.repeat)
+        print(report(profile, args.top))
+        print()
+        budget = budget_ms(module)
+        if budget is not None and profile.total_ms > budget:
+            over_budget[module] = profile.total_ms
+
+    for module, total in over_budget.items():
+        print(f"Over budget: {module} {total:.1f} ms > {budget_ms(module):.0f} ms")
+    return 1 if args.check and over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+Benchmark suite for the hot paths with a regression gate.
+
+    python -m benchmarks.run                      # run, write bench_output.txt, compare
+    python -m benchmarks.run --filter sync        # only matching benchmarks
+    python -m benchmarks.run --update-baseline    # store results as new baseline
+
+Every benchmark is warmed up and then timed with timeit using pinned
+warmup, repeat and loop counts. The median per-call time is divided by
+that of a pure-Python calibration loop measured right before it, so the stored
+baseline stays comparable across machines. The command exits with status 1
+if a benchmark is slower than its baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+WARMUP = 3
+REPEAT = 7
+DEFAULT_TOLERANCE = 0.5
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+OUTPUT_PATH = os.path.join(os.path.dirname(BENCHMARK_DIR), 'bench_output.txt')
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    number: int
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, number: int):
+    """Register a setup function returning the zero-argument callable to time."""
+    def register(setup: Callable[[], Callable[[], object]]):
+        BENCHMARKS.append(Benchmark(name, setup, number))
+        return setup
+    return register
+
+
+def _calibration() -> int:
+    total = 0
+    for i in range(1000):
+        total += i * i
+    return total
+
+
+@benchmark('converter.convert_weight', number=20000)
+def _converter_scalar():
+    from src.converter import UnitConverter
+    converter = UnitConverter()
+    return lambda: converter.convert_weight(1234.5, 'g', 'lb')
+
+
+@benchmark('converter.convert_weight_many_10k', number=200)
+def _converter_many():
+    import numpy as np
+    from src.converter import UnitConverter
+    converter = UnitConverter()
+    values = np.linspace(0, 1000, 10000)
+    units = np.array(['g', 'kg', 'oz', 'lb'] * 2500)
+    return lambda: converter.convert_weight_many(values, units, 'g')
+
+
+@benchmark('timing.calculate_timing_schedule', number=5000)
+def _timing_schedule():
+    from src.business_logic.timing import calculate_timing_schedule
+    recipe = {'knet_zeit': 12, 'stockgare_zeit': 180, 'portionier_zeit': 15, 'stueckgare_zeit': 90, 'back_zeit': 20}
+    target = datetime(2024, 6, 1, 19, 0)
+    return lambda: calculate_timing_schedule(recipe, target)
+
+
+@benchmark('fermentation.yeast_percentage', number=20000)
+def _yeast_scalar():
+    from src.business_logic.fermentation import YeastTable
+    table = YeastTable.compute()
+    return lambda: table.yeast_percentage(13.3, 18.7)
+
+
+@benchmark('fermentation.yeast_percentages_10k', number=200)
+def _yeast_batch():
+    import numpy as np
+    from src.business_logic.fermentation import YeastTable
+    table = YeastTable.compute()
+    hours = np.linspace(2, 96, 10000)
+    temperatures = np.linspace(4, 30, 10000)
+    return lambda: table.yeast_percentages(hours, temperatures)
+
+
+def _embed_service():
+    from src.business_logic.widget_embed import WidgetEmbedService
+    from src.models.widget import Widget
+    from src.repositories.widget_repository import WidgetRepository
+    repository = WidgetRepository()
+    service = WidgetEmbedService(repository)
+    repository.save(Widget(
+        id=None, key='bench-widget', name='Bench', theme='dark',
+        config={'size': 'large', 'show_header': True, 'locale': 'de-DE'},
+        allowed_domains=['example.com', '*.partner.example.org']
+    ))
+    return service
+
+
+@benchmark('embed.generate_widget_embed_code', number=20000)
+def _embed_cached():
+    service = _embed_service()
+    return lambda: service.generate_widget_embed_code('bench-widget', 'shop.partner.example.org')
+
+
+@benchmark('embed.render_uncached', number=10000)
+def _embed_uncached():
+    service = _embed_service()
+    config = {'size': 'large', 'show_header': True, 'locale': 'de-DE'}
+    return lambda: service._render('bench-widget', 'dark', config)
+
+
+@benchmark('embed.is_domain_allowed_5000', number=20000)
+def _domain_allowed():
+    from benchmarks.bench_domain_allowlist import QUERIES, make_allowlist
+    from src.business_logic.widget_embed import WidgetEmbedService
+    from src.models.widget import Widget
+    from src.repositories.widget_repository import WidgetRepository
+    repository = WidgetRepository()
+    service = WidgetEmbedService(repository)
+    widget = repository.save(Widget(id=None, key='bench', name='Bench', allowed_domains=make_allowlist(5000)))
+    domain = QUERIES['wildcard_last'](5000)
+    return lambda: service._is_domain_allowed(widget, domain)
+
+
+def _sync_items(count: int) -> List[Dict[str, object]]:
+    return [{'id': i, 'name': f'Item {i}', 'value': i * 0.5} for i in range(count)]
+
+
+@benchmark('sync.validate_items_1000', number=200)
+def _sync_validate():
+    from src.business_logic.sync import validate_items
+    items = _sync_items(1000)
+    return lambda: validate_items(items)
+
+
+def _sync_payload_case(count: int):
+    def setup():
+        from src.business_logic.sync import parse_json_payload
+        raw = json.dumps({'data': _sync_items(count)}).encode('utf-8')
+        return lambda: parse_json_payload(raw, max_items=count)
+    return setup
+
+
+for _count, _label, _number in ((1000, '1k', 100), (10000, '10k', 10), (100000, '100k', 1)):
+    benchmark(f'sync.json_payload_{_label}', number=_number)(_sync_payload_case(_count))
+
+
+def _sync_ndjson_case(batch_size: int):
+    def setup():
+        from src.business_logic.sync import sync_ndjson
+        lines = [json.dumps(item).encode('utf-8') + b'\n' for item in _sync_items(10000)]
+        return lambda: sync_ndjson(lines, batch_size=batch_size)
+    return setup
+
+
+for _batch_size in (100, 1000, 10000):
+    benchmark(f'sync.ndjson_10k_batch_{_batch_size}', number=5)(_sync_ndjson_case(_batch_size))
+
+
+@benchmark('sync.delta_json_1000_unchanged', number=50)
+def _sync_delta_unchanged():
+    from src.business_logic.sync import sync_json
+    from src.business_logic.sync_index import SyncIndex
+    index = SyncIndex(':memory:')
+    payload = {'data': _sync_items(1000)}
+    sync_json(payload, index)
+    return lambda: sync_json(payload, index)
+
+
+def run_benchmark(bench: Benchmark, warmup: int = WARMUP, repeat: int = REPEAT) -> Dict[str, float]:
+    """Time one benchmark; times are per call in seconds."""
+    func = bench.setup()
+    for _ in range(warmup):
+        func()
+    times = [t / bench.number for t in timeit.repeat(func, number=bench.number, repeat=repeat)]
+    return {
+        'number': bench.number,
+        'best_s': min(times),
+        'median_s': statistics.median(times)
+    }
+
+
+def _calibrate(repeat: int) -> float:
+    return statistics.median(timeit.repeat(_calibration, number=200, repeat=repeat)) / 200
+
+
+def run(names: Optional[List[str]] = None, warmup: int = WARMUP, repeat: int = REPEAT) -> Dict[str, object]:
+    """Run the selected benchmarks (substring match on the name) and return the report."""
+    results = {}
+    for bench in BENCHMARKS:
+        if names and not any(name in bench.name for name in names):
+            continue
+        # Calibrate next to every benchmark so drifting machine load affects both alike
+        calibration = _calibrate(repeat)
+        result = run_benchmark(bench, warmup, repeat)
+        result['calibration_s'] = calibration
+        result['relative'] = result['median_s'] / calibration
+        results[bench.name] = result
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'warmup': warmup,
+        'repeat': repeat,
+        'results': results
+    }
+
+
+def compare(report: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """Return a message per benchmark that regressed beyond the tolerance."""
+    regressions = []
+    for name, result in report['results'].items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            continue
+        limit = reference['relative'] * (1 + tolerance)
+        if result['relative'] > limit:
+            regressions.append(
+                f"{name}: {result['relative']:.4g} vs baseline {reference['relative']:.4g} "
+                f"({(result['relative'] / reference['relative'] - 1) * 100:+.0f}%)"
+            )
+    return regressions
+
+
+def _format_time(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:9.2f} ms"
+    return f"{seconds * 1e6:9.2f} us"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filter', action='append', help='only run benchmarks containing this text')
+    parser.add_argument('--output', default=OUTPUT_PATH, help='JSON results file')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON file')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown relative to the baseline (0.5 = 50%%)')
+    parser.add_argument('--update-baseline', action='store_true', help='write results to the baseline file')
+    args = parser.parse_args(argv)
+
+    report = run(args.filter)
+    for name, result in report['results'].items():
+        print(f"{name:<40} {_format_time(result['best_s'])}  (x{result['relative']:.4g} calibration)")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline = {'results': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update({k: v for k, v in report.items() if k != 'results'})
+        baseline['results'].update(report['results'])
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found, run with --update-baseline")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
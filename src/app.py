@@ -1,63 +1,56 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 
+from src.metrics import instrument_flask
+from src.preferment_catalog import PrefermentCatalog, SerializedPayload
+from src.widget_store import etag_matches
+
 app = Flask(__name__)
 CORS(app)
+instrument_flask(app, 'preferment')
+
+# Vorteig-Methoden aus der Datenbank, einmal serialisiert pro Datenstand
+preferment_catalog = PrefermentCatalog(dumps=app.json.dumps)
 
-# Vorteig-Methoden Daten
-PREFERMENT_METHODS = [
-    {
-        "id": 1,
-        "name": "Poolish",
-        "description": "Flüssiger Vorteig mit gleichen Teilen Mehl und Wasser",
-        "flour_ratio": 0.5,
-        "water_ratio": 0.5,
-        "yeast_ratio": 0.001,
-        "fermentation_time": "12-16 Stunden",
-        "temperature": "20-22°C"
-    },
-    {
-        "id": 2,
-        "name": "Biga",
-        "description": "Fester italienischer Vorteig",
-        "flour_ratio": 1.0,
-        "water_ratio": 0.45,
-        "yeast_ratio": 0.001,
-        "fermentation_time": "12-24 Stunden",
-        "temperature": "18-20°C"
-    },
-    {
-        "id": 3,
-        "name": "Pâte Fermentée",
-        "description": "Alter Teig als Vorteig verwendet",
-        "flour_ratio": 1.0,
-        "water_ratio": 0.6,
-        "yeast_ratio": 0.02,
-        "fermentation_time": "8-24 Stunden",
-        "temperature": "4-6°C"
-    },
-    {
-        "id": 4,
-        "name": "Sauerteig",
-        "description": "Natürlich fermentierter Vorteig mit wilden Hefen",
-        "flour_ratio": 1.0,
-        "water_ratio": 1.0,
-        "yeast_ratio": 0.0,
-        "fermentation_time": "4-12 Stunden",
-        "temperature": "24-28°C"
-    }
-]
+def _payload_response(payload: SerializedPayload) -> Response:
+    """Antwort aus vorserialisierten Bytes, 304 bei passendem If-None-Match"""
+    if etag_matches(request.headers.get('If-None-Match'), (payload.etag,)):
+        response = Response(status=304)
+    else:
+        response = Response(payload.body, status=200, mimetype='application/json')
+    response.headers['ETag'] = payload.etag
+    return response
 
 @app.route('/api/preferment-methods', methods=['GET'])
 def get_preferment_methods():
     try:
-        # Input validation - keine Parameter erwartet für GET all
+        # Optionale Filter: ?id=<int> oder ?name=<str>
+        method_id = request.args.get('id')
+        name = request.args.get('name')
+        
+        if method_id is not None:
+            try:
+                payload = preferment_catalog.by_id(int(method_id))
+            except ValueError:
+                return jsonify({
+                    "success": False,
+                    "error": "Bad request",
+                    "message": "Parameter 'id' must be an integer"
+                }), 400
+        elif name is not None:
+            payload = preferment_catalog.by_name(name)
+        else:
+            payload = preferment_catalog.all()
+        
+        if payload is None:
+            return jsonify({
+                "success": False,
+                "error": "Not found",
+                "message": "Preferment method not found"
+            }), 404
+        
         # Erfolgreiche Antwort
-        return jsonify({
-            "success": True,
-            "data": PREFERMENT_METHODS,
-            "count": len(PREFERMENT_METHODS)
-        }), 200
+        return _payload_response(payload)
     
     except Exception as e:
         # Error handling für unerwartete Fehler
@@ -0,0 +1,438 @@
+"""
+Single ASGI application serving all Pizza Calculator routes.
+
+Replaces the three separate servers (Flask sync app, Flask preferment API,
+FastAPI widget API) with one process:
+
+    uvicorn src.asgi:app --host 0.0.0.0 --port 8000
+
+/api/sync and /api/preferment-methods are native async handlers with the
+same response bodies and error shapes as their Flask versions (including
+the asynchronous sync jobs, see business_logic.sync_jobs); the widget
+routes are the router from src/main.py. /api/recipe-sweep evaluates recipe
+parameter grids (see business_logic.recipe_sweep).
+"""
+
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import IO, Any, Dict, Iterable, Optional
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.exception_handlers import http_exception_handler, request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from src.business_logic.sync_index import SyncIndex, get_sync_index
+from src.business_logic.sync_jobs import (
+    MAX_SPOOL_BYTES,
+    RETRY_AFTER_SECONDS,
+    SyncBodyTooLargeError,
+    SyncJobQueue,
+    SyncQueueFullError,
+    accepted_response,
+    body_too_large,
+    json_job,
+    ndjson_job,
+    spool_body,
+    wants_async,
+)
+
+from src.business_logic.sync import (
+    DEFAULT_BATCH_SIZE,
+    MAX_BATCH_SIZE,
+    MAX_STREAM_ITEMS,
+    NdjsonBatcher,
+    SyncError,
+    aiter_ndjson_lines,
+    ndjson_response,
+    sync_error_response,
+    sync_json_bytes,
+)
+from src.main import router as widget_router
+from src.metrics import MetricsMiddleware
+from src.preferment_catalog import CatalogSnapshot, PrefermentCatalog, SerializedPayload
+from src.repositories.async_repository import RepositoryTimeoutError, ThreadOffloader
+from src.widget_store import etag_matches
+
+SYNC_PREFIX = '/api/sync'
+PREFERMENT_PREFIX = '/api/preferment-methods'
+SWEEP_PATH = '/api/recipe-sweep'
+
+# Fehlerformat der ehemaligen Flask-Preferment-API
+PREFERMENT_ERRORS = {
+    404: ("Not found", "The requested resource was not found"),
+    405: ("Method not allowed", "The method is not allowed for the requested URL"),
+    500: ("Internal server error", "An unexpected error occurred")
+}
+
+preferment_catalog = PrefermentCatalog()
+
+
+# --- /api/sync ---------------------------------------------------------------
+
+sync_router = APIRouter()
+
+
+def _mimetype(request: Request) -> str:
+    return request.headers.get('content-type', '').split(';', 1)[0].strip().lower()
+
+
+def _is_json(mimetype: str) -> bool:
+    return mimetype == 'application/json' or (mimetype.startswith('application/') and mimetype.endswith('+json'))
+
+
+def _sync_index(request: Request) -> SyncIndex:
+    index = request.app.state.sync_index
+    return get_sync_index() if index is None else index
+
+
+def _queue_full(error: SyncQueueFullError) -> JSONResponse:
+    return JSONResponse({'error': str(error)}, status_code=503, headers={'Retry-After': str(RETRY_AFTER_SECONDS)})
+
+
+async def _enqueue(request: Request, kind: str, work, cleanup=None, reserved: bool = False) -> JSONResponse:
+    """
+    Asynchroner Modus: Job einreihen und sofort mit 202 antworten,
+    bei voller Queue 503 mit Retry-After
+    """
+    try:
+        # submit() speichert den Job im SQLite-Store
+        job = await run_in_threadpool(request.app.state.sync_jobs.submit, kind, work, cleanup, reserved)
+    except SyncQueueFullError as e:
+        return _queue_full(e)
+    status_url = f'{SYNC_PREFIX}/{job.id}'
+    return JSONResponse(accepted_response(job, status_url), status_code=202, headers={'Location': status_url})
+
+
+async def _spool_request(request: Request, max_bytes: int) -> IO[bytes]:
+    """
+    Request-Body puffern; Schreiben (ab SPOOL_MAX_MEMORY auf Platte) im Threadpool
+
+    Raises:
+        SyncBodyTooLargeError: Sobald mehr als max_bytes gelesen wurden
+    """
+    body = spool_body()
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                raise body_too_large(max_bytes)
+            if chunk:
+                await run_in_threadpool(body.write, chunk)
+        body.seek(0)
+    except BaseException:
+        body.close()
+        raise
+    return body
+
+
+def _add_lines(batcher: NdjsonBatcher, lines: Iterable[bytes]) -> None:
+    for line in lines:
+        batcher.add_line(line)
+
+
+async def _sync_ndjson(request: Request, run_async: bool = False) -> JSONResponse:
+    """
+    Streaming-Modus: ein Datensatz pro Zeile (application/x-ndjson),
+    Verarbeitung in Batches mit begrenztem Speicher
+    """
+    state = request.app.state
+    try:
+        batch_size = int(request.query_params.get('batch_size', state.sync_batch_size))
+    except ValueError:
+        batch_size = state.sync_batch_size
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        return JSONResponse({'error': f'batch_size must be between 1 and {MAX_BATCH_SIZE}'}, status_code=400)
+
+    if run_async:
+        max_bytes = state.sync_job_max_body_bytes
+        if int(request.headers.get('content-length') or 0) > max_bytes:
+            return JSONResponse({'error': str(body_too_large(max_bytes))}, status_code=413)
+        # Platz in der Queue vor dem Lesen reservieren, dann den Body puffern;
+        # der Job läuft im Worker-Pool nach Ende des Requests
+        index, queue = _sync_index(request), state.sync_jobs
+        try:
+            queue.reserve()
+        except SyncQueueFullError as e:
+            return _queue_full(e)
+        try:
+            body = await _spool_request(request, max_bytes)
+        except SyncBodyTooLargeError as e:
+            queue.release()
+            return JSONResponse({'error': str(e)}, status_code=413)
+        except BaseException:
+            queue.release()
+            raise
+        work = ndjson_job(body, index, batch_size, state.sync_stream_max_items)
+        return await _enqueue(request, 'ndjson', work, body.close, reserved=True)
+
+    batcher = NdjsonBatcher(batch_size, state.sync_stream_max_items, index=_sync_index(request))
+    try:
+        # Parsen, Diff gegen den Index und Commit (SQLite) laufen im Threadpool,
+        # ein Wechsel pro Batch statt pro Zeile
+        lines = []
+        async for line in aiter_ndjson_lines(request.stream()):
+            lines.append(line)
+            if len(lines) >= batch_size:
+                await run_in_threadpool(_add_lines, batcher, lines)
+                lines = []
+        if lines:
+            await run_in_threadpool(_add_lines, batcher, lines)
+        synced_count, batches = await run_in_threadpool(batcher.finish)
+    except SyncError as e:
+        return JSONResponse(sync_error_response(e), status_code=400)
+
+    return JSONResponse(ndjson_response(synced_count, batches, batcher.counts))
+
+
+@sync_router.post(SYNC_PREFIX)
+async def sync_data(request: Request) -> JSONResponse:
+    """
+    Synchronisiert lokale Daten mit Cloud
+    """
+    try:
+        mimetype = _mimetype(request)
+        run_async = wants_async(request.headers.get('prefer'), request.query_params.get('mode'))
+
+        # Streaming upload
+        if mimetype == 'application/x-ndjson':
+            return await _sync_ndjson(request, run_async)
+
+        # Input validation
+        if not _is_json(mimetype):
+            return JSONResponse({'error': 'Content-Type must be application/json'}, status_code=400)
+
+        if run_async:
+            index, queue = _sync_index(request), request.app.state.sync_jobs
+            try:
+                queue.reserve()
+            except SyncQueueFullError as e:
+                return _queue_full(e)
+            try:
+                raw = await request.body()
+            except BaseException:
+                queue.release()
+                raise
+            return await _enqueue(request, 'json', json_job(raw, index), reserved=True)
+
+        raw = await request.body()
+
+        # Parsen, Diff, Commit und Index-Update (SQLite) blockieren: nicht in der Event-Loop
+        body, status = await run_in_threadpool(sync_json_bytes, raw, _sync_index(request))
+        return JSONResponse(body, status_code=status)
+
+    except ValueError:
+        # Handle JSON parsing errors
+        return JSONResponse({'error': 'Invalid JSON format'}, status_code=400)
+
+    except Exception as e:
+        # Handle unexpected errors
+        logging.error(f"Sync error: {str(e)}")
+        return JSONResponse({'error': 'Internal server error during sync'}, status_code=500)
+
+
+@sync_router.get(SYNC_PREFIX + '/{job_id}')
+async def sync_job_status(request: Request, job_id: str) -> JSONResponse:
+    """
+    Status, Fortschritt und Ergebnis eines asynchronen Syncs
+    """
+    status = await run_in_threadpool(request.app.state.sync_jobs.status, job_id)
+    if status is None:
+        return JSONResponse({'error': 'Sync job not found'}, status_code=404)
+    return JSONResponse(status)
+
+
+# --- /api/preferment-methods -------------------------------------------------
+
+preferment_router = APIRouter()
+
+
+def _preferment_error(status: int, error: str, message: str) -> JSONResponse:
+    return JSONResponse({"success": False, "error": error, "message": message}, status_code=status)
+
+
+def _payload_response(request: Request, payload: SerializedPayload) -> Response:
+    """Antwort aus vorserialisierten Bytes, 304 bei passendem If-None-Match"""
+    headers = {'ETag': payload.etag}
+    if etag_matches(request.headers.get('if-none-match'), (payload.etag,)):
+        return Response(status_code=304, headers=headers)
+    return Response(payload.body, media_type='application/json', headers=headers)
+
+
+async def _catalog_snapshot(request: Request) -> Optional[CatalogSnapshot]:
+    """
+    Aktueller Katalog, ohne die Event-Loop zu blockieren
+
+    Datenbankabfragen (nur bei abgelaufener TTL) laufen im Threadpool der
+    App. Dauern sie zu lange, wird der zuletzt geladene Stand ausgeliefert.
+    """
+    if not preferment_catalog.is_stale():
+        return preferment_catalog.current()
+    try:
+        return await request.app.state.db_offloader.run(preferment_catalog.snapshot)
+    except RepositoryTimeoutError as e:
+        logging.warning(f"Preferment catalog refresh: {e}")
+        return preferment_catalog.current()
+
+
+@preferment_router.get(PREFERMENT_PREFIX)
+async def get_preferment_methods(request: Request) -> Response:
+    try:
+        snapshot = await _catalog_snapshot(request)
+        if snapshot is None:
+            return _preferment_error(503, "Service unavailable", "Preferment methods are temporarily unavailable")
+
+        # Optionale Filter: ?id=<int> oder ?name=<str>
+        method_id = request.query_params.get('id')
+        name = request.query_params.get('name')
+
+        if method_id is not None:
+            try:
+                payload = snapshot.by_id.get(int(method_id))
+            except ValueError:
+                return _preferment_error(400, "Bad request", "Parameter 'id' must be an integer")
+        elif name is not None:
+            payload = snapshot.find_by_name(name)
+        else:
+            payload = snapshot.all
+
+        if payload is None:
+            return _preferment_error(404, "Not found", "Preferment method not found")
+
+        # Erfolgreiche Antwort
+        return _payload_response(request, payload)
+
+    except Exception as e:
+        # Error handling für unerwartete Fehler
+        return _preferment_error(500, "Internal server error", str(e))
+
+
+# --- /api/recipe-sweep ------------------------------------------------------
+
+sweep_router = APIRouter()
+
+
+@sweep_router.post(SWEEP_PATH)
+async def recipe_sweep(request: Request) -> Response:
+    """
+    Rezeptvarianten über ein Parameterraster
+
+    Standardmäßig eine Seite ab ``cursor``; mit ``Accept: application/x-ndjson``
+    werden alle gefilterten Zeilen ab ``cursor`` gestreamt. Die Berechnung
+    läuft im Threadpool, nicht in der Event-Loop.
+    """
+    # numpy erst beim ersten Sweep laden, nicht beim Start des Servers
+    from src.business_logic.recipe_sweep import iter_ndjson, parse_sweep_request
+    try:
+        data = json.loads(await request.body())
+        sweep, cursor, limit = parse_sweep_request(data)
+        if 'application/x-ndjson' in request.headers.get('accept', ''):
+            return StreamingResponse(iter_ndjson(sweep, cursor), media_type='application/x-ndjson')
+        page = await run_in_threadpool(sweep.page, cursor, limit)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+
+    return JSONResponse({'total_points': sweep.size, 'rows': page.rows, 'next_cursor': page.next_cursor})
+
+
+# --- Application -------------------------------------------------------------
+
+class PathPrefixMiddleware:
+    """Applies a middleware only to HTTP requests below the given path prefixes"""
+
+    def __init__(self, app, wrapped_class, prefixes: Iterable[str], **options: Any):
+        self.app = app
+        self.wrapped = wrapped_class(app, **options)
+        self.prefixes = tuple(prefixes)
+
+    async def __call__(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope['type'] == 'http' and scope['path'].startswith(self.prefixes):
+            await self.wrapped(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+def _status_error(request: Request, status: int, detail: Optional[str]) -> Optional[JSONResponse]:
+    """Fehlerantwort im Format der Route, None für das FastAPI-Standardformat"""
+    path = request.url.path
+    if path.startswith(PREFERMENT_PREFIX):
+        error, message = PREFERMENT_ERRORS.get(status, PREFERMENT_ERRORS[500])
+        return _preferment_error(status, error, message)
+    if path.startswith((SYNC_PREFIX, SWEEP_PATH)):
+        return JSONResponse({'error': detail or 'Request failed'}, status_code=status)
+    return None
+
+
+def create_app(
+    db_offloader: Optional[ThreadOffloader] = None,
+    sync_index: Optional[SyncIndex] = None,
+    sync_jobs: Optional[SyncJobQueue] = None
+) -> FastAPI:
+    """Build the combined application; without a sync_index the shared one in data/ is used."""
+    offloader = db_offloader or ThreadOffloader()
+    jobs = SyncJobQueue() if sync_jobs is None else sync_jobs
+
+    @asynccontextmanager
+    async def lifespan(application: FastAPI):
+        # Hefetabelle vor dem ersten Request aufbauen (bzw. per mmap laden);
+        # erst hier importiert, damit numpy den Import der App nicht verlangsamt
+        from src.business_logic.fermentation import get_yeast_table
+        await run_in_threadpool(get_yeast_table)
+        yield
+        offloader.close()
+        jobs.close()
+
+    application = FastAPI(title="Pizza Calculator API", version="1.0.0", lifespan=lifespan)
+    # Blockierende Datenbankzugriffe laufen hier, nie in der Event-Loop
+    application.state.db_offloader = offloader
+    application.state.sync_batch_size = DEFAULT_BATCH_SIZE
+    application.state.sync_stream_max_items = MAX_STREAM_ITEMS
+    application.state.sync_job_max_body_bytes = MAX_SPOOL_BYTES
+    application.state.sync_index = sync_index
+    # Worker-Pool für Prefer: respond-async
+    application.state.sync_jobs = jobs
+
+    application.include_router(sync_router)
+    application.include_router(preferment_router)
+    application.include_router(sweep_router)
+    application.include_router(widget_router)
+
+    # CORS wie zuvor per flask_cors nur für die Preferment-API
+    application.add_middleware(
+        PathPrefixMiddleware,
+        wrapped_class=CORSMiddleware,
+        prefixes=(PREFERMENT_PREFIX,),
+        allow_origins=['*'],
+        allow_methods=['*'],
+        allow_headers=['*']
+    )
+    application.add_middleware(MetricsMiddleware, app_name="pizza")
+
+    @application.exception_handler(StarletteHTTPException)
+    async def handle_http_exception(request: Request, exc: StarletteHTTPException):
+        return _status_error(request, exc.status_code, exc.detail) or await http_exception_handler(request, exc)
+
+    @application.exception_handler(RequestValidationError)
+    async def handle_validation_error(request: Request, exc: RequestValidationError):
+        return _status_error(request, 400, 'Invalid request') or await request_validation_exception_handler(request, exc)
+
+    @application.exception_handler(Exception)
+    async def handle_unexpected_error(request: Request, exc: Exception):
+        logging.error(f"Unhandled error on {request.url.path}: {exc}")
+        return _status_error(request, 500, 'Internal server error') or JSONResponse(
+            {'detail': 'Internal Server Error'}, status_code=500
+        )
+
+    return application
+
+
+app = create_app()
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,38 @@
+"""
+Business logic package for Pizza Calculator application.
+
+Names are imported from their submodules on first access (PEP 562), so
+e.g. the sync endpoint does not load numpy through this package.
+"""
+
+from importlib import import_module
+
+# Exported name -> submodule
+_EXPORTS = {
+    'calculate_timing_schedule': '.timing',
+    'ProductionCapacity': '.scheduler',
+    'schedule_production': '.scheduler',
+    'calculate_calculations': '.dough_calculation',
+    'calculate_calculation_grid': '.dough_calculation',
+    'compute_dough_arrays': '.dough_calculation',
+    'RecipeSweep': '.recipe_sweep',
+    'SweepRange': '.recipe_sweep',
+    'YeastTable': '.fermentation',
+    'yeast_percentage': '.fermentation',
+    'yeast_percentages': '.fermentation'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,57 @@
+from typing import FrozenSet, Iterable
+
+
+def normalize_domain(domain: str) -> str:
+    """Normalisiert Domain (Kleinschreibung, ohne Protokoll und Port)"""
+    normalized_domain = domain.lower()
+    if '://' in normalized_domain:
+        normalized_domain = normalized_domain.split('://', 1)[1]
+    if ':' in normalized_domain:
+        normalized_domain = normalized_domain.split(':', 1)[0]
+    return normalized_domain
+
+
+class DomainMatcher:
+    """
+    Vorkompilierte Domain-Allowlist eines Widgets
+
+    Einträge werden einmal normalisiert: exakte Domains in einem Set, die
+    Basis-Domains von Wildcards (*.example.com -> example.com) in einem zweiten.
+    Eine Prüfung schlägt die Domain selbst und jedes ihrer Suffixe an
+    Label-Grenzen nach, kostet also O(Anzahl Labels) statt O(Anzahl Einträge).
+    Ergebnisse entsprechen dem bisherigen linearen Vergleich.
+    """
+
+    __slots__ = ('_exact', '_wildcards')
+
+    def __init__(self, allowed_domains: Iterable[str]):
+        exact = set()
+        wildcards = set()
+        for allowed_domain in allowed_domains:
+            allowed_normalized = allowed_domain.lower()
+            exact.add(allowed_normalized)
+            if allowed_normalized.startswith('*.'):
+                wildcards.add(allowed_normalized[2:])
+        self._exact: FrozenSet[str] = frozenset(exact)
+        self._wildcards: FrozenSet[str] = frozenset(wildcards)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def matches(self, domain: str) -> bool:
+        """Prüft ob die (nicht normalisierte) Domain erlaubt ist"""
+        normalized_domain = normalize_domain(domain)
+
+        # Exakte Übereinstimmung, oder *.example.com erlaubt example.com selbst
+        if normalized_domain in self._exact or normalized_domain in self._wildcards:
+            return True
+        if not self._wildcards:
+            return False
+
+        # Suffixe an Label-Grenzen: shop.eu.example.com -> eu.example.com, example.com, com
+        dot = normalized_domain.find('.')
+        while dot != -1:
+            if normalized_domain[dot + 1:] in self._wildcards:
+                return True
+            dot = normalized_domain.find('.', dot + 1)
+        return False
@@ -0,0 +1,270 @@
+"""
+Vectorized dough calculation for Pizza Calculator.
+
+Fills ``Calculation`` records from the baker's percentages of ``Recipe``
+records. All arithmetic runs on float64 NumPy arrays over the whole batch;
+values are rounded to ``Decimal`` (two places, like the ``DECIMAL(8,2)``
+columns) only when the records are built.
+
+The total dough weight is ``number_of_pizzas * pizza_weight``. The flour
+amount follows from the sum of all percentages, so ``Recipe.flour_weight``
+(the recipe's reference batch) is not needed here.
+"""
+
+from decimal import Decimal
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from src.database.models import Calculation, Recipe
+
+ArrayLike = Union[float, int, Decimal, Sequence[Any], np.ndarray]
+
+# Recipe fields that enter the calculation, in baker's percent
+PERCENTAGE_FIELDS = (
+    'water_percentage',
+    'salt_percentage',
+    'yeast_percentage',
+    'oil_percentage',
+    'sugar_percentage',
+    'preferment_percentage'
+)
+
+# Calculation fields produced by compute_dough_arrays()
+RESULT_FIELDS = (
+    'total_flour',
+    'total_water',
+    'total_salt',
+    'total_yeast',
+    'total_oil',
+    'total_sugar',
+    'preferment_flour',
+    'preferment_water',
+    'preferment_yeast',
+    'main_dough_flour',
+    'main_dough_water',
+    'main_dough_salt',
+    'main_dough_yeast'
+)
+
+# Poolish: equal parts flour and water, 0.1 % yeast on the preferment flour
+DEFAULT_PREFERMENT_HYDRATION = 100.0
+DEFAULT_PREFERMENT_YEAST_PERCENTAGE = 0.1
+
+
+def recipe_arrays(recipes: Sequence[Recipe]) -> Dict[str, np.ndarray]:
+    """
+    Pack the baker's percentages of the given recipes into float64 columns.
+
+    Args:
+        recipes: Recipes to pack
+
+    Returns:
+        Dictionary mapping each name in PERCENTAGE_FIELDS to an array with
+        one entry per recipe
+    """
+    count = len(recipes)
+    return {
+        field: np.fromiter(
+            (float(getattr(recipe, field)) for recipe in recipes),
+            dtype=np.float64,
+            count=count
+        )
+        for field in PERCENTAGE_FIELDS
+    }
+
+
+def _as_float_array(values: ArrayLike) -> np.ndarray:
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False)
+    if isinstance(values, (int, float, Decimal)):
+        return np.float64(values)
+    return np.fromiter((float(value) for value in values), dtype=np.float64)
+
+
+def compute_dough_arrays(
+    percentages: Mapping[str, ArrayLike],
+    number_of_pizzas: ArrayLike,
+    pizza_weight: ArrayLike,
+    preferment_hydration: ArrayLike = DEFAULT_PREFERMENT_HYDRATION,
+    preferment_yeast_percentage: ArrayLike = DEFAULT_PREFERMENT_YEAST_PERCENTAGE
+) -> Dict[str, np.ndarray]:
+    """
+    Compute all ingredient quantities for a batch of dough configurations.
+
+    All inputs are broadcast against each other, so any of them may be a
+    scalar or an array of the batch length.
+
+    Args:
+        percentages: Arrays for every name in PERCENTAGE_FIELDS
+        number_of_pizzas: Number of dough balls
+        pizza_weight: Weight of a single dough ball in grams
+        preferment_hydration: Water in the preferment, in percent of its flour
+        preferment_yeast_percentage: Yeast in the preferment, in percent of its flour
+
+    Returns:
+        Dictionary mapping each name in RESULT_FIELDS to a float64 array (grams)
+    """
+    water = _as_float_array(percentages['water_percentage'])
+    salt = _as_float_array(percentages['salt_percentage'])
+    yeast = _as_float_array(percentages['yeast_percentage'])
+    oil = _as_float_array(percentages['oil_percentage'])
+    sugar = _as_float_array(percentages['sugar_percentage'])
+    preferment = _as_float_array(percentages['preferment_percentage'])
+
+    total_dough = _as_float_array(number_of_pizzas) * _as_float_array(pizza_weight)
+
+    # Grams per baker's percent: the flour is 100 %, everything else relative to it
+    grams_per_percent = total_dough / (100.0 + water + salt + yeast + oil + sugar)
+
+    total_flour = grams_per_percent * 100.0
+    total_water = grams_per_percent * water
+    total_salt = grams_per_percent * salt
+    total_yeast = grams_per_percent * yeast
+
+    # The preferment takes its share of the flour and never more water or
+    # yeast than the whole dough contains
+    preferment_flour = total_flour * (preferment / 100.0)
+    preferment_water = np.minimum(
+        preferment_flour * (_as_float_array(preferment_hydration) / 100.0),
+        total_water
+    )
+    preferment_yeast = np.minimum(
+        preferment_flour * (_as_float_array(preferment_yeast_percentage) / 100.0),
+        total_yeast
+    )
+
+    results = {
+        'total_flour': total_flour,
+        'total_water': total_water,
+        'total_salt': total_salt,
+        'total_yeast': total_yeast,
+        'total_oil': grams_per_percent * oil,
+        'total_sugar': grams_per_percent * sugar,
+        'preferment_flour': preferment_flour,
+        'preferment_water': preferment_water,
+        'preferment_yeast': preferment_yeast,
+        'main_dough_flour': total_flour - preferment_flour,
+        'main_dough_water': total_water - preferment_water,
+        'main_dough_salt': total_salt,
+        'main_dough_yeast': total_yeast - preferment_yeast
+    }
+    shape = np.broadcast(*results.values()).shape
+    return {name: np.broadcast_to(values, shape) for name, values in results.items()}
+
+
+def _to_decimals(values: np.ndarray) -> List[Decimal]:
+    """Round to two places and convert to Decimal via exact integer cents."""
+    cents = np.rint(np.asarray(values, dtype=np.float64) * 100.0).astype(np.int64)
+    return [Decimal(cent).scaleb(-2) for cent in cents.tolist()]
+
+
+def _build_calculations(
+    recipe_ids: List[int],
+    number_of_pizzas: np.ndarray,
+    pizza_weight: np.ndarray,
+    results: Dict[str, np.ndarray]
+) -> List[Calculation]:
+    columns = {name: _to_decimals(values) for name, values in results.items()}
+    pizza_counts = number_of_pizzas.astype(np.int64).tolist()
+    pizza_weights = _to_decimals(pizza_weight)
+
+    calculations = []
+    for row, recipe_id in enumerate(recipe_ids):
+        calculations.append(Calculation(
+            recipe_id=recipe_id,
+            number_of_pizzas=pizza_counts[row],
+            pizza_weight=pizza_weights[row],
+            **{name: column[row] for name, column in columns.items()}
+        ))
+    return calculations
+
+
+def calculate_calculations(
+    recipes: Sequence[Recipe],
+    number_of_pizzas: ArrayLike,
+    pizza_weight: ArrayLike,
+    preferment_hydration: ArrayLike = DEFAULT_PREFERMENT_HYDRATION,
+    preferment_yeast_percentage: ArrayLike = DEFAULT_PREFERMENT_YEAST_PERCENTAGE
+) -> List[Calculation]:
+    """
+    Calculate one ``Calculation`` per recipe.
+
+    Args:
+        recipes: Recipes to calculate
+        number_of_pizzas: Number of pizzas, scalar or one value per recipe
+        pizza_weight: Dough ball weight in grams, scalar or one value per recipe
+        preferment_hydration: Preferment hydration in percent, scalar or per recipe
+        preferment_yeast_percentage: Preferment yeast in percent, scalar or per recipe
+
+    Returns:
+        List of Calculation records in the order of ``recipes``
+
+    Raises:
+        ValueError: If an array argument does not match the number of recipes
+    """
+    count = len(recipes)
+    try:
+        pizza_counts = np.broadcast_to(_as_float_array(number_of_pizzas), (count,))
+        pizza_weights = np.broadcast_to(_as_float_array(pizza_weight), (count,))
+    except ValueError:
+        raise ValueError("number_of_pizzas and pizza_weight must be scalars or match the number of recipes")
+
+    results = compute_dough_arrays(
+        recipe_arrays(recipes),
+        pizza_counts,
+        pizza_weights,
+        preferment_hydration,
+        preferment_yeast_percentage
+    )
+    recipe_ids = [recipe.id for recipe in recipes]
+    return _build_calculations(recipe_ids, pizza_counts, pizza_weights, results)
+
+
+def calculate_calculation_grid(
+    recipes: Sequence[Recipe],
+    pizza_counts: Sequence[int],
+    pizza_weights: Sequence[ArrayLike],
+    preferment_hydration: Optional[ArrayLike] = None,
+    preferment_yeast_percentage: Optional[ArrayLike] = None
+) -> List[Calculation]:
+    """
+    Calculate every recipe x pizza count x ball weight combination.
+
+    Args:
+        recipes: Recipes to calculate
+        pizza_counts: Pizza counts to combine with every recipe
+        pizza_weights: Dough ball weights in grams to combine with every recipe
+        preferment_hydration: Preferment hydration in percent, scalar or per recipe
+        preferment_yeast_percentage: Preferment yeast in percent, scalar or per recipe
+
+    Returns:
+        List of Calculation records, ordered by recipe, then pizza count,
+        then ball weight
+    """
+    counts = _as_float_array(pizza_counts).reshape(-1)
+    weights = _as_float_array(pizza_weights).reshape(-1)
+    per_recipe = len(counts) * len(weights)
+
+    # Index of the recipe for every row of the grid
+    recipe_index = np.repeat(np.arange(len(recipes)), per_recipe)
+    grid_counts = np.tile(np.repeat(counts, len(weights)), len(recipes))
+    grid_weights = np.tile(weights, len(recipes) * len(counts))
+
+    percentages = {name: values[recipe_index] for name, values in recipe_arrays(recipes).items()}
+
+    def per_row(values: Optional[ArrayLike], default: float) -> np.ndarray:
+        if values is None:
+            return np.float64(default)
+        values = _as_float_array(values)
+        return values[recipe_index] if values.ndim else values
+
+    results = compute_dough_arrays(
+        percentages,
+        grid_counts,
+        grid_weights,
+        per_row(preferment_hydration, DEFAULT_PREFERMENT_HYDRATION),
+        per_row(preferment_yeast_percentage, DEFAULT_PREFERMENT_YEAST_PERCENTAGE)
+    )
+    recipe_ids = [recipes[index].id for index in recipe_index.tolist()]
+    return _build_calculations(recipe_ids, grid_counts, grid_weights, results)
@@ -0,0 +1,304 @@
+"""
+Yeast amount from fermentation time and temperature.
+
+The model: yeast activity follows the cardinal temperature model (CTMI)
+between MIN_TEMPERATURE and MAX_TEMPERATURE, and the yeast population grows
+exponentially at that rate. The fermentation a dough gets is proportional
+to yeast * (exp(mu * t) - 1) / mu. The constant is calibrated so that the
+reference point of the ``Recipe`` defaults (24 h at 20 °C) needs 0.25 %
+yeast; every other point needs as much yeast as gives the same fermentation.
+
+Planners query this very often, so the model is evaluated once on a dense
+time x temperature grid (YeastTable.compute). Queries are bilinear
+interpolations in that grid: O(1) per point, vectorized for batches. The
+grid holds log(yeast) over log(hours) and temperature, where the model is
+close to linear, which keeps the relative interpolation error around 1e-4. Grids
+can be saved as .npy plus a JSON sidecar and loaded memory-mapped, so
+worker processes share one copy of the pages.
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from src.database.models import Recipe
+
+ArrayLike = Union[float, int, Decimal, np.ndarray, Any]
+
+# Kardinaltemperaturen der Hefe (°C) und maximale Wachstumsrate (1/h)
+MIN_TEMPERATURE = 2.0
+OPTIMUM_TEMPERATURE = 32.0
+MAX_TEMPERATURE = 45.0
+MAX_GROWTH_RATE = 0.08
+
+# Kalibrierpunkt: Standardwerte von Recipe
+REFERENCE_HOURS = 24.0
+REFERENCE_TEMPERATURE = 20.0
+REFERENCE_YEAST_PERCENTAGE = 0.25
+
+# Default grid: (start, stop, points) per axis, both ends inclusive. The
+# time axis is spaced evenly in log(hours), the temperature axis linearly.
+DEFAULT_HOURS = (1.0, 120.0, 481)
+DEFAULT_TEMPERATURES = (3.0, 40.0, 371)
+
+# Optional prebuilt grid, loaded memory-mapped by get_yeast_table()
+TABLE_PATH_ENV = 'YEAST_TABLE_PATH'
+
+FORMAT_VERSION = 1
+
+
+def growth_rate(temperature: ArrayLike) -> np.ndarray:
+    """Specific growth rate (1/h) by the cardinal temperature model, 0 outside the cardinal range."""
+    t = np.asarray(temperature, dtype=np.float64)
+    t_min, t_opt, t_max = MIN_TEMPERATURE, OPTIMUM_TEMPERATURE, MAX_TEMPERATURE
+    numerator = (t - t_max) * (t - t_min) ** 2
+    denominator = (t_opt - t_min) * ((t_opt - t_min) * (t - t_opt) - (t_opt - t_max) * (t_opt + t_min - 2 * t))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = MAX_GROWTH_RATE * numerator / denominator
+    return np.where((t > t_min) & (t < t_max), rate, 0.0)
+
+
+def fermentation_units(hours: ArrayLike, temperature: ArrayLike) -> np.ndarray:
+    """Fermentation per unit of yeast: (exp(mu * t) - 1) / mu, t for mu -> 0."""
+    t = np.asarray(hours, dtype=np.float64)
+    mu = growth_rate(temperature)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        units = np.expm1(mu * t) / mu
+    return np.where(mu > 0, units, t)
+
+
+def model_yeast_percentage(hours: ArrayLike, temperature: ArrayLike) -> np.ndarray:
+    """Exact model value; broadcasts hours against temperature. Used to fill the grid."""
+    target = REFERENCE_YEAST_PERCENTAGE * fermentation_units(REFERENCE_HOURS, REFERENCE_TEMPERATURE)
+    return target / fermentation_units(hours, temperature)
+
+
+def _axis(start: float, stop: float, points: int) -> Tuple[float, float, int]:
+    if points < 2 or stop <= start:
+        raise ValueError("grid axes need start < stop and at least 2 points")
+    return float(start), float(stop), int(points)
+
+
+class YeastTable:
+    """
+    Log yeast percentage on a time x temperature grid
+
+    ``log_values[i, j]`` is the natural log of the yeast percentage at the
+    i-th of ``rows`` log-spaced times from hours_start to hours_stop and the
+    j-th of ``columns`` evenly spaced temperatures. Both axes are uniform in
+    the coordinate used for interpolation, so a query finds its cell by
+    arithmetic instead of a search.
+    """
+
+    def __init__(
+        self,
+        log_values: np.ndarray,
+        hours_start: float,
+        hours_stop: float,
+        temperature_start: float,
+        temperature_stop: float
+    ):
+        if log_values.ndim != 2 or min(log_values.shape) < 2:
+            raise ValueError("log_values must be a 2-D grid with at least 2 points per axis")
+        if not (0 < hours_start < hours_stop and temperature_start < temperature_stop):
+            raise ValueError("grid axes need 0 < hours_start < hours_stop and temperature_start < temperature_stop")
+        rows, columns = log_values.shape
+        self.log_values = log_values
+        self.hours_start = float(hours_start)
+        self.hours_stop = float(hours_stop)
+        self.temperature_start = float(temperature_start)
+        self.temperature_stop = float(temperature_stop)
+        self._log_hours_start = math.log(self.hours_start)
+        self._log_hours_step = (math.log(self.hours_stop) - self._log_hours_start) / (rows - 1)
+        self._temperature_step = (self.temperature_stop - self.temperature_start) / (columns - 1)
+
+    @classmethod
+    def compute(
+        cls,
+        hours: Tuple[float, float, int] = DEFAULT_HOURS,
+        temperatures: Tuple[float, float, int] = DEFAULT_TEMPERATURES
+    ) -> 'YeastTable':
+        """Evaluate the model on a grid given as (start, stop, points) per axis."""
+        hours_start, hours_stop, rows = _axis(*hours)
+        temperature_start, temperature_stop, columns = _axis(*temperatures)
+        if hours_start <= 0:
+            raise ValueError("fermentation times must be positive")
+        if temperature_start <= MIN_TEMPERATURE or temperature_stop >= MAX_TEMPERATURE:
+            raise ValueError(f"temperatures must lie strictly between {MIN_TEMPERATURE} and {MAX_TEMPERATURE} °C")
+        hour_values = np.geomspace(hours_start, hours_stop, rows)
+        temperature_values = np.linspace(temperature_start, temperature_stop, columns)
+        values = np.log(model_yeast_percentage(hour_values[:, None], temperature_values[None, :]))
+        return cls(np.ascontiguousarray(values), hours_start, hours_stop, temperature_start, temperature_stop)
+
+    def _check_range(self, hours: np.ndarray, temperature: np.ndarray) -> None:
+        # Kleine Toleranz für Rundungsfehler an den Rändern
+        eps = 1e-9
+        if np.any(~(hours >= self.hours_start - eps)) or np.any(~(hours <= self.hours_stop + eps)):
+            raise ValueError(f"fermentation time must be between {self.hours_start:g} and {self.hours_stop:g} hours")
+        if (np.any(~(temperature >= self.temperature_start - eps))
+                or np.any(~(temperature <= self.temperature_stop + eps))):
+            raise ValueError(f"temperature must be between {self.temperature_start:g} "
+                             f"and {self.temperature_stop:g} °C")
+
+    def yeast_percentage(self, hours: float, temperature: float) -> float:
+        """Yeast percentage for one point; pure float arithmetic, four grid reads."""
+        hours = float(hours)
+        temperature = float(temperature)
+        if not (self.hours_start - 1e-9 <= hours <= self.hours_stop + 1e-9
+                and self.temperature_start - 1e-9 <= temperature <= self.temperature_stop + 1e-9):
+            self._check_range(np.float64(hours), np.float64(temperature))
+
+        rows, columns = self.log_values.shape
+        x = (math.log(hours) - self._log_hours_start) / self._log_hours_step
+        y = (temperature - self.temperature_start) / self._temperature_step
+        i = min(max(int(x), 0), rows - 2)
+        j = min(max(int(y), 0), columns - 2)
+        fx = min(max(x - i, 0.0), 1.0)
+        fy = min(max(y - j, 0.0), 1.0)
+        values = self.log_values
+        top = float(values[i, j]) * (1 - fy) + float(values[i, j + 1]) * fy
+        bottom = float(values[i + 1, j]) * (1 - fy) + float(values[i + 1, j + 1]) * fy
+        return math.exp(top * (1 - fx) + bottom * fx)
+
+    def yeast_percentages(self, hours: ArrayLike, temperature: ArrayLike) -> np.ndarray:
+        """
+        Batch query; hours and temperature are broadcast against each other
+
+        Raises:
+            ValueError: If any point lies outside the grid
+        """
+        hours, temperature = np.broadcast_arrays(
+            np.asarray(hours, dtype=np.float64), np.asarray(temperature, dtype=np.float64)
+        )
+        self._check_range(hours, temperature)
+
+        rows, columns = self.log_values.shape
+        x = (np.log(hours) - self._log_hours_start) / self._log_hours_step
+        y = (temperature - self.temperature_start) / self._temperature_step
+        i = np.clip(x.astype(np.int64), 0, rows - 2)
+        j = np.clip(y.astype(np.int64), 0, columns - 2)
+        fx = np.clip(x - i, 0.0, 1.0)
+        fy = np.clip(y - j, 0.0, 1.0)
+        values = self.log_values
+        top = values[i, j] * (1 - fy) + values[i, j + 1] * fy
+        bottom = values[i + 1, j] * (1 - fy) + values[i + 1, j + 1] * fy
+        return np.exp(top * (1 - fx) + bottom * fx)
+
+    def recipe_yeast_percentage(self, recipe: Recipe) -> Decimal:
+        """Suggested yeast_percentage for a recipe's fermentation time and temperature, two places."""
+        value = self.yeast_percentage(recipe.fermentation_time_hours, recipe.fermentation_temperature)
+        return Decimal(int(round(value * 100))).scaleb(-2)
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            'version': FORMAT_VERSION,
+            'shape': list(self.log_values.shape),
+            'hours_start': self.hours_start,
+            'hours_stop': self.hours_stop,
+            'temperature_start': self.temperature_start,
+            'temperature_stop': self.temperature_stop,
+            'model': self.metadata_model()
+        }
+
+    def save(self, path: str) -> None:
+        """Write the grid to ``path`` (.npy) and its axes to ``path + '.json'``."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Erst vollständig schreiben, dann umbenennen: Leser sehen nie eine halbe Datei
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(self.log_values, dtype=np.float64))
+        with open(tmp_path + '.json', 'w', encoding='utf-8') as f:
+            json.dump(self.metadata(), f, indent=2)
+        os.replace(tmp_path + '.json', path + '.json')
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'YeastTable':
+        """
+        Load a saved grid, memory-mapped read-only by default
+
+        Raises:
+            ValueError: If the sidecar does not match the grid or the model
+        """
+        with open(path + '.json', encoding='utf-8') as f:
+            metadata = json.load(f)
+        if metadata.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported yeast table version {metadata.get('version')!r}")
+        log_values = np.load(path, mmap_mode='r' if mmap else None)
+        if list(log_values.shape) != metadata['shape']:
+            raise ValueError(f"{path}: grid shape {log_values.shape} does not match its metadata")
+        if metadata['model'] != cls.metadata_model():
+            raise ValueError(f"{path}: grid was built with different model parameters")
+        return cls(
+            log_values,
+            metadata['hours_start'],
+            metadata['hours_stop'],
+            metadata['temperature_start'],
+            metadata['temperature_stop']
+        )
+
+    @staticmethod
+    def metadata_model() -> Dict[str, Any]:
+        return {
+            'min_temperature': MIN_TEMPERATURE,
+            'optimum_temperature': OPTIMUM_TEMPERATURE,
+            'max_temperature': MAX_TEMPERATURE,
+            'max_growth_rate': MAX_GROWTH_RATE,
+            'reference': [REFERENCE_HOURS, REFERENCE_TEMPERATURE, REFERENCE_YEAST_PERCENTAGE]
+        }
+
+
+_table: Optional[YeastTable] = None
+_table_lock = threading.Lock()
+
+
+def get_yeast_table() -> YeastTable:
+    """
+    Shared table of the process
+
+    Loaded memory-mapped from $YEAST_TABLE_PATH if that file exists,
+    computed with the default grid otherwise. Built once: by the ASGI app
+    at startup (src/asgi.py lifespan), otherwise on first use.
+    """
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                path = os.environ.get(TABLE_PATH_ENV)
+                if path and os.path.exists(path):
+                    _table = YeastTable.load(path)
+                else:
+                    _table = YeastTable.compute()
+    return _table
+
+
+def yeast_percentage(hours: float, temperature: float) -> float:
+    """Yeast percentage for one time/temperature point from the shared table."""
+    return get_yeast_table().yeast_percentage(hours, temperature)
+
+
+def yeast_percentages(hours: ArrayLike, temperature: ArrayLike) -> np.ndarray:
+    """Batch variant of yeast_percentage()."""
+    return get_yeast_table().yeast_percentages(hours, temperature)
+
+
+def main(argv: Optional[Any] = None) -> None:
+    parser = argparse.ArgumentParser(description="Precompute the yeast table for $YEAST_TABLE_PATH")
+    parser.add_argument('path', help='output .npy file; the JSON sidecar is written next to it')
+    args = parser.parse_args(argv)
+    table = YeastTable.compute()
+    table.save(args.path)
+    rows, columns = table.log_values.shape
+    print(f"Wrote {rows}x{columns} grid to {args.path}")
+
+
+if __name__ == '__main__':
+    main()
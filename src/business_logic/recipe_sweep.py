@@ -0,0 +1,321 @@
+"""
+Parameter sweeps over a base recipe.
+
+Takes a base ``Recipe`` and value ranges for some of its percentages and
+the ball weight, and evaluates every combination with compute_dough_arrays().
+The grid is never materialized as a whole: it is processed in chunks of
+flat grid indices (np.unravel_index), filtered on the arrays and returned
+page by page or streamed row by row, so memory stays bounded by the chunk
+size even for millions of points.
+
+Grid order is row-major over SWEEP_PARAMETERS: the last parameter
+(pizza_weight) varies fastest. A row's ``index`` is its flat grid index and
+doubles as the cursor for paging.
+"""
+
+import json
+import math
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.database.models import Calculation, Recipe
+
+from .dough_calculation import (
+    DEFAULT_PREFERMENT_HYDRATION,
+    DEFAULT_PREFERMENT_YEAST_PERCENTAGE,
+    PERCENTAGE_FIELDS,
+    RESULT_FIELDS,
+    compute_dough_arrays,
+)
+
+# Parameters that can be swept, in grid order
+SWEEP_PARAMETERS = (
+    'water_percentage',
+    'salt_percentage',
+    'yeast_percentage',
+    'preferment_percentage',
+    'pizza_weight'
+)
+
+# Fields that can be filtered on
+FILTER_FIELDS = SWEEP_PARAMETERS + ('total_dough',) + RESULT_FIELDS
+
+MAX_SWEEP_POINTS = 10_000_000
+MAX_AXIS_VALUES = 100_000
+DEFAULT_CHUNK_SIZE = 65_536
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 10_000
+
+Number = Union[int, float, Decimal]
+
+
+class SweepRange(NamedTuple):
+    """Evenly spaced values from start to stop (inclusive) in steps of step"""
+    start: float
+    stop: float
+    step: float
+
+    def values(self) -> np.ndarray:
+        if not all(math.isfinite(value) for value in self):
+            raise ValueError("start, stop and step must be finite")
+        if self.step <= 0:
+            raise ValueError("step must be positive")
+        if self.stop < self.start:
+            raise ValueError("stop must not be less than start")
+        # Kleine Toleranz, damit z.B. 60..70 in 0.1-Schritten 70 enthält
+        count = int(math.floor((self.stop - self.start) / self.step + 1e-9)) + 1
+        if count > MAX_AXIS_VALUES:
+            raise ValueError(f"range yields more than {MAX_AXIS_VALUES} values")
+        return np.round(self.start + np.arange(count) * self.step, 10)
+
+
+AxisSpec = Union[Number, SweepRange, Sequence[Number]]
+
+
+class SweepChunk(NamedTuple):
+    """Filtered rows of one chunk: flat grid index, parameter and result arrays"""
+    index: np.ndarray
+    parameters: Dict[str, np.ndarray]
+    results: Dict[str, np.ndarray]
+
+
+class SweepPage(NamedTuple):
+    rows: List[Dict[str, Any]]
+    next_cursor: Optional[int]
+
+
+def _axis_values(name: str, spec: AxisSpec) -> np.ndarray:
+    if isinstance(spec, SweepRange):
+        values = spec.values()
+    elif isinstance(spec, (int, float, Decimal)):
+        values = np.array([float(spec)])
+    else:
+        values = np.fromiter((float(value) for value in spec), dtype=np.float64)
+        if len(values) > MAX_AXIS_VALUES:
+            raise ValueError(f"{name}: more than {MAX_AXIS_VALUES} values")
+    if len(values) == 0:
+        raise ValueError(f"{name}: no values")
+    if not np.all(np.isfinite(values)) or np.any(values < 0):
+        raise ValueError(f"{name}: values must be finite and non-negative")
+    if name == 'pizza_weight' and np.any(values <= 0):
+        raise ValueError("pizza_weight: values must be positive")
+    return values
+
+
+class RecipeSweep:
+    """
+    Lazily evaluated grid of recipe variants
+
+    Args:
+        base: Recipe supplying all values that are not swept
+        ranges: Parameter name (SWEEP_PARAMETERS) -> SweepRange, list of values or scalar
+        number_of_pizzas: Dough balls per variant
+        pizza_weight: Ball weight if it is not swept
+        filters: Field name (FILTER_FIELDS) -> (min, max), either bound may be None
+        preferment_hydration: Preferment hydration in percent
+        preferment_yeast_percentage: Preferment yeast in percent of its flour
+
+    Raises:
+        ValueError: For unknown names, invalid ranges or grids above MAX_SWEEP_POINTS
+    """
+
+    def __init__(
+        self,
+        base: Recipe,
+        ranges: Mapping[str, AxisSpec],
+        number_of_pizzas: int = Calculation.number_of_pizzas,
+        pizza_weight: Number = Calculation.pizza_weight,
+        filters: Optional[Mapping[str, Tuple[Optional[Number], Optional[Number]]]] = None,
+        preferment_hydration: float = DEFAULT_PREFERMENT_HYDRATION,
+        preferment_yeast_percentage: float = DEFAULT_PREFERMENT_YEAST_PERCENTAGE
+    ):
+        unknown = set(ranges) - set(SWEEP_PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown sweep parameter(s): {', '.join(sorted(unknown))}")
+        unknown = set(filters or ()) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown filter field(s): {', '.join(sorted(unknown))}")
+        if number_of_pizzas < 1:
+            raise ValueError("number_of_pizzas must be at least 1")
+
+        defaults = {name: getattr(base, name) for name in SWEEP_PARAMETERS if name != 'pizza_weight'}
+        defaults['pizza_weight'] = pizza_weight
+        self.axes: Dict[str, np.ndarray] = {
+            name: _axis_values(name, ranges.get(name, defaults[name])) for name in SWEEP_PARAMETERS
+        }
+        self.shape = tuple(len(values) for values in self.axes.values())
+        self.size = math.prod(self.shape)
+        if self.size > MAX_SWEEP_POINTS:
+            raise ValueError(f"Sweep has {self.size} points, at most {MAX_SWEEP_POINTS} are allowed")
+
+        # Nicht variierte Prozente kommen unverändert aus dem Basisrezept
+        self._fixed = {name: float(getattr(base, name)) for name in PERCENTAGE_FIELDS if name not in self.axes}
+        self.number_of_pizzas = int(number_of_pizzas)
+        self.filters = {
+            name: (None if low is None else float(low), None if high is None else float(high))
+            for name, (low, high) in (filters or {}).items()
+        }
+        self.preferment_hydration = preferment_hydration
+        self.preferment_yeast_percentage = preferment_yeast_percentage
+
+    def evaluate(self, start: int, stop: int) -> SweepChunk:
+        """Evaluate grid indices [start, stop) and apply the filters."""
+        index = np.arange(max(start, 0), min(stop, self.size), dtype=np.int64)
+        positions = np.unravel_index(index, self.shape)
+        parameters = {name: values[position] for (name, values), position in zip(self.axes.items(), positions)}
+
+        percentages = dict(self._fixed)
+        percentages.update({name: values for name, values in parameters.items() if name != 'pizza_weight'})
+        results = compute_dough_arrays(
+            percentages,
+            self.number_of_pizzas,
+            parameters['pizza_weight'],
+            self.preferment_hydration,
+            self.preferment_yeast_percentage
+        )
+        results = dict(results)
+        results['total_dough'] = self.number_of_pizzas * parameters['pizza_weight']
+
+        if self.filters:
+            keep = np.ones(len(index), dtype=bool)
+            for name, (low, high) in self.filters.items():
+                values = parameters[name] if name in parameters else results[name]
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+            if not keep.all():
+                index = index[keep]
+                parameters = {name: values[keep] for name, values in parameters.items()}
+                results = {name: values[keep] for name, values in results.items()}
+        return SweepChunk(index, parameters, results)
+
+    def chunks(self, start: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[SweepChunk]:
+        """Filtered chunks from grid index ``start`` to the end; empty chunks are skipped."""
+        for chunk_start in range(start, self.size, chunk_size):
+            chunk = self.evaluate(chunk_start, chunk_start + chunk_size)
+            if len(chunk.index):
+                yield chunk
+
+    def count(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """Number of grid points passing the filters."""
+        if not self.filters:
+            return self.size
+        return sum(len(chunk.index) for chunk in self.chunks(chunk_size=chunk_size))
+
+    def rows(self, start: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """Filtered rows as dictionaries, amounts rounded to two places."""
+        for chunk in self.chunks(start, chunk_size):
+            yield from chunk_rows(chunk)
+
+    def page(self, cursor: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> SweepPage:
+        """
+        Up to ``limit`` filtered rows from grid index ``cursor`` on
+
+        next_cursor is the grid index to continue from, None at the end.
+        """
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        if cursor < 0:
+            raise ValueError("cursor must not be negative")
+        rows: List[Dict[str, Any]] = []
+        # Ohne Filter genügt genau ein Block der Seitengröße
+        chunk_size = limit if not self.filters else max(limit, DEFAULT_CHUNK_SIZE)
+        for chunk in self.chunks(cursor, chunk_size):
+            missing = limit - len(rows)
+            if len(chunk.index) >= missing:
+                rows.extend(chunk_rows(chunk, missing))
+                last = rows[-1]['index'] + 1
+                return SweepPage(rows, last if last < self.size else None)
+            rows.extend(chunk_rows(chunk))
+        return SweepPage(rows, None)
+
+
+def chunk_rows(chunk: SweepChunk, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Rows of a chunk; one tolist() per column instead of per value."""
+    columns = {'index': chunk.index[:limit].tolist()}
+    for name, values in list(chunk.parameters.items()) + list(chunk.results.items()):
+        columns[name] = np.round(values[:limit], 2).tolist()
+    names = list(columns)
+    for values in zip(*columns.values()):
+        yield dict(zip(names, values))
+
+
+def iter_ndjson(sweep: RecipeSweep, start: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Filtered rows as NDJSON, one bytes block per chunk."""
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+    for chunk in sweep.chunks(start, chunk_size):
+        yield ''.join(dumps(row) + '\n' for row in chunk_rows(chunk)).encode('utf-8')
+
+
+def _axis_spec(name: str, spec: Any) -> AxisSpec:
+    if isinstance(spec, dict):
+        try:
+            sweep_range = SweepRange(float(spec['start']), float(spec['stop']), float(spec['step']))
+        except KeyError as e:
+            raise ValueError(f"ranges.{name}: missing {e.args[0]!r}")
+        except (TypeError, ValueError):
+            raise ValueError(f"ranges.{name}: start, stop and step must be numbers")
+        # json.loads akzeptiert Infinity und NaN
+        if not all(math.isfinite(value) for value in sweep_range):
+            raise ValueError(f"ranges.{name}: start, stop and step must be finite")
+        return sweep_range
+    if isinstance(spec, list):
+        return spec
+    if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+        return spec
+    raise ValueError(f"ranges.{name}: expected {{start, stop, step}}, a list or a number")
+
+
+def parse_sweep_request(data: Any) -> Tuple[RecipeSweep, int, int]:
+    """
+    Build a sweep from a JSON request body
+
+    Body: {"base": {<percentage fields>}, "ranges": {<parameter>: {"start", "stop", "step"}
+    | [values] | value}, "number_of_pizzas", "pizza_weight", "filters": {<field>: {"min", "max"}},
+    "cursor", "limit"}
+
+    Returns:
+        (sweep, cursor, limit)
+
+    Raises:
+        ValueError: With a message for the client
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be an object")
+    base = data.get('base') or {}
+    ranges = data.get('ranges') or {}
+    filters = data.get('filters') or {}
+    if not isinstance(base, dict) or not isinstance(ranges, dict) or not isinstance(filters, dict):
+        raise ValueError("base, ranges and filters must be objects")
+
+    unknown = set(base) - set(PERCENTAGE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown base field(s): {', '.join(sorted(unknown))}")
+    try:
+        values = {name: Decimal(str(value)) for name, value in base.items()}
+        if not all(value.is_finite() for value in values.values()):
+            raise ValueError("base values must be finite numbers")
+        recipe = Recipe(**values)
+        number_of_pizzas = int(data.get('number_of_pizzas', Calculation.number_of_pizzas))
+        pizza_weight = float(data.get('pizza_weight', Calculation.pizza_weight))
+        cursor = int(data.get('cursor', 0))
+        limit = int(data.get('limit', DEFAULT_PAGE_SIZE))
+        bounds = {}
+        for name, bound in filters.items():
+            if not isinstance(bound, dict):
+                raise ValueError(f"filters.{name}: expected {{min, max}}")
+            bounds[name] = tuple(None if bound.get(key) is None else float(bound[key]) for key in ('min', 'max'))
+    except (ArithmeticError, TypeError):
+        raise ValueError("base, number_of_pizzas, pizza_weight, cursor, limit and filters must be numbers")
+
+    sweep = RecipeSweep(
+        recipe,
+        {name: _axis_spec(name, spec) for name, spec in ranges.items()},
+        number_of_pizzas=number_of_pizzas,
+        pizza_weight=pizza_weight,
+        filters=bounds
+    )
+    return sweep, cursor, limit
@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from heapq import heapify, heappop, heappush
+from typing import Any, Dict, List, Optional
+
+from .timing import calculate_timing_schedule
+
+
+@dataclass
+class ProductionCapacity:
+    """Anzahl gleichzeitig nutzbarer Ressourcen"""
+    mixers: int = 1
+    proofing_slots: int = 4
+    oven_slots: int = 1
+
+
+# Ressource -> (Startschlüssel, Endschlüssel) im Zeitplan von calculate_timing_schedule.
+# Die Gärfläche ist von Beginn der Stockgare bis zum Ende der Stückgare belegt.
+RESOURCE_STEPS = {
+    'mixers': ('knet_start', 'knet_ende'),
+    'proofing_slots': ('stockgare_start', 'stueckgare_ende'),
+    'oven_slots': ('back_start', 'back_ende')
+}
+
+# Schlüssel der Ressourcen-Zuordnung im Zeitplan eines Auftrags
+_ASSIGNMENT_KEYS = {
+    'mixers': 'mixer',
+    'proofing_slots': 'proofing_slot',
+    'oven_slots': 'oven_slot'
+}
+
+
+def _step_minutes(recipe_data: Dict[str, Any]) -> Dict[str, float]:
+    """Dauer vom Ende des Ressourcen-Schritts bis zum Backende (in Minuten)"""
+    back_zeit = recipe_data.get('back_zeit', 30)
+    stueckgare_zeit = recipe_data.get('stueckgare_zeit', 60)
+    portionier_zeit = recipe_data.get('portionier_zeit', 15)
+    stockgare_zeit = recipe_data.get('stockgare_zeit', 120)
+    return {
+        'oven_slots': 0,
+        'proofing_slots': back_zeit,
+        'mixers': back_zeit + stueckgare_zeit + portionier_zeit + stockgare_zeit
+    }
+
+
+def schedule_production(
+    orders: List[Dict[str, Any]],
+    capacity: Optional[ProductionCapacity] = None,
+    earliest_start: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Plant viele Aufträge rückwärts von ihren Fertigstellungszeitpunkten gegen
+    begrenzte Kneter, Gärflächen und Ofenplätze.
+
+    Die Aufträge werden mit der spätesten Deadline zuerst eingeplant, jeder so
+    spät wie möglich. Pro Ressource liegt ein Heap mit dem Zeitpunkt, bis zu dem
+    jede Einheit frei ist; die Einheit mit der spätesten Freigabe wird belegt.
+    Da alle Schritte eines Auftrags lückenlos aufeinander folgen, ergibt sich
+    das Backende als Minimum aus Deadline und den Freigaben aller Ressourcen
+    (abzüglich der nachfolgenden Schritte). Laufzeit O(n log n + n log k).
+
+    Args:
+        orders: Aufträge mit 'order_id', 'target_finish_time' und optional
+            'recipe_data' (Schrittzeiten wie bei calculate_timing_schedule)
+        capacity: Verfügbare Ressourcen, Standard: ProductionCapacity()
+        earliest_start: Frühester möglicher Produktionsbeginn; Aufträge, die
+            davor beginnen müssten, werden als verspätet gemeldet
+
+    Returns:
+        Dictionary mit
+            'schedules': order_id -> Zeitplan mit denselben Schlüsseln wie
+                calculate_timing_schedule plus Ressourcen-Zuordnung
+            'late_orders': Liste mit 'order_id', 'target_finish_time' und
+                'delay_minutes' (Mindestverspätung bei Start zu earliest_start)
+            'utilization': Ressource -> Auslastung zwischen 0 und 1
+    """
+    capacity = capacity or ProductionCapacity()
+    counts = {resource: getattr(capacity, resource) for resource in RESOURCE_STEPS}
+    for resource, count in counts.items():
+        if count < 1:
+            raise ValueError(f"Capacity for {resource} must be at least 1")
+
+    if not orders:
+        return {'schedules': {}, 'late_orders': [], 'utilization': {r: 0.0 for r in counts}}
+
+    # Prioritätswarteschlange: späteste Deadline zuerst
+    reference = max(order['target_finish_time'] for order in orders)
+    queue = [
+        ((reference - order['target_finish_time']).total_seconds(), position, order)
+        for position, order in enumerate(orders)
+    ]
+    heapify(queue)
+
+    # Zeiten werden als Sekunden vor reference geführt (größer = früher).
+    # Pro Ressource: Heap aus (frei_bis, Einheit), oben die am spätesten freie Einheit.
+    free_until = {
+        resource: [(float('-inf'), unit) for unit in range(count)]
+        for resource, count in counts.items()
+    }
+    busy_seconds = {resource: 0.0 for resource in counts}
+
+    schedules = {}
+    late_orders = []
+    first_start = None
+    last_end = None
+
+    while queue:
+        deadline_offset, _, order = heappop(queue)
+        recipe_data = order.get('recipe_data') or {}
+        offsets = _step_minutes(recipe_data)
+
+        # Spätestes Backende (in Sekunden vor reference) über alle Ressourcen
+        units = {}
+        back_end_offset = deadline_offset
+        for resource, heap in free_until.items():
+            free_offset, unit = heappop(heap)
+            units[resource] = unit
+            back_end_offset = max(back_end_offset, free_offset - offsets[resource] * 60)
+
+        back_end = reference - timedelta(seconds=back_end_offset)
+        schedule = calculate_timing_schedule(recipe_data, back_end)
+
+        for resource, (start_key, end_key) in RESOURCE_STEPS.items():
+            start_offset = (reference - schedule[start_key]).total_seconds()
+            heappush(free_until[resource], (start_offset, units[resource]))
+            busy_seconds[resource] += (schedule[end_key] - schedule[start_key]).total_seconds()
+            schedule[_ASSIGNMENT_KEYS[resource]] = units[resource]
+
+        start = schedule['produktion_start']
+        schedule['late'] = earliest_start is not None and start < earliest_start
+        if schedule['late']:
+            late_orders.append({
+                'order_id': order['order_id'],
+                'target_finish_time': order['target_finish_time'],
+                'delay_minutes': (earliest_start - start).total_seconds() / 60
+            })
+
+        first_start = start if first_start is None else min(first_start, start)
+        last_end = back_end if last_end is None else max(last_end, back_end)
+        schedules[order['order_id']] = schedule
+
+    horizon = (last_end - first_start).total_seconds()
+    utilization = {
+        resource: (busy_seconds[resource] / (horizon * counts[resource])) if horizon > 0 else 0.0
+        for resource in counts
+    }
+    late_orders.sort(key=lambda late: late['target_finish_time'])
+
+    return {
+        'schedules': schedules,
+        'late_orders': late_orders,
+        'utilization': utilization
+    }
@@ -0,0 +1,426 @@
+"""
+Sync logic for the /api/sync endpoint, independent of the web framework.
+"""
+
+import json
+import logging
+from itertools import repeat
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+)
+
+if TYPE_CHECKING:
+    from .sync_index import SyncIndex
+
+# Maximum number of items in a single application/json request
+MAX_JSON_ITEMS = 1000
+
+# Defaults for application/x-ndjson uploads
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+MAX_STREAM_ITEMS = 100000
+MAX_LINE_BYTES = 1024 * 1024
+
+
+class SyncError(ValueError):
+    """
+    Raised when a sync payload is rejected.
+
+    Carries the progress of a streamed upload, so the client knows which
+    batches were committed before the error.
+    """
+
+    def __init__(self, message: str, synced_count: int = 0, batches: Optional[List[Dict[str, int]]] = None):
+        super().__init__(message)
+        self.message = message
+        self.synced_count = synced_count
+        self.batches = batches or []
+
+
+def validate_item(item: Any, index: int) -> Optional[str]:
+    """
+    Check a single data item.
+
+    Returns:
+        Error message, or None if the item is valid
+    """
+    if not isinstance(item, dict):
+        return f'Data item at index {index} must be an object'
+    if 'id' not in item:
+        return f'Data item at index {index} missing required field: id'
+    return None
+
+
+def validate_items(items: List[Any]) -> Optional[str]:
+    """
+    Check all data items of a JSON payload.
+
+    Valid payloads are checked with one C-level pass; the per-item loop
+    only runs to find and word the first error.
+
+    Returns:
+        Error message of the first invalid item, or None if all are valid
+    """
+    try:
+        # dict.__contains__ wirft TypeError für Nicht-Objekte
+        if all(map(dict.__contains__, items, repeat('id'))):
+            return None
+    except TypeError:
+        pass
+    for i, item in enumerate(items):
+        error = validate_item(item, i)
+        if error:
+            return error
+    return None
+
+
+def payload_items(data: Any, max_items: int = MAX_JSON_ITEMS) -> List[Dict[str, Any]]:
+    """
+    Validated data items of a parsed application/json payload ({"data": [...]}).
+
+    Raises:
+        SyncError: On the first problem, worded like the error responses of /api/sync
+    """
+    # Validate required fields
+    if not isinstance(data, dict) or 'data' not in data:
+        raise SyncError('Missing required field: data')
+    items = data['data']
+    if not isinstance(items, list):
+        raise SyncError('Field "data" must be an array')
+
+    # Edge case: data array too large
+    if len(items) > max_items:
+        raise SyncError(f'Data array too large. Maximum {max_items} items allowed')
+
+    # Validate each data item
+    error = validate_items(items)
+    if error:
+        raise SyncError(error)
+    return items
+
+
+def parse_json_payload(raw: bytes, max_items: int = MAX_JSON_ITEMS) -> List[Dict[str, Any]]:
+    """
+    Parse and validate a raw application/json body.
+
+    Raises:
+        SyncError: Also for malformed JSON and a null payload
+    """
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        raise SyncError('Invalid JSON format') from None
+    if data is None:
+        raise SyncError('Invalid JSON payload')
+    return payload_items(data, max_items)
+
+
+def commit_batch(items: List[Dict[str, Any]]) -> int:
+    """
+    Write one batch of validated items to the cloud.
+
+    Returns:
+        Number of synced items
+    """
+    # Simulate sync process
+    logging.debug(f"Committing batch of {len(items)} items")
+    return len(items)
+
+
+def iter_ndjson_lines(readline: Callable[[int], bytes], max_line_bytes: int = MAX_LINE_BYTES) -> Iterator[bytes]:
+    """
+    Read an NDJSON body line by line without loading it completely.
+
+    Args:
+        readline: readline(limit) of the request stream
+        max_line_bytes: Maximum size of a single line
+
+    Yields:
+        Non-empty lines
+
+    Raises:
+        SyncError: If a line exceeds max_line_bytes
+    """
+    index = 0
+    while True:
+        line = readline(max_line_bytes + 1)
+        if not line:
+            return
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            raise SyncError(f'Data item at index {index} exceeds maximum size of {max_line_bytes} bytes')
+        if line.strip():
+            index += 1
+            yield line
+
+
+async def aiter_ndjson_lines(
+    chunks: AsyncIterable[bytes],
+    max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[bytes]:
+    """
+    Split an asynchronous body stream (e.g. ASGI request chunks) into lines.
+
+    Yields:
+        Non-empty lines
+
+    Raises:
+        SyncError: If a line exceeds max_line_bytes
+    """
+    index = 0
+    buffer = b''
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b'\n', start)
+            if end == -1:
+                break
+            line = buffer[start:end + 1]
+            start = end + 1
+            if len(line) > max_line_bytes + 1:
+                raise SyncError(f'Data item at index {index} exceeds maximum size of {max_line_bytes} bytes')
+            if line.strip():
+                index += 1
+                yield line
+        buffer = buffer[start:]
+        if len(buffer) > max_line_bytes:
+            raise SyncError(f'Data item at index {index} exceeds maximum size of {max_line_bytes} bytes')
+    if buffer.strip():
+        yield buffer
+
+
+class NdjsonBatcher:
+    """
+    Incremental NDJSON sync: feed lines one by one, commit in batches.
+
+    Shared by the blocking (sync_ndjson) and the asynchronous request
+    handlers. Only one batch is held in memory at a time. A batch is
+    committed only if all of its items are valid; batches committed before
+    an error stay committed.
+
+    With a SyncIndex, only created and updated items of a batch are
+    committed; unchanged ones count as synced without being written.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_items: int = MAX_STREAM_ITEMS,
+        commit: Callable[[List[Dict[str, Any]]], int] = commit_batch,
+        index: Optional['SyncIndex'] = None
+    ):
+        self.batch_size = batch_size
+        self.max_items = max_items
+        self.commit = commit
+        self.index = index
+        self.synced_count = 0
+        self.counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+        self.batches: List[Dict[str, int]] = []
+        self._batch: List[Dict[str, Any]] = []
+        self._index = 0
+
+    def add_line(self, line: bytes) -> None:
+        """
+        Parse, validate and buffer one line; commits when the batch is full.
+
+        Raises:
+            SyncError: On an invalid item or too many items, with the progress so far
+        """
+        index = self._index
+        if index >= self.max_items:
+            raise SyncError(
+                f'Data stream too large. Maximum {self.max_items} items allowed',
+                self.synced_count, self.batches
+            )
+        try:
+            item = json.loads(line)
+        except ValueError:
+            raise SyncError(f'Invalid JSON at index {index}', self.synced_count, self.batches)
+
+        error = validate_item(item, index)
+        if error:
+            raise SyncError(error, self.synced_count, self.batches)
+
+        self._index += 1
+        self._batch.append(item)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def finish(self) -> Tuple[int, List[Dict[str, int]]]:
+        """Commit the last partial batch and return the synced count and per-batch progress."""
+        if self._batch:
+            self._flush()
+        return self.synced_count, self.batches
+
+    def _flush(self) -> None:
+        progress = {'batch': len(self.batches) + 1, 'items': len(self._batch)}
+        if self.index is None:
+            self.synced_count += self.commit(self._batch)
+        else:
+            counts = commit_delta(self._batch, self.index, self.commit)
+            self.synced_count += counts['created'] + counts['updated'] + counts['unchanged']
+            for name, count in counts.items():
+                self.counts[name] += count
+            progress.update(counts)
+        progress['synced_count'] = self.synced_count
+        self.batches.append(progress)
+        self._batch = []
+
+
+def sync_ndjson(
+    lines: Iterable[bytes],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_items: int = MAX_STREAM_ITEMS,
+    commit: Callable[[List[Dict[str, Any]]], int] = commit_batch,
+    index: Optional['SyncIndex'] = None
+) -> Tuple[int, List[Dict[str, int]]]:
+    """
+    Parse, validate and commit an NDJSON upload in batches.
+
+    Args:
+        lines: Non-empty NDJSON lines, one item each
+        batch_size: Items per commit
+        max_items: Maximum number of items per upload
+        commit: Callable that writes one batch and returns the synced count
+        index: Content-hash index; unchanged items are then skipped
+
+    Returns:
+        Tuple of synced item count and per-batch progress
+
+    Raises:
+        SyncError: On the first invalid item, with the progress so far
+    """
+    batcher = NdjsonBatcher(batch_size, max_items, commit, index)
+    for line in lines:
+        batcher.add_line(line)
+    return batcher.finish()
+
+
+def ndjson_response(
+    synced_count: int,
+    batches: List[Dict[str, int]],
+    counts: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """Response body of a successful NDJSON upload; counts from a delta sync are included."""
+    if synced_count == 0:
+        return {
+            'message': 'No data to sync',
+            'synced_count': 0,
+            'batches': [],
+            'status': 'success'
+        }
+
+    logging.info(f"Synced {synced_count} items to cloud in {len(batches)} batches")
+
+    return {
+        'message': 'Data synchronized successfully',
+        'synced_count': synced_count,
+        **(counts or {}),
+        'batches': batches,
+        'status': 'success'
+    }
+
+
+def sync_error_response(error: SyncError) -> Dict[str, Any]:
+    """Response body of a rejected NDJSON upload."""
+    return {
+        'error': error.message,
+        'synced_count': error.synced_count,
+        'batches': error.batches
+    }
+
+
+def commit_delta(
+    items: List[Dict[str, Any]],
+    index: 'SyncIndex',
+    commit: Callable[[List[Dict[str, Any]]], int] = commit_batch
+) -> Dict[str, int]:
+    """
+    Commit only the created and updated items of a validated batch
+
+    The index is updated after the commit, so items of a failed commit are
+    written again on the next upload.
+
+    Returns:
+        Created, updated and unchanged counts
+    """
+    delta = index.diff(items)
+    if delta.entries:
+        commit(delta.changed)
+        index.record(delta)
+    return delta.counts()
+
+
+def sync_json(
+    data: Any,
+    index: Optional['SyncIndex'] = None,
+    commit: Callable[[List[Dict[str, Any]]], int] = commit_batch
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Validate and sync a parsed application/json payload ({"data": [...]}).
+
+    With a SyncIndex only created and updated items are committed, and the
+    response reports created, updated and unchanged counts. synced_count
+    stays the number of accepted items.
+
+    Returns:
+        Tuple of response body and HTTP status
+    """
+    try:
+        items = payload_items(data)
+    except SyncError as e:
+        return {'error': e.message}, 400
+    return _sync_items(items, index, commit)
+
+
+def sync_json_bytes(
+    raw: bytes,
+    index: Optional['SyncIndex'] = None,
+    commit: Callable[[List[Dict[str, Any]]], int] = commit_batch
+) -> Tuple[Dict[str, Any], int]:
+    """
+    sync_json() for the raw request body, including the JSON parse errors.
+
+    Returns:
+        Tuple of response body and HTTP status
+    """
+    try:
+        items = parse_json_payload(raw)
+    except SyncError as e:
+        return {'error': e.message}, 400
+    return _sync_items(items, index, commit)
+
+
+def _sync_items(
+    items: List[Dict[str, Any]],
+    index: Optional['SyncIndex'],
+    commit: Callable[[List[Dict[str, Any]]], int]
+) -> Tuple[Dict[str, Any], int]:
+    """Commit validated items and build the success response."""
+    # Edge case: empty data array
+    if not items:
+        return {
+            'message': 'No data to sync',
+            'synced_count': 0,
+            'status': 'success'
+        }, 200
+
+    counts: Dict[str, int] = {}
+    if index is None:
+        commit(items)
+    else:
+        counts = commit_delta(items, index, commit)
+    synced_count = len(items)
+
+    # Log sync operation
+    logging.info(f"Synced {synced_count} items to cloud" + (
+        f" ({counts['created']} created, {counts['updated']} updated, {counts['unchanged']} unchanged)"
+        if counts else ''
+    ))
+
+    return {
+        'message': 'Data synchronized successfully',
+        'synced_count': synced_count,
+        **counts,
+        'status': 'success'
+    }, 200
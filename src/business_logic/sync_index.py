@@ -0,0 +1,202 @@
+"""
+Content-hash index for delta sync.
+
+Remembers a hash of the last synced content of every item id, so items a
+client re-sends unchanged are recognized before anything is written. The
+index lives in a local SQLite file (WAL mode) with an LRU cache of recently
+seen ids in front of it; lookups for a whole batch take one query for the
+ids that are not cached.
+
+Several workers may share the file. SQLite's data_version changes when
+another connection commits, so every lookup checks it first and drops the
+cache once another worker has recorded hashes; a client re-sending an old
+version to a different worker is then seen as changed.
+
+Hashes are recorded only after the batch was committed (SyncIndex.record),
+so a failed write leaves the items "changed" and they are written again on
+the next upload.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.cache import LRUCache
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+INDEX_PATH = os.path.join(BASE_DIR, 'data', 'sync_index.db')
+INDEX_PATH_ENV = 'SYNC_INDEX_PATH'
+
+DEFAULT_CACHE_SIZE = 100_000
+
+# SQLite erlaubt höchstens 999 Parameter pro Statement (ältere Versionen)
+_LOOKUP_CHUNK = 900
+
+_MISSING = object()
+
+
+def item_key(item_id: Any) -> str:
+    """Index key of an item id; keeps 1 and "1" apart."""
+    return json.dumps(item_id, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def content_hash(item: Dict[str, Any]) -> bytes:
+    """Hash of an item's canonical JSON (sorted keys, compact separators)."""
+    canonical = json.dumps(item, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).digest()
+
+
+class SyncDelta(NamedTuple):
+    """Items of a batch split by their state in the index"""
+    created: List[Dict[str, Any]]
+    updated: List[Dict[str, Any]]
+    unchanged: int
+    # (key, hash) of created and updated items, for SyncIndex.record()
+    entries: List[Tuple[str, bytes]]
+
+    @property
+    def changed(self) -> List[Dict[str, Any]]:
+        return self.created + self.updated
+
+    def counts(self) -> Dict[str, int]:
+        return {'created': len(self.created), 'updated': len(self.updated), 'unchanged': self.unchanged}
+
+
+class SyncIndex:
+    """
+    Item id -> content hash, persisted in SQLite
+
+    Args:
+        path: SQLite file, ':memory:' for a process-local index
+        cache_size: Ids kept in the in-memory LRU cache
+    """
+
+    def __init__(self, path: str = INDEX_PATH, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.path = path
+        if path != ':memory:':
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ':memory:':
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                "item_key TEXT PRIMARY KEY, hash BLOB NOT NULL, synced_at REAL NOT NULL) WITHOUT ROWID"
+            )
+        self._cache: LRUCache[bytes] = LRUCache(cache_size)
+        self._data_version: Optional[int] = None
+
+    def _check_version(self) -> None:
+        """Drop the cache if another connection committed since the last check (lock held)."""
+        version = self._connection.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._cache.clear()
+            self._data_version = version
+
+    def _lookup(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        """Stored hashes of the given keys; cache first, then one query per chunk of misses."""
+        found: Dict[str, bytes] = {}
+        misses = []
+        with self._lock:
+            self._check_version()
+        for key in keys:
+            value = self._cache.get(key, _MISSING)
+            if value is _MISSING:
+                misses.append(key)
+            else:
+                found[key] = value
+        if misses:
+            with self._lock:
+                for start in range(0, len(misses), _LOOKUP_CHUNK):
+                    chunk = misses[start:start + _LOOKUP_CHUNK]
+                    rows = self._connection.execute(
+                        f"SELECT item_key, hash FROM items WHERE item_key IN ({', '.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    for key, digest in rows:
+                        found[key] = digest
+                        self._cache.put(key, digest)
+        return found
+
+    def diff(self, items: Sequence[Dict[str, Any]]) -> SyncDelta:
+        """
+        Split validated items (each with an 'id') into created, updated and unchanged
+
+        An id repeated within the batch is compared against its previous
+        occurrence, like sequential uploads would be.
+        """
+        keys = [item_key(item['id']) for item in items]
+        known = self._lookup(list(dict.fromkeys(keys)))
+        created: List[Dict[str, Any]] = []
+        updated: List[Dict[str, Any]] = []
+        entries: List[Tuple[str, bytes]] = []
+        unchanged = 0
+        for key, item in zip(keys, items):
+            digest = content_hash(item)
+            previous = known.get(key)
+            if previous == digest:
+                unchanged += 1
+                continue
+            (created if previous is None else updated).append(item)
+            entries.append((key, digest))
+            known[key] = digest
+        return SyncDelta(created, updated, unchanged, entries)
+
+    def record(self, delta: SyncDelta) -> None:
+        """Store the hashes of a committed delta."""
+        self.record_entries(delta.entries)
+
+    def record_entries(self, entries: Iterable[Tuple[str, bytes]]) -> None:
+        entries = list(entries)
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO items (item_key, hash, synced_at) VALUES (?, ?, ?)",
+                    [(key, digest, now) for key, digest in entries]
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+            # Unter dem Lock, sonst kann ein gleichzeitiger Upload einen veralteten Hash zurücklassen
+            for key, digest in entries:
+                self._cache.put(key, digest)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM items")
+            self._cache.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_index: Optional[SyncIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_sync_index() -> SyncIndex:
+    """Process-wide index at $SYNC_INDEX_PATH (default data/sync_index.db), opened on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SyncIndex(os.environ.get(INDEX_PATH_ENV, INDEX_PATH))
+    return _index
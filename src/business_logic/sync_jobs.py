@@ -0,0 +1,421 @@
+"""
+Background sync jobs for /api/sync.
+
+A client asks for asynchronous processing with ``Prefer: respond-async``
+(RFC 7240) or ``?mode=async``. The request handler only reads the body,
+enqueues a job and answers 202 with the job id; a bounded thread pool runs
+the same sync code as the synchronous path. ``GET /api/sync/<job_id>``
+reports progress and, once finished, the response body the synchronous
+request would have returned.
+
+Job states live in a SQLite file next to the sync index (SyncJobStore,
+$SYNC_JOB_STORE_PATH), so with several server workers a status request
+may be answered by any of them. The worker pool itself is per process.
+
+The number of queued and running jobs per process is limited. A slot is
+reserved before the request body is read; beyond the limit new jobs are
+rejected with SyncQueueFullError (503 with Retry-After), and a spooled
+body larger than MAX_SPOOL_BYTES with SyncBodyTooLargeError (413), so a
+burst of large uploads cannot pile up unbounded work, memory or disk.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Callable, Dict, Optional, Tuple
+
+from .sync import (
+    DEFAULT_BATCH_SIZE,
+    MAX_STREAM_ITEMS,
+    NdjsonBatcher,
+    SyncError,
+    iter_ndjson_lines,
+    ndjson_response,
+    sync_error_response,
+    sync_json_bytes,
+)
+from .sync_index import INDEX_PATH, SyncIndex
+
+DEFAULT_WORKERS = int(os.getenv('SYNC_JOB_WORKERS', 4))
+DEFAULT_MAX_PENDING = int(os.getenv('SYNC_JOB_MAX_PENDING', 64))
+# Abgeschlossene Jobs bleiben so lange abrufbar (Sekunden)
+DEFAULT_RETENTION = 3600.0
+DEFAULT_MAX_FINISHED = 10000
+RETRY_AFTER_SECONDS = 1
+
+# Request bodies up to this size stay in memory, larger ones go to a temp file
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+# Larger asynchronous uploads are rejected (413)
+MAX_SPOOL_BYTES = int(os.getenv('SYNC_JOB_MAX_BODY_BYTES', 512 * 1024 * 1024))
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+STORE_PATH = os.path.join(os.path.dirname(INDEX_PATH), 'sync_jobs.db')
+STORE_PATH_ENV = 'SYNC_JOB_STORE_PATH'
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class SyncQueueFullError(RuntimeError):
+    """Raised when the maximum number of pending jobs is reached."""
+
+
+class SyncBodyTooLargeError(RuntimeError):
+    """Raised when a request body to spool exceeds its size limit."""
+
+
+class SyncJobStore:
+    """
+    Job id -> status body, persisted in SQLite
+
+    All workers that open the same file see each other's jobs.
+
+    Args:
+        path: SQLite file, ':memory:' for jobs visible to this process only
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        if path != ':memory:':
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ':memory:':
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sync_jobs ("
+                "job_id TEXT PRIMARY KEY, state TEXT NOT NULL, finished_at REAL) WITHOUT ROWID"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sync_jobs_finished_at ON sync_jobs (finished_at)"
+            )
+
+    def save(self, job_id: str, state: Dict[str, Any], finished_at: Optional[float]) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sync_jobs (job_id, state, finished_at) VALUES (?, ?, ?)",
+                (job_id, json.dumps(state, separators=(',', ':')), finished_at)
+            )
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection.execute("SELECT state FROM sync_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def prune(self, cutoff: float, max_finished: int) -> None:
+        """Forget finished jobs older than ``cutoff`` and all but the newest ``max_finished``."""
+        with self._lock:
+            self._connection.execute("DELETE FROM sync_jobs WHERE finished_at < ?", (cutoff,))
+            self._connection.execute(
+                "DELETE FROM sync_jobs WHERE finished_at IS NOT NULL AND job_id NOT IN ("
+                "SELECT job_id FROM sync_jobs WHERE finished_at IS NOT NULL "
+                "ORDER BY finished_at DESC LIMIT ?)",
+                (max_finished,)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class SyncJob:
+    """State of one background sync; updated by the worker, read by status requests"""
+
+    def __init__(self, kind: str, store: Optional[SyncJobStore] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.processed = 0
+        self.batches = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.result_status: Optional[int] = None
+        self._store = store
+        self._lock = threading.Lock()
+
+    def progress(self, processed: int, batches: int = 0) -> None:
+        with self._lock:
+            self.processed = processed
+            self.batches = batches
+        self._save()
+
+    def _start(self) -> None:
+        with self._lock:
+            self.status = RUNNING
+            self.started_at = time.time()
+        self._save()
+
+    def _finish(self, body: Dict[str, Any], status: int) -> None:
+        with self._lock:
+            self.result = body
+            self.result_status = status
+            self.status = SUCCEEDED if status < 400 else FAILED
+            self.finished_at = time.time()
+        self._save()
+
+    def _save(self) -> None:
+        if self._store is not None:
+            self._store.save(self.id, self.to_dict(), self.finished_at)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status response body"""
+        with self._lock:
+            body: Dict[str, Any] = {
+                'job_id': self.id,
+                'status': self.status,
+                'type': self.kind,
+                'processed_count': self.processed,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at
+            }
+            if self.kind == 'ndjson':
+                body['batches'] = self.batches
+            if self.result is not None:
+                body['result_status'] = self.result_status
+                body['result'] = self.result
+            return body
+
+
+class SyncJobQueue:
+    """
+    Bounded pool of sync workers; job states go to a SyncJobStore
+
+    The worker threads start with the first job and again after close(),
+    so a queue survives several lifespan cycles of an app.
+
+    Args:
+        workers: Worker threads
+        max_pending: Queued plus running jobs of this process at most; more are rejected
+        retention: Seconds a finished job stays available for status requests
+        max_finished: Finished jobs kept at most, oldest are dropped first
+        store: Job state store, None = shared store at $SYNC_JOB_STORE_PATH (opened on first use)
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        retention: float = DEFAULT_RETENTION,
+        max_finished: int = DEFAULT_MAX_FINISHED,
+        store: Optional[SyncJobStore] = None
+    ):
+        if workers < 1 or max_pending < 1:
+            raise ValueError("workers and max_pending must be at least 1")
+        self.max_pending = max_pending
+        self.retention = retention
+        self.max_finished = max_finished
+        self.workers = workers
+        self._store = store
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> SyncJobStore:
+        return get_sync_job_store() if self._store is None else self._store
+
+    @property
+    def pending(self) -> int:
+        """Queued and running jobs, including reserved slots"""
+        return self._pending
+
+    def reserve(self) -> None:
+        """
+        Take a slot before reading a request body; hand it to submit(reserved=True) or release()
+
+        Raises:
+            SyncQueueFullError: If max_pending jobs are already queued or running
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise SyncQueueFullError(f"Sync queue is full ({self.max_pending} pending jobs)")
+            self._pending += 1
+
+    def release(self) -> None:
+        """Give back a slot taken with reserve() that is not used for a job."""
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, kind: str, work: Callable[[SyncJob], Tuple[Dict[str, Any], int]],
+               cleanup: Optional[Callable[[], None]] = None, reserved: bool = False) -> SyncJob:
+        """
+        Enqueue ``work(job) -> (body, status)``
+
+        ``cleanup`` runs after the job, or right away if it is rejected.
+        With ``reserved`` the slot taken by reserve() is used.
+
+        Raises:
+            SyncQueueFullError: If max_pending jobs are already queued or running
+        """
+        try:
+            if not reserved:
+                self.reserve()
+            try:
+                store = self.store
+                store.prune(time.time() - self.retention, self.max_finished)
+                job = SyncJob(kind, store)
+                job._save()
+                self._pool().submit(self._run, job, work, cleanup)
+            except Exception:
+                self.release()
+                raise
+        except Exception:
+            if cleanup is not None:
+                cleanup()
+            raise
+        return job
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status body of a job started by any worker sharing the store, None if unknown"""
+        return self.store.load(job_id)
+
+    def _run(self, job: SyncJob, work: Callable[[SyncJob], Tuple[Dict[str, Any], int]],
+             cleanup: Optional[Callable[[], None]]) -> None:
+        try:
+            try:
+                job._start()
+                body, status = work(job)
+            except Exception as e:
+                logging.error(f"Sync job {job.id} failed: {e}")
+                body, status = {'error': 'Internal server error during sync'}, 500
+            finally:
+                if cleanup is not None:
+                    cleanup()
+            job._finish(body, status)
+        except Exception as e:
+            logging.error(f"Sync job {job.id}: could not store its state: {e}")
+        finally:
+            self.release()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='sync-job')
+            return self._executor
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the worker threads; the next submit() starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+# --- Job bodies ------------------------------------------------------------------
+
+def spool_body() -> IO[bytes]:
+    """Temporary buffer for a request body: memory first, disk when it grows."""
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+
+
+def body_too_large(max_bytes: int) -> SyncBodyTooLargeError:
+    return SyncBodyTooLargeError(f'Request body too large. Maximum {max_bytes} bytes allowed')
+
+
+def copy_body(source: IO[bytes], target: IO[bytes], max_bytes: int = MAX_SPOOL_BYTES) -> None:
+    """
+    Spool ``source`` into ``target`` and rewind it
+
+    Raises:
+        SyncBodyTooLargeError: As soon as more than ``max_bytes`` were read
+    """
+    size = 0
+    while True:
+        chunk = source.read(SPOOL_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise body_too_large(max_bytes)
+        target.write(chunk)
+    target.seek(0)
+
+
+def json_job(raw: bytes, index: Optional[SyncIndex]) -> Callable[[SyncJob], Tuple[Dict[str, Any], int]]:
+    """Work function of an application/json sync; parsing and validation run in the worker."""
+    def work(job: SyncJob) -> Tuple[Dict[str, Any], int]:
+        body, status = sync_json_bytes(raw, index)
+        job.progress(body.get('synced_count', 0))
+        return body, status
+    return work
+
+
+def ndjson_job(
+    body: IO[bytes],
+    index: Optional[SyncIndex],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_items: int = MAX_STREAM_ITEMS
+) -> Callable[[SyncJob], Tuple[Dict[str, Any], int]]:
+    """Work function of an application/x-ndjson sync read from a spooled body."""
+    def work(job: SyncJob) -> Tuple[Dict[str, Any], int]:
+        batcher = NdjsonBatcher(batch_size, max_items, index=index)
+        try:
+            for line in iter_ndjson_lines(body.readline):
+                batcher.add_line(line)
+                if len(batcher.batches) != job.batches:
+                    job.progress(batcher.synced_count, len(batcher.batches))
+            synced_count, batches = batcher.finish()
+        except SyncError as e:
+            return sync_error_response(e), 400
+        job.progress(synced_count, len(batches))
+        return ndjson_response(synced_count, batches, batcher.counts if index is not None else None), 200
+    return work
+
+
+def wants_async(prefer: Optional[str], mode: Optional[str]) -> bool:
+    """True for ``Prefer: respond-async`` or ``?mode=async``."""
+    if mode == 'async':
+        return True
+    if not prefer:
+        return False
+    return any(token.split('=', 1)[0].strip().lower() == 'respond-async'
+               for token in prefer.replace(';', ',').split(','))
+
+
+def accepted_response(job: SyncJob, status_path: str) -> Dict[str, Any]:
+    """Body of the 202 answer."""
+    return {'job_id': job.id, 'status': job.status, 'status_url': status_path}
+
+
+_store: Optional[SyncJobStore] = None
+_queue: Optional[SyncJobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_sync_job_store() -> SyncJobStore:
+    """Job store at $SYNC_JOB_STORE_PATH (default data/sync_jobs.db), opened on first use."""
+    global _store
+    if _store is None:
+        with _queue_lock:
+            if _store is None:
+                _store = SyncJobStore(os.environ.get(STORE_PATH_ENV, STORE_PATH))
+    return _store
+
+
+def get_sync_job_queue() -> SyncJobQueue:
+    """Process-wide job queue ($SYNC_JOB_WORKERS, $SYNC_JOB_MAX_PENDING), started on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = SyncJobQueue()
+    return _queue
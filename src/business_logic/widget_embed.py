@@ -1,13 +1,63 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, NamedTuple, Optional, Tuple
+import hashlib
 import json
 import html
+import threading
+from src.business_logic.domain_matcher import DomainMatcher
+from src.cache import LRUCache
 from src.models.widget import Widget
 from src.repositories.widget_repository import WidgetRepository
 
 
+class RenderedEmbed(NamedTuple):
+    """Gerenderter Embed-Code samt starkem ETag (Hash über den Inhalt)"""
+    html: str
+    etag: str
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """Stabiler Hash einer Konfiguration, unabhängig von der Schlüsselreihenfolge"""
+    canonical = json.dumps(config, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def content_etag(content: str) -> str:
+    """Starker ETag für einen Text-Body"""
+    return '"' + hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest() + '"'
+
+
 class WidgetEmbedService:
-    def __init__(self, widget_repository: WidgetRepository):
+    def __init__(
+        self,
+        widget_repository: WidgetRepository,
+        matcher_cache_size: int = 1024,
+        render_cache_size: int = 4096
+    ):
         self.widget_repository = widget_repository
+        
+        # Vorkompilierte Domain-Allowlists pro Widget-ID: (Quellliste, Matcher)
+        self._domain_matchers: LRUCache = LRUCache(matcher_cache_size)
+        
+        # Gerenderte Fragmente: (ID, Generation, Key, Theme, Config-Hash) -> RenderedEmbed.
+        # Eine Änderung am Widget erhöht seine Generation, alte Einträge
+        # sind damit unerreichbar und fallen per LRU heraus.
+        self._rendered: LRUCache[RenderedEmbed] = LRUCache(render_cache_size)
+        self._generations: Dict[int, int] = {}
+        self._generations_lock = threading.Lock()
+        self._changes = 0
+        
+        # Ohne Änderungsbenachrichtigung wird nichts gecacht
+        add_listener = getattr(widget_repository, 'add_listener', None)
+        self._notified = add_listener is not None
+        if add_listener is not None:
+            add_listener(self._on_widget_changed)
+    
+    def _on_widget_changed(self, widget: Widget) -> None:
+        """Verwirft gecachte Daten eines geänderten oder gelöschten Widgets"""
+        self._domain_matchers.pop(widget.id)
+        with self._generations_lock:
+            self._generations[widget.id] = self._generations.get(widget.id, 0) + 1
+            self._changes += 1
 
     def generate_widget_embed_code(
         self, 
@@ -31,6 +81,29 @@ class WidgetEmbedService:
         Raises:
             ValueError: Wenn Widget-Key ungültig oder Domain nicht erlaubt
         """
+        return self.render_widget_embed(widget_key, domain, theme, config).html
+    
+    def render_widget_embed(
+        self,
+        widget_key: str,
+        domain: str,
+        theme: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None
+    ) -> RenderedEmbed:
+        """
+        Wie generate_widget_embed_code, liefert zusätzlich einen ETag
+        
+        Das gerenderte Fragment wird pro Widget, Theme und Konfiguration
+        gecacht; save() und delete() im Repository invalidieren es. Die
+        Domain-Prüfung läuft bei jedem Aufruf.
+        
+        Raises:
+            ValueError: Wenn Widget-Key ungültig oder Domain nicht erlaubt
+        """
+        # Ändert sich zwischen Laden und Cache-Zugriff irgendein Widget, wird
+        # das Ergebnis nicht gecacht (es könnte auf dem alten Stand beruhen)
+        changes_before = self._changes
+        
         # Widget-Key muss eindeutig und gültig sein
         widget = self.widget_repository.get_by_key(widget_key)
         if not widget:
@@ -44,6 +117,30 @@ class WidgetEmbedService:
         embed_theme = theme or widget.theme or 'default'
         embed_config = config or widget.config or {}
         
+        if widget.id is None or not self._notified:
+            return self._render(widget_key, embed_theme, embed_config)
+        
+        with self._generations_lock:
+            generation = self._generations.get(widget.id, 0)
+            cacheable = changes_before == self._changes
+        
+        # Ohne Override bestimmt die Widget-Konfiguration das Ergebnis, die
+        # Generation deckt deren Änderungen ab
+        cache_key: Tuple[Any, ...] = (
+            widget.id,
+            generation,
+            widget_key,
+            embed_theme,
+            config_hash(config) if config else None
+        )
+        rendered = self._rendered.get(cache_key)
+        if rendered is None:
+            rendered = self._render(widget_key, embed_theme, embed_config)
+            if cacheable:
+                self._rendered.put(cache_key, rendered)
+        return rendered
+    
+    def _render(self, widget_key: str, embed_theme: str, embed_config: Dict[str, Any]) -> RenderedEmbed:
         # Sichere JSON-Serialisierung für HTML
         config_json = html.escape(json.dumps(embed_config))
         theme_escaped = html.escape(embed_theme)
@@ -72,7 +169,7 @@ class WidgetEmbedService:
     </script>
 </div>'''
         
-        return embed_code
+        return RenderedEmbed(embed_code, content_etag(embed_code))
     
     def _is_domain_allowed(self, widget: Widget, domain: str) -> bool:
         """
@@ -88,25 +185,23 @@ class WidgetEmbedService:
         if not widget.allowed_domains:
             return True  # Keine Beschränkung
         
-        # Normalisiere Domain (entferne Protokoll und Port)
-        normalized_domain = domain.lower()
-        if '://' in normalized_domain:
-            normalized_domain = normalized_domain.split('://', 1)[1]
-        if ':' in normalized_domain:
-            normalized_domain = normalized_domain.split(':', 1)[0]
+        return self._get_domain_matcher(widget).matches(domain)
+    
+    def _get_domain_matcher(self, widget: Widget) -> DomainMatcher:
+        """
+        Liefert die kompilierte Allowlist des Widgets
         
-        # Prüfe gegen erlaubte Domains
-        for allowed_domain in widget.allowed_domains:
-            allowed_normalized = allowed_domain.lower()
-            
-            # Exakte Übereinstimmung
-            if normalized_domain == allowed_normalized:
-                return True
-            
-            # Wildcard-Unterstützung (*.example.com)
-            if allowed_normalized.startswith('*.'):
-                wildcard_domain = allowed_normalized[2:]
-                if normalized_domain.endswith('.' + wildcard_domain) or normalized_domain == wildcard_domain:
-                    return True
+        Der Matcher wird pro Widget einmal gebaut und neu erstellt, wenn das
+        Repository eine Änderung meldet oder widget.allowed_domains durch eine
+        andere Liste ersetzt wurde.
+        """
+        if widget.id is None:
+            return DomainMatcher(widget.allowed_domains)
+        
+        cached = self._domain_matchers.get(widget.id)
+        if cached is not None and cached[0] is widget.allowed_domains:
+            return cached[1]
         
-        return False
\ No newline at end of file
+        matcher = DomainMatcher(widget.allowed_domains)
+        self._domain_matchers.put(widget.id, (widget.allowed_domains, matcher))
+        return matcher
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Small thread-safe caches shared by the repositories and services.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar('V')
+
+_MISSING = object()
+
+
+class LRUCache(Generic[V]):
+    """
+    Bounded least-recently-used cache.
+
+    All operations take a single lock for a few dictionary operations, so
+    contention stays low even with many threads.
+
+    Args:
+        maxsize: Entries kept at most
+        on_evict: Called with (key, value) of every entry dropped to make
+            room, outside the lock; not called for pop() and clear()
+    """
+
+    def __init__(self, maxsize: int = 1024, on_evict: Optional[Callable[[Hashable, V], None]] = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._data: 'OrderedDict[Hashable, V]' = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation, see get_or_load()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Return the cached value and mark it as recently used."""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            evicted = self._data.popitem(last=False) if len(self._data) > self.maxsize else None
+        if evicted is not None and self.on_evict is not None:
+            self.on_evict(*evicted)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Optional[V]]) -> Optional[V]:
+        """
+        Return the cached value or load, store and return it.
+
+        The loader runs outside the lock; None results are not cached. If an
+        entry is invalidated while the loader runs, the loaded value is
+        returned but not cached, since it may already be stale.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        generation = self._generation
+        value = loader()
+        evicted = None
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._data[key] = value
+                    if len(self._data) > self.maxsize:
+                        evicted = self._data.popitem(last=False)
+        if evicted is not None and self.on_evict is not None:
+            self.on_evict(*evicted)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value."""
+        with self._lock:
+            self._generation += 1
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
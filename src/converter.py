@@ -1,3 +1,10 @@
+import csv
+import json
+
+# numpy wird erst bei der ersten Stapel-Umrechnung importiert, damit der
+# interaktive Umrechner und einzelne Werte ohne den Import-Aufwand starten
+
+
 class UnitConverter:
     def __init__(self):
         # Gewichtseinheiten in Gramm
@@ -21,6 +28,44 @@ class UnitConverter:
             'yd': 0.9144,
             'mi': 1609.34
         }
+        
+        # Umrechnungsmatrizen (von x nach) für die Stapel-Umrechnung, beim ersten Bedarf erstellt
+        self._weight_table = None
+        self._length_table = None
+    
+    @staticmethod
+    def _build_factor_table(units):
+        """Erstellt Einheiten-Index und Matrix mit allen Umrechnungsfaktoren"""
+        import numpy as np
+        index = {unit: i for i, unit in enumerate(units)}
+        factors = np.array(list(units.values()), dtype=np.float64)
+        return index, factors[:, np.newaxis] / factors[np.newaxis, :]
+    
+    @staticmethod
+    def _unit_indices(index, units, error_message):
+        """Wandelt eine Einheit oder eine Folge von Einheiten in Matrix-Indizes um"""
+        if isinstance(units, str):
+            if units not in index:
+                raise ValueError(error_message)
+            return index[units]
+        
+        import numpy as np
+        # Jede verschiedene Einheit nur einmal nachschlagen
+        distinct, inverse = np.unique(np.asarray(units, dtype=str), return_inverse=True)
+        try:
+            lookup = np.array([index[unit] for unit in distinct.tolist()], dtype=np.intp)
+        except KeyError:
+            raise ValueError(error_message)
+        return lookup[inverse].reshape(np.shape(units))
+    
+    def _convert_many(self, table, values, from_unit, to_unit, error_message):
+        import numpy as np
+        index, matrix = table
+        factors = matrix[
+            self._unit_indices(index, from_unit, error_message),
+            self._unit_indices(index, to_unit, error_message)
+        ]
+        return np.asarray(values, dtype=np.float64) * factors
     
     def convert_weight(self, value, from_unit, to_unit):
         """Konvertiert Gewichtseinheiten"""
@@ -42,6 +87,134 @@ class UnitConverter:
         result = meters / self.length_units[to_unit]
         return result
     
+    def convert_weight_many(self, values, from_unit, to_unit):
+        """
+        Konvertiert viele Gewichtswerte auf einmal
+        
+        Args:
+            values: Folge oder NumPy-Array von Werten
+            from_unit: Ausgangseinheit, einzeln oder eine pro Wert
+            to_unit: Zieleinheit, einzeln oder eine pro Wert
+            
+        Returns:
+            NumPy-Array mit den umgerechneten Werten
+        """
+        if self._weight_table is None:
+            self._weight_table = self._build_factor_table(self.weight_units)
+        return self._convert_many(self._weight_table, values, from_unit, to_unit,
+                                  "Ungültige Gewichtseinheit")
+    
+    def convert_length_many(self, values, from_unit, to_unit):
+        """
+        Konvertiert viele Längenwerte auf einmal
+        
+        Args:
+            values: Folge oder NumPy-Array von Werten
+            from_unit: Ausgangseinheit, einzeln oder eine pro Wert
+            to_unit: Zieleinheit, einzeln oder eine pro Wert
+            
+        Returns:
+            NumPy-Array mit den umgerechneten Werten
+        """
+        if self._length_table is None:
+            self._length_table = self._build_factor_table(self.length_units)
+        return self._convert_many(self._length_table, values, from_unit, to_unit,
+                                  "Ungültige Längeneinheit")
+    
+    def _converter_for(self, quantity):
+        converters = {
+            'weight': self.convert_weight_many,
+            'length': self.convert_length_many
+        }
+        if quantity not in converters:
+            raise ValueError(f"Unbekannte Größe: {quantity}")
+        return converters[quantity]
+    
+    def _convert_records(self, records, convert, to_unit, value_field, unit_field, chunk_size):
+        """Konvertiert einen Strom von Datensätzen blockweise"""
+        chunk = []
+        line = 0
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield from self._convert_chunk(chunk, line, convert, to_unit, value_field, unit_field)
+                line += len(chunk)
+                chunk = []
+        if chunk:
+            yield from self._convert_chunk(chunk, line, convert, to_unit, value_field, unit_field)
+    
+    @staticmethod
+    def _convert_chunk(chunk, first_line, convert, to_unit, value_field, unit_field):
+        values = []
+        units = []
+        for offset, record in enumerate(chunk):
+            try:
+                values.append(float(record[value_field]))
+                units.append(record[unit_field].strip().lower())
+            except (KeyError, TypeError, ValueError, AttributeError):
+                raise ValueError(f"Ungültiger Datensatz {first_line + offset + 1}")
+        
+        converted = convert(values, units, to_unit).tolist()
+        for record, value in zip(chunk, converted):
+            record[value_field] = value
+            record[unit_field] = to_unit
+            yield record
+    
+    def convert_csv(self, infile, outfile, quantity, to_unit,
+                    value_field='value', unit_field='unit', chunk_size=65536):
+        """
+        Konvertiert eine CSV-Datei zeilenweise in konstantem Speicher
+        
+        Args:
+            infile: Geöffnete CSV-Eingabedatei mit Kopfzeile
+            outfile: Geöffnete Ausgabedatei
+            quantity: 'weight' oder 'length'
+            to_unit: Zieleinheit
+            value_field: Spalte mit dem Wert
+            unit_field: Spalte mit der Einheit, wird auf to_unit gesetzt
+            chunk_size: Zeilen pro Umrechnungsblock
+            
+        Returns:
+            Anzahl der konvertierten Zeilen
+        """
+        convert = self._converter_for(quantity)
+        reader = csv.DictReader(infile)
+        writer = csv.DictWriter(outfile, fieldnames=reader.fieldnames or [value_field, unit_field])
+        writer.writeheader()
+        
+        count = 0
+        for record in self._convert_records(reader, convert, to_unit, value_field, unit_field, chunk_size):
+            writer.writerow(record)
+            count += 1
+        return count
+    
+    def convert_ndjson(self, infile, outfile, quantity, to_unit,
+                       value_field='value', unit_field='unit', chunk_size=65536):
+        """
+        Konvertiert eine NDJSON-Datei (ein JSON-Objekt pro Zeile) in konstantem Speicher
+        
+        Args:
+            infile: Geöffnete NDJSON-Eingabedatei
+            outfile: Geöffnete Ausgabedatei
+            quantity: 'weight' oder 'length'
+            to_unit: Zieleinheit
+            value_field: Feld mit dem Wert
+            unit_field: Feld mit der Einheit, wird auf to_unit gesetzt
+            chunk_size: Zeilen pro Umrechnungsblock
+            
+        Returns:
+            Anzahl der konvertierten Zeilen
+        """
+        convert = self._converter_for(quantity)
+        records = (json.loads(line) for line in infile if line.strip())
+        
+        count = 0
+        for record in self._convert_records(records, convert, to_unit, value_field, unit_field, chunk_size):
+            outfile.write(json.dumps(record, ensure_ascii=False))
+            outfile.write('\n')
+            count += 1
+        return count
+    
     def get_available_weight_units(self):
         """Gibt verfügbare Gewichtseinheiten zurück"""
         return list(self.weight_units.keys())
@@ -1,16 +1,50 @@
 """
 Database package for Pizza Calculator application.
+
+Names are imported from their submodules on first access (PEP 562), so
+``from src.database.models import Recipe`` does not load mysql.connector.
 """
 
-from .connection import get_connection, init_database
-from .models import PizzaStyle, PrefermentMethod, Recipe, Calculation, Widget
-
-__all__ = [
-    'get_connection',
-    'init_database', 
-    'PizzaStyle',
-    'PrefermentMethod',
-    'Recipe',
-    'Calculation',
-    'Widget'
-]
\ No newline at end of file
+from importlib import import_module
+
+# Exported name -> submodule
+_EXPORTS = {
+    'get_connection': '.connection',
+    'init_database': '.connection',
+    'configure_pool': '.connection',
+    'get_pool': '.connection',
+    'get_pool_stats': '.connection',
+    'pooled_connection': '.connection',
+    'ConnectionPool': '.pool',
+    'PoolStats': '.pool',
+    'PoolTimeoutError': '.pool',
+    'PizzaStyle': '.models',
+    'PrefermentMethod': '.models',
+    'Recipe': '.models',
+    'Calculation': '.models',
+    'Widget': '.models',
+    'CompactPizzaStyle': '.models',
+    'CompactPrefermentMethod': '.models',
+    'CompactRecipe': '.models',
+    'CompactCalculation': '.models',
+    'convert_model': '.models',
+    'CalculationWriter': '.write_behind',
+    'WriteBehindFullError': '.write_behind',
+    'WriterClosedError': '.write_behind',
+    'WriterStats': '.write_behind'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
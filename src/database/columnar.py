@@ -0,0 +1,296 @@
+"""
+Columnar, array-backed containers for bulk recipe and calculation data.
+
+One NumPy array per field instead of one object per row:
+
+- DECIMAL columns are stored as int64 scaled by their number of decimal
+  places (e.g. 65.00 -> 6500), so converting back to ``Decimal`` is exact.
+- Optional integers are int64 with a boolean mask of present values.
+- Timestamps are datetime64[us] with NaT for None.
+- Text columns are object arrays holding references to the strings.
+
+Rows are accessed through lightweight views that read from the arrays on
+attribute access; slicing a table returns a table of array views. Neither
+copies the data.
+"""
+
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Type, Union
+
+import numpy as np
+
+from src.database.models import Calculation, Recipe
+
+
+class Column(NamedTuple):
+    """Storage of one model field"""
+    name: str
+    kind: str          # 'int', 'optional_int', 'decimal', 'text', 'datetime'
+    scale: int = 0     # decimal places for 'decimal'
+
+
+def _int_column(values: Sequence[Any]) -> np.ndarray:
+    return np.fromiter((int(value) for value in values), dtype=np.int64, count=len(values))
+
+
+def _decimal_column(values: Sequence[Any], scale: int) -> np.ndarray:
+    quantum = Decimal(1).scaleb(-scale)
+    return np.fromiter(
+        (int(Decimal(value).quantize(quantum, rounding=ROUND_HALF_UP).scaleb(scale)) for value in values),
+        dtype=np.int64,
+        count=len(values)
+    )
+
+
+def _text_column(values: Sequence[Any]) -> np.ndarray:
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+class ColumnarTable:
+    """
+    Base class for the model tables; subclasses set MODEL and COLUMNS
+
+    Construct with from_records() or from a mapping of ready arrays.
+    """
+
+    MODEL: Type = object
+    COLUMNS: Sequence[Column] = ()
+    _COLUMN_MAP: Dict[str, Column] = {}
+
+    __slots__ = ('_arrays', '_length')
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls._COLUMN_MAP = {column.name: column for column in cls.COLUMNS}
+
+    def __init__(self, arrays: Mapping[str, np.ndarray]):
+        lengths = {len(values) for values in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        missing = {column.name for column in self.COLUMNS} - set(arrays)
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+        self._arrays: Dict[str, np.ndarray] = dict(arrays)
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_records(cls, records: Sequence[Any]) -> 'ColumnarTable':
+        """Pack model instances (plain or compact variant) into columns."""
+        arrays: Dict[str, np.ndarray] = {}
+        for column in cls.COLUMNS:
+            values = [getattr(record, column.name) for record in records]
+            if column.kind == 'int':
+                arrays[column.name] = _int_column(values)
+            elif column.kind == 'optional_int':
+                mask = np.fromiter((value is not None for value in values), dtype=bool, count=len(values))
+                arrays[column.name] = _int_column([0 if value is None else value for value in values])
+                arrays[column.name + '__mask'] = mask
+            elif column.kind == 'decimal':
+                arrays[column.name] = _decimal_column(values, column.scale)
+            elif column.kind == 'datetime':
+                arrays[column.name] = np.array(
+                    [np.datetime64('NaT') if value is None else np.datetime64(value, 'us') for value in values],
+                    dtype='datetime64[us]'
+                )
+            else:
+                arrays[column.name] = _text_column(values)
+        return cls(arrays)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice, np.ndarray]) -> Any:
+        """Row view for an integer, table of views for a slice; an index array selects (copies) rows."""
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += self._length
+            if not 0 <= index < self._length:
+                raise IndexError("row index out of range")
+            return RowView(self, int(index))
+        return type(self)({name: values[index] for name, values in self._arrays.items()})
+
+    def __iter__(self) -> Iterator['RowView']:
+        for index in range(self._length):
+            yield RowView(self, index)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays (text columns count their references only)."""
+        return sum(values.nbytes for values in self._arrays.values())
+
+    def array(self, name: str) -> np.ndarray:
+        """Raw storage array of a column (scaled int64 for decimals), without copying."""
+        return self._arrays[name]
+
+    def mask(self, name: str) -> np.ndarray:
+        """Boolean array of present values of an optional column (all True otherwise)."""
+        return self._arrays.get(name + '__mask', np.ones(self._length, dtype=bool))
+
+    def floats(self, name: str) -> np.ndarray:
+        """Column as float64 values, e.g. to feed compute_dough_arrays()."""
+        column = self._COLUMN_MAP[name]
+        values = self._arrays[name]
+        if column.kind == 'decimal':
+            return values / float(10 ** column.scale)
+        return values.astype(np.float64)
+
+    def value(self, name: str, index: int) -> Any:
+        """Single field value decoded to the model's Python type."""
+        column = self._COLUMN_MAP[name]
+        raw = self._arrays[name][index]
+        if column.kind == 'int':
+            return int(raw)
+        if column.kind == 'optional_int':
+            return int(raw) if self._arrays[name + '__mask'][index] else None
+        if column.kind == 'decimal':
+            return Decimal(int(raw)).scaleb(-column.scale)
+        if column.kind == 'datetime':
+            return None if np.isnat(raw) else raw.astype(datetime)
+        return raw
+
+    def record(self, index: int, model: Optional[Type] = None) -> Any:
+        """Materialize one row as a model instance (default: MODEL)."""
+        model = model or self.MODEL
+        return model(**{column.name: self.value(column.name, index) for column in self.COLUMNS})
+
+    def to_records(self, model: Optional[Type] = None) -> List[Any]:
+        """Materialize all rows, e.g. as ``CompactRecipe`` to save memory."""
+        model = model or self.MODEL
+        decoded = {column.name: self._decode_column(column) for column in self.COLUMNS}
+        return [
+            model(**{name: values[index] for name, values in decoded.items()})
+            for index in range(self._length)
+        ]
+
+    def _decode_column(self, column: Column) -> List[Any]:
+        values = self._arrays[column.name]
+        if column.kind == 'int':
+            return values.tolist()
+        if column.kind == 'optional_int':
+            mask = self._arrays[column.name + '__mask'].tolist()
+            return [value if present else None for value, present in zip(values.tolist(), mask)]
+        if column.kind == 'decimal':
+            return [Decimal(value).scaleb(-column.scale) for value in values.tolist()]
+        if column.kind == 'datetime':
+            return [None if np.isnat(value) else value.astype(datetime) for value in values]
+        return values.tolist()
+
+
+class RowView:
+    """Zero-copy view of one table row; attributes are read from the columns."""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: ColumnarTable, index: int):
+        self._table = table
+        self._index = index
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._table.value(name, self._index)
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def to_record(self, model: Optional[Type] = None) -> Any:
+        """Materialize this row as a model instance."""
+        return self._table.record(self._index, model)
+
+    def __repr__(self) -> str:
+        return f"<{type(self._table).__name__} row {self._index}>"
+
+
+_TIMESTAMPS = (Column('created_at', 'datetime'), Column('updated_at', 'datetime'))
+
+
+class RecipeTable(ColumnarTable):
+    """Columnar ``Recipe`` storage"""
+
+    MODEL = Recipe
+    COLUMNS = (
+        Column('id', 'optional_int'),
+        Column('name', 'text'),
+        Column('pizza_style_id', 'int'),
+        Column('preferment_method_id', 'optional_int'),
+        Column('flour_weight', 'decimal', 2),
+        Column('water_percentage', 'decimal', 2),
+        Column('salt_percentage', 'decimal', 2),
+        Column('yeast_percentage', 'decimal', 2),
+        Column('preferment_percentage', 'decimal', 2),
+        Column('oil_percentage', 'decimal', 2),
+        Column('sugar_percentage', 'decimal', 2),
+        Column('fermentation_time_hours', 'int'),
+        Column('fermentation_temperature', 'int'),
+        Column('notes', 'text'),
+        Column('source_file', 'text'),
+    ) + _TIMESTAMPS
+
+    __slots__ = ()
+
+    def percentage_arrays(self) -> Dict[str, np.ndarray]:
+        """Baker's percentages as float64 columns, like dough_calculation.recipe_arrays()."""
+        from src.business_logic.dough_calculation import PERCENTAGE_FIELDS
+        return {name: self.floats(name) for name in PERCENTAGE_FIELDS}
+
+
+class CalculationTable(ColumnarTable):
+    """Columnar ``Calculation`` storage"""
+
+    MODEL = Calculation
+    COLUMNS = (
+        Column('id', 'optional_int'),
+        Column('recipe_id', 'int'),
+        Column('number_of_pizzas', 'int'),
+        Column('pizza_weight', 'decimal', 2),
+        Column('total_flour', 'decimal', 2),
+        Column('total_water', 'decimal', 2),
+        Column('total_salt', 'decimal', 2),
+        Column('total_yeast', 'decimal', 2),
+        Column('total_oil', 'decimal', 2),
+        Column('total_sugar', 'decimal', 2),
+        Column('preferment_flour', 'decimal', 2),
+        Column('preferment_water', 'decimal', 2),
+        Column('preferment_yeast', 'decimal', 2),
+        Column('main_dough_flour', 'decimal', 2),
+        Column('main_dough_water', 'decimal', 2),
+        Column('main_dough_salt', 'decimal', 2),
+        Column('main_dough_yeast', 'decimal', 2),
+        Column('calculated_at', 'datetime'),
+    )
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dough_arrays(
+        cls,
+        recipe_ids: Iterable[int],
+        number_of_pizzas: Any,
+        pizza_weight: Any,
+        results: Mapping[str, np.ndarray]
+    ) -> 'CalculationTable':
+        """
+        Build a table straight from compute_dough_arrays() output.
+
+        Amounts are rounded to cents like calculate_calculations(), but no
+        Decimal or Calculation objects are created on the way.
+        """
+        recipe_ids = np.asarray(list(recipe_ids) if not isinstance(recipe_ids, np.ndarray) else recipe_ids,
+                                dtype=np.int64)
+        length = len(recipe_ids)
+
+        def cents(values: Any) -> np.ndarray:
+            return np.rint(np.broadcast_to(np.asarray(values, dtype=np.float64), (length,)) * 100.0).astype(np.int64)
+
+        arrays: Dict[str, np.ndarray] = {
+            'id': np.zeros(length, dtype=np.int64),
+            'id__mask': np.zeros(length, dtype=bool),
+            'recipe_id': recipe_ids,
+            'number_of_pizzas': np.broadcast_to(np.asarray(number_of_pizzas), (length,)).astype(np.int64),
+            'pizza_weight': cents(pizza_weight),
+            'calculated_at': np.full(length, np.datetime64('NaT'), dtype='datetime64[us]')
+        }
+        for name, values in results.items():
+            arrays[name] = cents(values)
+        return cls(arrays)
@@ -2,64 +2,141 @@
 Database connection management for Pizza Calculator.
 """
 
-import mysql.connector
-from mysql.connector import Error
 import os
-from typing import Optional
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
 
-def get_connection():
+from .migrate import MigrationError, apply_migrations
+from .pool import ConnectionPool, PoolStats, PooledConnection, PoolTimeoutError
+
+_pool: Optional[ConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+def _connect():
+    """
+    Open a new, unpooled MySQL connection from the DB_* environment variables.
+    """
+    # mysql.connector erst bei der ersten echten Verbindung laden (Startzeit)
+    import mysql.connector
+    return mysql.connector.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        database=os.getenv('DB_NAME', 'pizza_calculator'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        port=int(os.getenv('DB_PORT', 3306)),
+        autocommit=True
+    )
+
+def _build_pool(connect: Optional[Callable[[], Any]], options: dict) -> ConnectionPool:
+    max_lifetime = float(os.getenv('DB_POOL_MAX_LIFETIME', 3600))
+    options.setdefault('size', int(os.getenv('DB_POOL_SIZE', 5)))
+    options.setdefault('timeout', float(os.getenv('DB_POOL_TIMEOUT', 30)))
+    options.setdefault('max_lifetime', max_lifetime if max_lifetime > 0 else None)
+    options.setdefault('pre_ping', os.getenv('DB_POOL_PRE_PING', '1') != '0')
+    return ConnectionPool(connect or _connect, **options)
+
+def configure_pool(connect: Optional[Callable[[], Any]] = None, **options) -> ConnectionPool:
+    """
+    Replace the process-wide connection pool.
+    
+    Pool options not given are read from the environment: DB_POOL_SIZE,
+    DB_POOL_TIMEOUT (seconds), DB_POOL_MAX_LIFETIME (seconds, 0 disables)
+    and DB_POOL_PRE_PING (0/1).
+    
+    Args:
+        connect: Connection factory, defaults to MySQL. Pass a stand-in
+            (e.g. a sqlite3 factory) to run without a MySQL server.
+        **options: Keyword arguments for ConnectionPool
+        
+    Returns:
+        ConnectionPool: The new pool
+    """
+    global _pool, _pool_pid
+    
+    pool = _build_pool(connect, options)
+    with _pool_lock:
+        previous, _pool, _pool_pid = _pool, pool, os.getpid()
+    if previous is not None:
+        previous.close()
+    return pool
+
+def get_pool() -> ConnectionPool:
+    """
+    Return the process-wide connection pool, creating it on first use.
+    
+    A forked worker process never reuses the sockets of its parent; it gets
+    a fresh pool on first use.
+    """
+    global _pool, _pool_pid
+    
+    pool = _pool
+    if pool is not None and _pool_pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool, _pool_pid = _build_pool(None, {}), os.getpid()
+        return _pool
+
+def get_pool_stats() -> PoolStats:
+    """
+    Return checkout, wait and timeout counters of the process-wide pool.
     """
-    Create and return a database connection.
+    return get_pool().stats()
+
+def get_connection() -> PooledConnection:
+    """
+    Check out a database connection from the process-wide pool.
+    
+    Calling close() on the returned connection hands it back to the pool.
     
     Returns:
-        mysql.connector.connection: Database connection object
+        PooledConnection: Pooled database connection
         
     Raises:
-        Error: If connection fails
+        Error: If connection fails or no connection becomes available in time
     """
+    from mysql.connector import Error
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            database=os.getenv('DB_NAME', 'pizza_calculator'),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', ''),
-            port=int(os.getenv('DB_PORT', 3306)),
-            autocommit=True
-        )
-        return connection
-    except Error as e:
+        return get_pool().acquire()
+    except (Error, PoolTimeoutError) as e:
         raise Error(f"Error connecting to database: {e}")
 
+@contextmanager
+def pooled_connection() -> Iterator[PooledConnection]:
+    """
+    Context manager that checks out a pooled connection and returns it afterwards.
+    
+    Raises:
+        Error: If connection fails or no connection becomes available in time
+    """
+    connection = get_connection()
+    try:
+        yield connection
+    finally:
+        connection.close()
+
 def init_database():
     """
-    Initialize the database by executing the schema file.
+    Initialize the database by applying pending schema migrations and seed data.
+    
+    A warm start (schema checksums already recorded) costs a single query.
     
     Returns:
         bool: True if successful, False otherwise
     """
+    from mysql.connector import Error
     try:
-        connection = get_connection()
-        cursor = connection.cursor()
-        
-        # Read and execute schema file
-        schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
-        with open(schema_path, 'r') as file:
-            schema_sql = file.read()
-        
-        # Split and execute each statement
-        statements = schema_sql.split(';')
-        for statement in statements:
-            statement = statement.strip()
-            if statement:
-                cursor.execute(statement)
-        
-        cursor.close()
-        connection.close()
+        with pooled_connection() as connection:
+            applied = apply_migrations(connection)
+        if applied:
+            print(f"Applied database migrations: {', '.join(applied)}")
         return True
         
-    except Error as e:
+    except (Error, MigrationError) as e:
         print(f"Error initializing database: {e}")
         return False
     except FileNotFoundError:
         print("Schema file not found")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,297 @@
+"""
+Schema migrations for Pizza Calculator.
+
+The schema consists of schema.sql, the numbered files in migrations/ (in name
+order) and the seed data from seeds.py. Each step is recorded together with
+its SHA-256 checksum in the schema_migrations table. A warm start reads the
+recorded checksums with a single query and skips the schema entirely; a cold
+start applies the pending steps in one transaction.
+
+Note that MySQL commits implicitly after DDL statements, so only the seed
+data and the bookkeeping rows are truly atomic. schema.sql and the seeds are
+idempotent and may be re-applied; numbered migrations run exactly once.
+On MySQL a named lock (GET_LOCK) serializes concurrent runs, e.g. several
+workers starting at the same time.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .seeds import SEEDS, SeedData
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schema.sql')
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+MIGRATIONS_TABLE = 'schema_migrations'
+# Seconds to wait for a migration run of another process
+DEFAULT_LOCK_TIMEOUT = 60
+
+# MySQL error "Table '...' doesn't exist"
+ER_NO_SUCH_TABLE = 1146
+
+
+class MigrationError(Exception):
+    """Raised when the recorded schema state does not match the migration files."""
+
+
+@dataclass(frozen=True)
+class MigrationStep:
+    """One unit of the schema: a SQL file or the seed data."""
+    name: str
+    checksum: str
+    statements: Tuple[str, ...] = ()
+    seeds: Tuple[SeedData, ...] = ()
+    repeatable: bool = False
+
+
+def split_sql_statements(sql: str) -> List[str]:
+    """
+    Split a SQL script into statements.
+
+    Unlike ``sql.split(';')`` this ignores semicolons inside quoted strings
+    and identifiers and drops ``--``, ``#`` and ``/* */`` comments.
+
+    Args:
+        sql: SQL script
+
+    Returns:
+        List of statements without the terminating semicolon
+    """
+    statements = []
+    current = []
+    i = 0
+    length = len(sql)
+
+    while i < length:
+        char = sql[i]
+
+        if char in ("'", '"', '`'):
+            # Quoted string or identifier, copied verbatim
+            end = i + 1
+            while end < length:
+                if sql[end] == '\\' and char != '`':
+                    end += 2
+                    continue
+                if sql[end] == char:
+                    if end + 1 < length and sql[end + 1] == char:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(sql[i:end + 1])
+            i = end + 1
+        elif sql.startswith('--', i) or char == '#':
+            end = sql.find('\n', i)
+            i = length if end == -1 else end
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+        elif char == ';':
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            i += 1
+        else:
+            current.append(char)
+            i += 1
+
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def _sql_step(path: str, repeatable: bool) -> MigrationStep:
+    with open(path, 'rb') as file:
+        content = file.read()
+    return MigrationStep(
+        name=os.path.basename(path),
+        checksum=hashlib.sha256(content).hexdigest(),
+        statements=tuple(split_sql_statements(content.decode('utf-8'))),
+        repeatable=repeatable
+    )
+
+
+def _seed_step(seeds: Sequence[SeedData]) -> MigrationStep:
+    payload = json.dumps(
+        [[seed.table, seed.sql, seed.rows] for seed in seeds],
+        default=str,
+        ensure_ascii=False
+    )
+    return MigrationStep(
+        name='seeds',
+        checksum=hashlib.sha256(payload.encode('utf-8')).hexdigest(),
+        seeds=tuple(seeds),
+        repeatable=True
+    )
+
+
+@lru_cache(maxsize=None)
+def load_steps(
+    schema_path: str = SCHEMA_PATH,
+    migrations_dir: str = MIGRATIONS_DIR,
+    seeds: Tuple[SeedData, ...] = SEEDS
+) -> Tuple[MigrationStep, ...]:
+    """
+    Read, checksum and split all migration steps.
+
+    The result is cached, so the files are parsed once per process.
+
+    Returns:
+        Steps in the order they are applied
+    """
+    steps = [_sql_step(schema_path, repeatable=True)]
+    if os.path.isdir(migrations_dir):
+        for filename in sorted(os.listdir(migrations_dir)):
+            if filename.endswith('.sql'):
+                steps.append(_sql_step(os.path.join(migrations_dir, filename), repeatable=False))
+    if seeds:
+        steps.append(_seed_step(seeds))
+    return tuple(steps)
+
+
+def _is_missing_table(error: Exception) -> bool:
+    if getattr(error, 'errno', None) == ER_NO_SUCH_TABLE:
+        return True
+    return isinstance(error, sqlite3.OperationalError) and 'no such table' in str(error)
+
+
+def _applied_checksums(cursor: Any) -> Dict[str, str]:
+    try:
+        cursor.execute(f"SELECT name, checksum FROM {MIGRATIONS_TABLE}")
+        return dict(cursor.fetchall())
+    except Exception as e:
+        if not _is_missing_table(e):
+            raise
+        # Table does not exist yet: nothing has been applied
+        return {}
+
+
+def _read_applied(connection: Any, cursor: Any) -> Dict[str, str]:
+    applied = _applied_checksums(cursor)
+    # Lesetransaktion beenden: der nächste Read sieht einen frischen Snapshot,
+    # und start_transaction() findet keine offene Transaktion vor
+    connection.rollback()
+    return applied
+
+
+@contextmanager
+def _migration_lock(connection: Any, cursor: Any, placeholder: str, timeout: int) -> Iterator[None]:
+    """
+    Named MySQL lock around a migration run; a no-op for other drivers
+
+    Raises:
+        MigrationError: If another run holds the lock longer than ``timeout`` seconds
+    """
+    # Nur mysql-connector-Verbindungen (auch gepoolte) haben start_transaction
+    if not hasattr(connection, 'start_transaction'):
+        yield
+        return
+    cursor.execute(f"SELECT GET_LOCK({placeholder}, {placeholder})", (MIGRATIONS_TABLE, timeout))
+    (acquired,) = cursor.fetchone()
+    if acquired != 1:
+        raise MigrationError(f"Timed out after {timeout}s waiting for another migration run")
+    try:
+        yield
+    finally:
+        cursor.execute(f"SELECT RELEASE_LOCK({placeholder})", (MIGRATIONS_TABLE,))
+        cursor.fetchone()
+
+
+def pending_steps(applied: Dict[str, str], steps: Sequence[MigrationStep]) -> List[MigrationStep]:
+    """
+    Select the steps that still have to be applied.
+
+    Raises:
+        MigrationError: If a numbered migration changed after it was applied
+    """
+    pending = []
+    for step in steps:
+        checksum = applied.get(step.name)
+        if checksum == step.checksum:
+            continue
+        if checksum is not None and not step.repeatable:
+            raise MigrationError(
+                f"Migration {step.name} was changed after it was applied; add a new migration instead"
+            )
+        pending.append(step)
+    return pending
+
+
+def apply_migrations(
+    connection: Any,
+    steps: Optional[Sequence[MigrationStep]] = None,
+    placeholder: str = '%s',
+    lock_timeout: int = DEFAULT_LOCK_TIMEOUT
+) -> List[str]:
+    """
+    Apply all pending migration steps.
+
+    Args:
+        connection: DB-API connection (pooled or plain)
+        steps: Steps to apply, defaults to load_steps()
+        placeholder: Parameter placeholder of the driver ('%s' for MySQL, '?' for sqlite3)
+        lock_timeout: Seconds to wait for a concurrent run (MySQL)
+
+    Returns:
+        Names of the applied steps, empty on a warm start
+
+    Raises:
+        MigrationError: If a numbered migration changed after it was applied,
+            or the migration lock could not be acquired
+    """
+    if steps is None:
+        steps = load_steps()
+
+    cursor = connection.cursor()
+    try:
+        if not pending_steps(_read_applied(connection, cursor), steps):
+            return []
+        with _migration_lock(connection, cursor, placeholder, lock_timeout):
+            # Ein anderer Prozess kann die Schritte inzwischen angewendet haben
+            pending = pending_steps(_read_applied(connection, cursor), steps)
+            if pending:
+                _apply(connection, cursor, pending, placeholder)
+            return [step.name for step in pending]
+    finally:
+        cursor.close()
+
+
+def _apply(connection: Any, cursor: Any, pending: Sequence[MigrationStep], placeholder: str) -> None:
+    """Run the pending steps and record them in one transaction."""
+    start_transaction = getattr(connection, 'start_transaction', None)
+    if start_transaction is not None:
+        start_transaction()
+    else:
+        cursor.execute('BEGIN')
+
+    try:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "name VARCHAR(255) PRIMARY KEY, "
+            "checksum CHAR(64) NOT NULL, "
+            "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        )
+        for step in pending:
+            for statement in step.statements:
+                cursor.execute(statement)
+            for seed in step.seeds:
+                cursor.executemany(seed.sql, seed.rows)
+            cursor.execute(
+                f"DELETE FROM {MIGRATIONS_TABLE} WHERE name = {placeholder}",
+                (step.name,)
+            )
+            cursor.execute(
+                f"INSERT INTO {MIGRATIONS_TABLE} (name, checksum) VALUES ({placeholder}, {placeholder})",
+                (step.name, step.checksum)
+            )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
@@ -0,0 +1,8 @@
+-- Ratios and display ranges of the preferment methods served by /api/preferment-methods
+
+ALTER TABLE preferment_methods
+    ADD COLUMN flour_ratio DECIMAL(4,3) DEFAULT 1.000,
+    ADD COLUMN water_ratio DECIMAL(4,3) DEFAULT 1.000,
+    ADD COLUMN yeast_ratio DECIMAL(5,4) DEFAULT 0.0000,
+    ADD COLUMN fermentation_time VARCHAR(50),
+    ADD COLUMN temperature VARCHAR(50);
@@ -0,0 +1,15 @@
+-- Embeddable widgets (src/models/widget.py), looked up by key on every embed request
+
+CREATE TABLE IF NOT EXISTS embed_widgets (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    widget_key VARCHAR(50) NOT NULL UNIQUE,
+    name VARCHAR(100) NOT NULL,
+    theme VARCHAR(50),
+    config JSON,
+    allowed_domains JSON,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_embed_widgets_active (is_active),
+    INDEX idx_embed_widgets_domains ((CAST(allowed_domains AS CHAR(255) ARRAY)))
+);
@@ -0,0 +1,7 @@
+-- File a recipe was imported from (path relative to data/recipes), NULL for recipes created in the app.
+-- src/recipe_import.py matches re-imported recipes on (source_file, name) and updates them in place,
+-- so their ids and calculations survive; the unique key also serves lookups by source_file.
+
+ALTER TABLE recipes
+    ADD COLUMN source_file VARCHAR(512) NULL,
+    ADD UNIQUE KEY uq_recipes_source_file_name (source_file, name);
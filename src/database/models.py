@@ -2,8 +2,8 @@
 Database models for Pizza Calculator application.
 """
 
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, fields
+from typing import Optional, Dict, Any, Type, TypeVar
 from datetime import datetime
 from decimal import Decimal
 
@@ -28,6 +28,11 @@ class PrefermentMethod:
     typical_percentage: Decimal = Decimal('20.00')
     fermentation_time_hours: int = 12
     temperature_celsius: int = 20
+    flour_ratio: Decimal = Decimal('1.000')
+    water_ratio: Decimal = Decimal('1.000')
+    yeast_ratio: Decimal = Decimal('0.0000')
+    fermentation_time: Optional[str] = None
+    temperature: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -48,6 +53,7 @@ class Recipe:
     fermentation_time_hours: int = 24
     fermentation_temperature: int = 20
     notes: Optional[str] = None
+    source_file: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -83,4 +89,29 @@ class Widget:
     is_active: bool = True
     display_order: int = 0
     created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
\ No newline at end of file
+    updated_at: Optional[datetime] = None
+
+# Kompakte Varianten mit __slots__: gleiche Felder und Defaults, aber ohne
+# __dict__ pro Instanz. Für Berichte, die sehr viele Zeilen im Speicher halten.
+
+T = TypeVar('T')
+
+def _slotted(cls: type) -> type:
+    """Build a dataclass with the fields of ``cls`` and ``slots=True``."""
+    namespace = {
+        '__annotations__': dict(cls.__annotations__),
+        '__doc__': f"{cls.__name__} model with __slots__.",
+        '__module__': cls.__module__
+    }
+    for field in fields(cls):
+        namespace[field.name] = field.default
+    return dataclass(slots=True)(type(f"Compact{cls.__name__}", (), namespace))
+
+CompactPizzaStyle = _slotted(PizzaStyle)
+CompactPrefermentMethod = _slotted(PrefermentMethod)
+CompactRecipe = _slotted(Recipe)
+CompactCalculation = _slotted(Calculation)
+
+def convert_model(record: Any, target: Type[T]) -> T:
+    """Convert between a model and its compact variant (either direction)."""
+    return target(**{field.name: getattr(record, field.name) for field in fields(target)})
@@ -0,0 +1,300 @@
+"""
+Connection pooling for Pizza Calculator.
+
+The pool does not depend on a database driver: connections are opened by a
+factory callable, so the same pool runs against mysql.connector in production
+and against sqlite3 or a fake connector in tests and benchmarks.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Iterator, Optional
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no connection becomes available within the timeout."""
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when a connection is requested from a closed pool."""
+
+
+@dataclass
+class PoolStats:
+    """Snapshot of the pool counters."""
+    size: int
+    in_use: int
+    idle: int
+    checkouts: int
+    waits: int
+    timeouts: int
+    created: int
+    recycled: int
+    invalidated: int
+
+
+def default_validate(connection: Any) -> bool:
+    """
+    Check that a connection is still usable.
+
+    Uses ``is_connected()`` (a server ping in mysql.connector) when the driver
+    offers it and falls back to ``SELECT 1``.
+    """
+    is_connected = getattr(connection, 'is_connected', None)
+    if is_connected is not None:
+        return bool(is_connected())
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SELECT 1')
+        cursor.fetchall()
+    finally:
+        cursor.close()
+    return True
+
+
+class _Entry:
+    __slots__ = ('connection', 'created_at')
+
+    def __init__(self, connection: Any, created_at: float):
+        self.connection = connection
+        self.created_at = created_at
+
+
+class PooledConnection:
+    """
+    Connection checked out from a ConnectionPool.
+
+    Delegates everything to the driver connection; ``close()`` hands the
+    connection back to the pool instead of closing it, so code written for
+    plain connections keeps working.
+    """
+
+    def __init__(self, pool: 'ConnectionPool', entry: _Entry):
+        self._pool = pool
+        self._entry: Optional[_Entry] = entry
+        self._discard = False
+
+    @property
+    def raw_connection(self) -> Any:
+        if self._entry is None:
+            raise PoolClosedError("Connection has already been returned to the pool")
+        return self._entry.connection
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.raw_connection, name)
+
+    def invalidate(self) -> None:
+        """Close the underlying connection on release instead of reusing it."""
+        self._discard = True
+
+    def close(self) -> None:
+        """Return the connection to the pool."""
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._pool._release(entry, self._discard)
+
+    def __enter__(self) -> 'PooledConnection':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool with a fixed maximum size.
+
+    Connections are validated on checkout (pre-ping), replaced once they
+    exceed ``max_lifetime`` seconds and handed out most-recently-used first,
+    so surplus connections age out instead of being kept warm.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        size: int = 5,
+        timeout: float = 30.0,
+        max_lifetime: Optional[float] = 3600.0,
+        pre_ping: bool = True,
+        validate: Callable[[Any], bool] = default_validate,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            connect: Factory that opens a new driver connection
+            size: Maximum number of open connections
+            timeout: Default seconds to wait for a free connection
+            max_lifetime: Seconds after which a connection is recycled, None to disable
+            pre_ping: Validate idle connections before handing them out
+            validate: Callable that returns True if a connection is usable
+            clock: Monotonic clock, replaceable in tests
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self._connect = connect
+        self._size = size
+        self._timeout = timeout
+        self._max_lifetime = max_lifetime
+        self._pre_ping = pre_ping
+        self._validate = validate
+        self._clock = clock
+
+        self._condition = threading.Condition()
+        self._idle: Deque[_Entry] = deque()
+        self._open = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._invalidated = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        Check out a connection.
+
+        Args:
+            timeout: Seconds to wait for a free connection, defaults to the pool timeout
+
+        Returns:
+            PooledConnection that must be closed to return it
+
+        Raises:
+            PoolTimeoutError: If no connection became available in time
+            PoolClosedError: If the pool has been closed
+        """
+        if timeout is None:
+            timeout = self._timeout
+
+        entry = None
+        deadline = None
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolClosedError("Connection pool is closed")
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._open < self._size:
+                    # Reserve the slot now, connect outside the lock
+                    self._open += 1
+                    break
+
+                now = self._clock()
+                if deadline is None:
+                    self._waits += 1
+                    deadline = now + timeout
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available within {timeout:.1f}s"
+                    )
+                self._condition.wait(remaining)
+
+        if entry is not None:
+            entry = self._check(entry)
+        if entry is None:
+            entry = self._create()
+
+        with self._condition:
+            self._checkouts += 1
+        return PooledConnection(self, entry)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[PooledConnection]:
+        """Context manager that checks out a connection and returns it afterwards."""
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled
+        finally:
+            pooled.close()
+
+    def stats(self) -> PoolStats:
+        """Return a snapshot of the pool counters."""
+        with self._condition:
+            idle = len(self._idle)
+            return PoolStats(
+                size=self._size,
+                in_use=self._open - idle,
+                idle=idle,
+                checkouts=self._checkouts,
+                waits=self._waits,
+                timeouts=self._timeouts,
+                created=self._created,
+                recycled=self._recycled,
+                invalidated=self._invalidated
+            )
+
+    def close(self) -> None:
+        """Close all idle connections; checked-out ones are closed on release."""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._condition.notify_all()
+        for entry in idle:
+            self._close_quietly(entry.connection)
+
+    def _check(self, entry: _Entry) -> Optional[_Entry]:
+        """Return the entry if it may be reused, otherwise close it (keeping its slot)."""
+        if self._max_lifetime is not None and self._clock() - entry.created_at >= self._max_lifetime:
+            with self._condition:
+                self._recycled += 1
+            self._close_quietly(entry.connection)
+            return None
+
+        if self._pre_ping:
+            try:
+                usable = self._validate(entry.connection)
+            except Exception:
+                usable = False
+            if not usable:
+                with self._condition:
+                    self._invalidated += 1
+                self._close_quietly(entry.connection)
+                return None
+
+        return entry
+
+    def _create(self) -> _Entry:
+        try:
+            connection = self._connect()
+        except BaseException:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._created += 1
+        return _Entry(connection, self._clock())
+
+    def _release(self, entry: _Entry, discard: bool) -> None:
+        with self._condition:
+            if not discard and not self._closed:
+                self._idle.append(entry)
+                self._condition.notify()
+                return
+            self._open -= 1
+            self._condition.notify()
+        self._close_quietly(entry.connection)
+
+    @staticmethod
+    def _close_quietly(connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
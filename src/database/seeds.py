@@ -0,0 +1,157 @@
+"""
+Seed data for Pizza Calculator application.
+
+Loaded by the migration runner with one ``executemany`` per statement.
+Every statement is idempotent, so seeding may be re-applied.
+
+Preferment methods are matched by name and never overwritten: databases
+created by the old init_database() already have rows with these ids under
+other names (3 'Sourdough Starter', 4 'Sponge'), and recipes point at them.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+
+@dataclass(frozen=True)
+class SeedData:
+    """Rows for one table together with the statement that loads them."""
+    table: str
+    sql: str
+    rows: Tuple[Tuple[Any, ...], ...]
+
+# Vorteig-Methoden Daten
+PREFERMENT_METHODS: List[Dict[str, Any]] = [
+    {
+        "id": 1,
+        "name": "Poolish",
+        "description": "Flüssiger Vorteig mit gleichen Teilen Mehl und Wasser",
+        "flour_ratio": 0.5,
+        "water_ratio": 0.5,
+        "yeast_ratio": 0.001,
+        "fermentation_time": "12-16 Stunden",
+        "temperature": "20-22°C"
+    },
+    {
+        "id": 2,
+        "name": "Biga",
+        "description": "Fester italienischer Vorteig",
+        "flour_ratio": 1.0,
+        "water_ratio": 0.45,
+        "yeast_ratio": 0.001,
+        "fermentation_time": "12-24 Stunden",
+        "temperature": "18-20°C"
+    },
+    {
+        "id": 3,
+        "name": "Pâte Fermentée",
+        "description": "Alter Teig als Vorteig verwendet",
+        "flour_ratio": 1.0,
+        "water_ratio": 0.6,
+        "yeast_ratio": 0.02,
+        "fermentation_time": "8-24 Stunden",
+        "temperature": "4-6°C"
+    },
+    {
+        "id": 4,
+        "name": "Sauerteig",
+        "description": "Natürlich fermentierter Vorteig mit wilden Hefen",
+        "flour_ratio": 1.0,
+        "water_ratio": 1.0,
+        "yeast_ratio": 0.0,
+        "fermentation_time": "4-12 Stunden",
+        "temperature": "24-28°C"
+    }
+]
+
+# Numeric columns of preferment_methods per id: typical_percentage,
+# fermentation_time_hours and temperature_celsius (middle of the ranges above)
+_PREFERMENT_NOMINALS = {
+    1: (Decimal('20.00'), 14, 21),
+    2: (Decimal('25.00'), 18, 19),
+    3: (Decimal('15.00'), 16, 5),
+    4: (Decimal('15.00'), 8, 26)
+}
+
+PIZZA_STYLES = SeedData(
+    table='pizza_styles',
+    sql=(
+        "INSERT INTO pizza_styles "
+        "(name, description, typical_hydration, typical_salt_percentage, typical_yeast_percentage) "
+        "VALUES (%s, %s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE description = VALUES(description), "
+        "typical_hydration = VALUES(typical_hydration), "
+        "typical_salt_percentage = VALUES(typical_salt_percentage), "
+        "typical_yeast_percentage = VALUES(typical_yeast_percentage)"
+    ),
+    rows=(
+        ('Neapolitan', 'Traditional Neapolitan pizza with high hydration', Decimal('65.00'), Decimal('2.50'), Decimal('0.25')),
+        ('New York Style', 'Thin crust New York style pizza', Decimal('60.00'), Decimal('2.00'), Decimal('0.50')),
+        ('Sicilian', 'Thick crust Sicilian style pizza', Decimal('65.00'), Decimal('2.00'), Decimal('1.00')),
+        ('Roman', 'Thin and crispy Roman style pizza', Decimal('70.00'), Decimal('2.50'), Decimal('0.30')),
+        ('Chicago Deep Dish', 'Thick crust Chicago style pizza', Decimal('55.00'), Decimal('2.00'), Decimal('1.50'))
+    )
+)
+
+PREFERMENT_METHOD_ROWS = SeedData(
+    table='preferment_methods',
+    sql=(
+        "INSERT IGNORE INTO preferment_methods "
+        "(name, description, typical_percentage, fermentation_time_hours, temperature_celsius, "
+        "flour_ratio, water_ratio, yeast_ratio, fermentation_time, temperature) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+    ),
+    rows=tuple(
+        (
+            method['name'],
+            method['description'],
+            *_PREFERMENT_NOMINALS[method['id']],
+            Decimal(str(method['flour_ratio'])),
+            Decimal(str(method['water_ratio'])),
+            Decimal(str(method['yeast_ratio'])),
+            method['fermentation_time'],
+            method['temperature']
+        )
+        for method in PREFERMENT_METHODS
+    )
+)
+
+# Fills the columns added by 0001_preferment_method_details.sql on rows that
+# existed before it; rows whose details were already set stay as they are
+PREFERMENT_METHOD_DETAILS = SeedData(
+    table='preferment_methods',
+    sql=(
+        "UPDATE preferment_methods "
+        "SET flour_ratio = %s, water_ratio = %s, yeast_ratio = %s, fermentation_time = %s, temperature = %s "
+        "WHERE name = %s AND fermentation_time IS NULL AND temperature IS NULL"
+    ),
+    rows=tuple(
+        (
+            Decimal(str(method['flour_ratio'])),
+            Decimal(str(method['water_ratio'])),
+            Decimal(str(method['yeast_ratio'])),
+            method['fermentation_time'],
+            method['temperature'],
+            method['name']
+        )
+        for method in PREFERMENT_METHODS
+    )
+)
+
+WIDGETS = SeedData(
+    table='widgets',
+    sql=(
+        "INSERT INTO widgets (name, widget_type, configuration, is_active, display_order) "
+        "VALUES (%s, %s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE widget_type = VALUES(widget_type), "
+        "configuration = VALUES(configuration), display_order = VALUES(display_order)"
+    ),
+    rows=(
+        ('Pizza Calculator', 'calculator', '{"default_pizzas": 4, "default_weight": 250}', True, 1),
+        ('Hydration Converter', 'converter', '{"conversion_types": ["percentage_to_grams", "grams_to_percentage"]}', True, 2),
+        ('Fermentation Timer', 'timer', '{"default_hours": 24, "temperature_adjustment": true}', True, 3),
+        ('Ingredient Reference', 'reference', '{"categories": ["flour", "yeast", "salt", "water"]}', True, 4)
+    )
+)
+
+SEEDS: Tuple[SeedData, ...] = (PIZZA_STYLES, PREFERMENT_METHOD_ROWS, PREFERMENT_METHOD_DETAILS, WIDGETS)
@@ -0,0 +1,319 @@
+"""
+Write-behind persistence for the calculation history.
+
+Request handlers hand ``Calculation`` records to a CalculationWriter and
+return immediately; a background thread collects them into batches and
+inserts each batch with one executemany() on a pooled connection:
+
+    writer = CalculationWriter()
+    writer.submit(calculation)      # returns at once unless the queue is full
+    ...
+    writer.close()                  # flushes what is left (also run at exit)
+
+A batch is written when it reaches ``batch_size`` records or when its
+oldest record has waited ``flush_interval`` seconds. The queue is bounded:
+when the database falls behind, submit() waits up to ``put_timeout`` and
+then raises WriteBehindFullError, so memory stays bounded and callers see
+the overload instead of losing records silently.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, ContextManager, Iterable, List, Optional, Tuple
+
+from src.metrics import REGISTRY, MetricsRegistry
+
+# Columns written per calculation, in INSERT order
+CALCULATION_COLUMNS = (
+    'recipe_id',
+    'number_of_pizzas',
+    'pizza_weight',
+    'total_flour',
+    'total_water',
+    'total_salt',
+    'total_yeast',
+    'total_oil',
+    'total_sugar',
+    'preferment_flour',
+    'preferment_water',
+    'preferment_yeast',
+    'main_dough_flour',
+    'main_dough_water',
+    'main_dough_salt',
+    'main_dough_yeast',
+    'calculated_at'
+)
+
+FLUSH_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class WriteBehindFullError(TimeoutError):
+    """Raised by submit() when the queue stays full for the put timeout."""
+
+
+class WriterClosedError(RuntimeError):
+    """Raised by submit() after close()."""
+
+
+@dataclass
+class WriterStats:
+    """Snapshot of the writer counters."""
+    queue_depth: int
+    submitted: int
+    written: int
+    rejected: int
+    failed: int
+    flushes: int
+    retries: int
+    last_flush_seconds: float
+
+
+class _FlushRequest:
+    __slots__ = ('done',)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+def _default_connection_factory() -> ContextManager[Any]:
+    from .connection import pooled_connection
+    return pooled_connection()
+
+
+class CalculationWriter:
+    """
+    Bounded write-behind queue with one background flusher thread
+
+    Args:
+        connection_factory: Context manager factory yielding a DB-API connection
+        placeholder: Parameter style of the driver ('%s' for MySQL, '?' for sqlite3)
+        batch_size: Records per executemany()
+        flush_interval: Longest time in seconds a record waits before it is written
+        max_queue: Records held in memory at most
+        put_timeout: Seconds submit() waits for space in a full queue
+        max_retries: Retries of a failed batch before its records are dropped
+        retry_delay: Seconds before the first retry, doubled per attempt
+        registry: Metrics registry for flush latency and queue depth
+        name: Label value of this writer in the metrics
+    """
+
+    def __init__(
+        self,
+        connection_factory: Callable[[], ContextManager[Any]] = _default_connection_factory,
+        placeholder: str = '%s',
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        put_timeout: float = 0.05,
+        max_retries: int = 3,
+        retry_delay: float = 0.1,
+        registry: MetricsRegistry = REGISTRY,
+        name: str = 'calculations'
+    ):
+        if batch_size < 1 or max_queue < 1:
+            raise ValueError("batch_size and max_queue must be at least 1")
+        self._connection_factory = connection_factory
+        self._sql = (f"INSERT INTO calculations ({', '.join(CALCULATION_COLUMNS)}) "
+                     f"VALUES ({', '.join([placeholder] * len(CALCULATION_COLUMNS))})")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.name = name
+
+        self._queue: 'queue.Queue[Any]' = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+        self._counter_lock = threading.Lock()
+        self._submitted = 0
+        self._written = 0
+        self._rejected = 0
+        self._failed = 0
+        self._flushes = 0
+        self._retries = 0
+        self._last_flush_seconds = 0.0
+
+        self._flush_duration = registry.histogram(
+            'write_behind_flush_duration_seconds', 'Duration of one batch insert in seconds',
+            ('writer', 'outcome'), FLUSH_BUCKETS
+        )
+        self._queue_depth = registry.gauge(
+            'write_behind_queue_depth', 'Records waiting to be written', ('writer',)
+        )
+        self._queue_depth.set_function(self._queue.qsize, name)
+
+        self._thread = threading.Thread(target=self._run, name=f'write-behind-{name}', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- Producer side ---------------------------------------------------------
+
+    def submit(self, calculation: Any, timeout: Optional[float] = None) -> None:
+        """
+        Queue one calculation for writing
+
+        ``calculated_at`` is set to now if missing, so the row records when the
+        calculation was served rather than when it was flushed.
+
+        Raises:
+            WriteBehindFullError: If the queue stays full for ``timeout`` (default put_timeout)
+            WriterClosedError: After close()
+        """
+        if self._closed:
+            raise WriterClosedError("Calculation writer is closed")
+        row = self._row(calculation)
+        try:
+            self._queue.put(row, timeout=self.put_timeout if timeout is None else timeout)
+        except queue.Full:
+            with self._counter_lock:
+                self._rejected += 1
+            raise WriteBehindFullError(f"Calculation queue is full ({self._queue.maxsize} records)") from None
+        with self._counter_lock:
+            self._submitted += 1
+
+    def submit_many(self, calculations: Iterable[Any], timeout: Optional[float] = None) -> None:
+        """submit() for several calculations; stops at the first rejected one."""
+        for calculation in calculations:
+            self.submit(calculation, timeout)
+
+    @staticmethod
+    def _row(calculation: Any) -> Tuple[Any, ...]:
+        values = [getattr(calculation, name) for name in CALCULATION_COLUMNS]
+        if values[-1] is None:
+            values[-1] = datetime.now().replace(microsecond=0)
+        return tuple(values)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write everything submitted so far and wait for it
+
+        Returns:
+            False if the flush did not finish within ``timeout``
+        """
+        if self._closed or not self._thread.is_alive():
+            return True
+        request = _FlushRequest()
+        try:
+            self._queue.put(request, timeout=timeout)
+        except queue.Full:
+            return False
+        return request.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting records, write the remaining ones and stop the thread."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        atexit.unregister(self.close)
+        # Blockiert bei voller Queue, bis der Thread Platz schafft
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            # Datensätze, die parallel zu close() nach _STOP eingereiht wurden
+            leftover = []
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, tuple):
+                    leftover.append(item)
+            self._write(leftover)
+        self._queue_depth.remove(self.name)
+
+    def stats(self) -> WriterStats:
+        with self._counter_lock:
+            return WriterStats(
+                queue_depth=self._queue.qsize(),
+                submitted=self._submitted,
+                written=self._written,
+                rejected=self._rejected,
+                failed=self._failed,
+                flushes=self._flushes,
+                retries=self._retries,
+                last_flush_seconds=self._last_flush_seconds
+            )
+
+    def __enter__(self) -> 'CalculationWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # --- Background thread ------------------------------------------------------
+
+    def _run(self) -> None:
+        batch: List[Tuple[Any, ...]] = []
+        deadline = 0.0
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0) if batch else None)
+            except queue.Empty:
+                # Ältester Datensatz hat flush_interval erreicht
+                self._write(batch)
+                batch = []
+                continue
+
+            if item is _STOP:
+                self._write(batch)
+                return
+            if isinstance(item, _FlushRequest):
+                self._write(batch)
+                batch = []
+                item.done.set()
+                continue
+
+            if not batch:
+                deadline = time.monotonic() + self.flush_interval
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+
+    def _write(self, rows: List[Tuple[Any, ...]]) -> None:
+        if not rows:
+            return
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                self._insert(rows)
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                self._flush_duration.observe(elapsed, self.name, 'error')
+                if attempt == self.max_retries:
+                    logging.error(f"Dropping {len(rows)} calculations after {attempt + 1} failed writes: {e}")
+                    with self._counter_lock:
+                        self._failed += len(rows)
+                    return
+                logging.warning(f"Writing {len(rows)} calculations failed, retrying: {e}")
+                with self._counter_lock:
+                    self._retries += 1
+                time.sleep(self.retry_delay * 2 ** attempt)
+            else:
+                elapsed = time.perf_counter() - start
+                self._flush_duration.observe(elapsed, self.name, 'ok')
+                with self._counter_lock:
+                    self._written += len(rows)
+                    self._flushes += 1
+                    self._last_flush_seconds = elapsed
+                return
+
+    def _insert(self, rows: List[Tuple[Any, ...]]) -> None:
+        with self._connection_factory() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.executemany(self._sql, rows)
+                connection.commit()
+            finally:
+                cursor.close()
@@ -1,10 +1,15 @@
-from fastapi import FastAPI, HTTPException, Path
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Path
+from fastapi.responses import HTMLResponse, Response
 from pydantic import BaseModel
 from typing import Optional
+import os
 import re
 
-app = FastAPI(title="Widget API", version="1.0.0")
+from src.metrics import MetricsMiddleware
+from src.widget_store import WidgetStore, accepts_gzip, etag_matches
+
+# Routes live on a router so that src/asgi.py can mount them as well
+router = APIRouter()
 
 # Pydantic models for validation
 class WidgetResponse(BaseModel):
@@ -12,8 +17,8 @@ class WidgetResponse(BaseModel):
     html: str
     status: str
 
-# In-memory storage for demo purposes
-widgets_db = {
+# Demo widgets; bodies are pre-encoded when stored
+DEFAULT_WIDGETS = {
     "sample-widget": {
         "html": """
         <div style="border: 1px solid #ccc; padding: 10px; border-radius: 5px;">
@@ -34,20 +39,44 @@ widgets_db = {
     }
 }
 
+def create_widget_store():
+    """
+    In-memory store per process, or with $WIDGET_STORE_PATH a store shared
+    by all workers through memory-mapped files (src/shared_widget_store.py)
+    """
+    directory = os.environ.get("WIDGET_STORE_PATH")
+    if directory:
+        from src.shared_widget_store import SharedWidgetStore
+        return SharedWidgetStore(directory, DEFAULT_WIDGETS)
+    return WidgetStore(DEFAULT_WIDGETS)
+
+widgets_db = create_widget_store()
+
+WIDGET_HEADERS = {
+    "Cache-Control": "public, max-age=300",  # Cache for 5 minutes
+    "X-Frame-Options": "ALLOWALL",  # Allow embedding in iframes
+    "Access-Control-Allow-Origin": "*",  # Allow cross-origin requests
+    "Vary": "Accept-Encoding"
+}
+
 def validate_widget_key(key: str) -> bool:
     """Validate widget key format"""
     # Key should be alphanumeric with hyphens, 3-50 characters
     pattern = r'^[a-zA-Z0-9-]{3,50}$'
     return bool(re.match(pattern, key))
 
-@app.get("/widget/{key}", response_class=HTMLResponse)
+@router.get("/widget/{key}", response_class=HTMLResponse)
 async def get_widget(
-    key: str = Path(..., description="Widget key identifier", min_length=3, max_length=50)
+    key: str = Path(..., description="Widget key identifier", min_length=3, max_length=50),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
 ):
     """
     Get embeddable widget by key
     
-    Returns HTML content that can be embedded in other websites
+    Returns HTML content that can be embedded in other websites. Responses
+    carry a strong ETag; a matching If-None-Match yields 304, and clients
+    accepting gzip get the precompressed body.
     """
     
     # Input validation
@@ -57,14 +86,15 @@ async def get_widget(
             detail="Invalid widget key format. Key must be 3-50 characters long and contain only letters, numbers, and hyphens."
         )
     
-    # Check if widget exists
-    if key not in widgets_db:
+    # Record und Kodierungen aus demselben Snapshot lesen
+    found = widgets_db.lookup(key)
+    if found is None:
         raise HTTPException(
             status_code=404,
             detail=f"Widget with key '{key}' not found"
         )
     
-    widget = widgets_db[key]
+    widget, encoded = found
     
     # Check if widget is active
     if widget.get("status") != "active":
@@ -73,27 +103,33 @@ async def get_widget(
             detail=f"Widget '{key}' is not available"
         )
     
-    # Return HTML content
-    return HTMLResponse(
-        content=widget["html"],
-        headers={
-            "Content-Type": "text/html; charset=utf-8",
-            "Cache-Control": "public, max-age=300",  # Cache for 5 minutes
-            "X-Frame-Options": "ALLOWALL",  # Allow embedding in iframes
-            "Access-Control-Allow-Origin": "*"  # Allow cross-origin requests
-        }
-    )
+    use_gzip = encoded.gzip_body is not None and accepts_gzip(accept_encoding)
+    etag = encoded.gzip_etag if use_gzip else encoded.etag
+    
+    # Conditional request: client already has this version
+    if etag_matches(if_none_match, encoded.etags):
+        return Response(status_code=304, headers={**WIDGET_HEADERS, "ETag": etag})
+    
+    headers = {**WIDGET_HEADERS, "ETag": etag}
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return HTMLResponse(content=encoded.gzip_body, headers=headers)
+    return HTMLResponse(content=encoded.body, headers=headers)
 
-@app.get("/")
+@router.get("/")
 async def root():
     """Root endpoint"""
     return {"message": "Widget API is running"}
 
-@app.get("/health")
+@router.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "widgets_count": len(widgets_db)}
 
+app = FastAPI(title="Widget API", version="1.0.0")
+app.add_middleware(MetricsMiddleware, app_name="widget")
+app.include_router(router)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,333 @@
+"""
+Request metrics shared by the Flask and ASGI apps.
+
+Histograms are sharded per thread: every thread writes only its own
+counters, so observing a request takes no lock. When a thread ends, its
+shard is folded into a shared total, so per-request server threads do not
+pile up shards. Shards are merged when /metrics is scraped and rendered in
+the Prometheus text format.
+
+Usage:
+
+    instrument_flask(app, 'sync')                          # Flask
+    app.add_middleware(MetricsMiddleware, app_name='widget')   # FastAPI/Starlette
+"""
+
+import bisect
+import math
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRICS_PATH = '/metrics'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(float(4 ** exponent) for exponent in range(3, 13))  # 64 B .. 16 MiB
+
+# Label value for requests that matched no route, keeps cardinality bounded
+UNMATCHED_ROUTE = 'unmatched'
+
+LabelValues = Tuple[str, ...]
+
+
+class Histogram:
+    """
+    Prometheus histogram with per-thread shards
+
+    Each shard maps label values to [bucket counts..., +Inf count, sum].
+    The shard of a finished thread is added to ``_retired`` and dropped, so
+    counts never go backwards and only live threads hold a shard.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        # id(shard) -> shard of every live thread
+        self._shards: Dict[int, Dict[LabelValues, List[float]]] = {}
+        self._retired: Dict[LabelValues, List[float]] = {}
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[LabelValues, List[float]]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = {}
+            # Der Wächter lebt im Thread-Local-Speicher und wird mit dem Thread freigegeben
+            sentinel = _ThreadSentinel()
+            weakref.finalize(sentinel, self._retire, shard)
+            self._local.sentinel = sentinel
+            self._local.shard = shard
+            with self._shards_lock:
+                self._shards[id(shard)] = shard
+        return shard
+
+    def _retire(self, shard: Dict[LabelValues, List[float]]) -> None:
+        """Fold the shard of a finished thread into the shared total."""
+        with self._shards_lock:
+            self._shards.pop(id(shard), None)
+            _merge(self._retired, shard)
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        """Record one value for the given label values (in labelnames order)"""
+        shard = self._shard()
+        series = shard.get(labelvalues)
+        if series is None:
+            series = shard[labelvalues] = [0.0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def collect(self) -> Dict[LabelValues, List[float]]:
+        """Merged counts of all shards"""
+        merged: Dict[LabelValues, List[float]] = {}
+        with self._shards_lock:
+            _merge(merged, self._retired)
+            for shard in self._shards.values():
+                _merge(merged, shard)
+        return merged
+
+
+class _ThreadSentinel:
+    """Per-thread object whose finalizer retires the thread's histogram shard"""
+
+
+def _merge(target: Dict[LabelValues, List[float]], shard: Dict[LabelValues, List[float]]) -> None:
+    for labelvalues, series in list(shard.items()):
+        total = target.get(labelvalues)
+        if total is None:
+            target[labelvalues] = list(series)
+        else:
+            for i, value in enumerate(series):
+                total[i] += value
+
+
+class Gauge:
+    """
+    Gauge whose values are read from callbacks at scrape time
+
+    For values that already live elsewhere (queue depth, pool usage), so
+    nothing has to be updated on the hot path.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def set_function(self, function: Callable[[], float], *labelvalues: str) -> None:
+        """Read the value for these label values from ``function``"""
+        with self._lock:
+            self._functions[labelvalues] = function
+
+    def remove(self, *labelvalues: str) -> None:
+        with self._lock:
+            self._functions.pop(labelvalues, None)
+
+    def collect(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            functions = list(self._functions.items())
+        return {labelvalues: float(function()) for labelvalues, function in functions}
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_float(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class MetricsRegistry:
+    """Set of histograms and gauges rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str],
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Return the histogram with this name, creating it on first use"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+            return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str]) -> Gauge:
+        """Return the gauge with this name, creating it on first use"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Gauge(name, documentation, labelnames)
+            return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            if isinstance(metric, Gauge):
+                lines.append(f'# TYPE {metric.name} gauge')
+                for labelvalues, value in sorted(metric.collect().items()):
+                    lines.append(f'{metric.name}{_labels(metric.labelnames, labelvalues)} {_format_float(value)}')
+                continue
+            lines.append(f'# TYPE {metric.name} histogram')
+            for labelvalues, series in sorted(metric.collect().items()):
+                cumulative = 0.0
+                for bound, count in zip(metric.buckets + (math.inf,), series):
+                    cumulative += count
+                    le = 'le="' + _format_float(bound) + '"'
+                    lines.append(f'{metric.name}_bucket{_labels(metric.labelnames, labelvalues, le)} '
+                                 f'{_format_float(cumulative)}')
+                labels = _labels(metric.labelnames, labelvalues)
+                lines.append(f'{metric.name}_sum{labels} {_format_float(series[-1])}')
+                lines.append(f'{metric.name}_count{labels} {_format_float(cumulative)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+class RequestMetrics:
+    """The per-request histograms: latency, request size and response size"""
+
+    def __init__(self, app_name: str, registry: MetricsRegistry = REGISTRY):
+        self.app_name = app_name
+        self.registry = registry
+        self.duration = registry.histogram(
+            'http_request_duration_seconds', 'Request latency in seconds',
+            ('app', 'method', 'route', 'status')
+        )
+        self.request_size = registry.histogram(
+            'http_request_size_bytes', 'Request body size in bytes',
+            ('app', 'method', 'route'), SIZE_BUCKETS
+        )
+        self.response_size = registry.histogram(
+            'http_response_size_bytes', 'Response body size in bytes',
+            ('app', 'method', 'route', 'status'), SIZE_BUCKETS
+        )
+
+    def observe(self, method: str, route: str, status: int, seconds: float,
+                request_bytes: Optional[int], response_bytes: Optional[int]) -> None:
+        status_label = str(status)
+        self.duration.observe(seconds, self.app_name, method, route, status_label)
+        self.request_size.observe(float(request_bytes or 0), self.app_name, method, route)
+        if response_bytes is not None:
+            self.response_size.observe(float(response_bytes), self.app_name, method, route, status_label)
+
+
+def instrument_flask(app, app_name: str, registry: MetricsRegistry = REGISTRY,
+                     metrics_path: Optional[str] = METRICS_PATH) -> RequestMetrics:
+    """
+    Record metrics for every request of a Flask app and serve them
+
+    Routes are labelled with their URL rule (e.g. /api/sync), not the raw
+    path. Pass metrics_path=None to skip registering the endpoint.
+    """
+    from flask import Response, g, request
+
+    metrics = RequestMetrics(app_name, registry)
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('_metrics_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+            metrics.observe(
+                request.method, route, response.status_code, time.perf_counter() - start,
+                request.content_length,
+                None if response.is_streamed else response.calculate_content_length()
+            )
+        return response
+
+    if metrics_path:
+        def metrics_endpoint():
+            return Response(registry.render(), content_type=CONTENT_TYPE)
+        app.add_url_rule(metrics_path, 'metrics', metrics_endpoint, methods=['GET'])
+
+    return metrics
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording metrics for every HTTP request
+
+    The route label is the path template of the matched route (set by
+    Starlette/FastAPI in the scope), so /widget/{key} is one series. GET
+    requests to metrics_path are answered directly with the rendered
+    metrics.
+    """
+
+    def __init__(self, app, app_name: str, registry: MetricsRegistry = REGISTRY,
+                 metrics_path: Optional[str] = METRICS_PATH):
+        self.app = app
+        self.metrics = RequestMetrics(app_name, registry)
+        self.registry = registry
+        self.metrics_path = metrics_path
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        if self.metrics_path and scope['path'] == self.metrics_path and scope['method'] == 'GET':
+            await self._send_metrics(send)
+            return
+
+        start = time.perf_counter()
+        request_bytes = 0
+        response = {'status': 500, 'bytes': 0}
+
+        async def receive_wrapper():
+            nonlocal request_bytes
+            message = await receive()
+            if message['type'] == 'http.request':
+                request_bytes += len(message.get('body', b''))
+            return message
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            elif message['type'] == 'http.response.body':
+                response['bytes'] += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            route = scope.get('route')
+            self.metrics.observe(
+                scope['method'], getattr(route, 'path', UNMATCHED_ROUTE), response['status'],
+                time.perf_counter() - start, request_bytes, response['bytes']
+            )
+
+    async def _send_metrics(self, send: Callable) -> None:
+        body = self.registry.render().encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', CONTENT_TYPE.encode('ascii')),
+                        (b'content-length', str(len(body)).encode('ascii'))]
+        })
+        await send({'type': 'http.response.body', 'body': body})
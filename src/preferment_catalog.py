@@ -0,0 +1,176 @@
+"""
+Pre-serialized catalog of preferment methods for /api/preferment-methods.
+
+The full list and every single method are serialized to bytes once per
+data version, together with a strong ETag. Lookups by id and name go
+through dictionaries built at the same time. The data comes from the
+preferment_methods table; a cheap fingerprint query at most every ``ttl``
+seconds decides whether it has to be loaded again. Only one thread runs
+that check; the others keep serving the current version meanwhile. If the
+database is unavailable, the seed data is served until it comes back.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _name_key(name: str) -> str:
+    return name.strip().casefold()
+
+
+class SerializedPayload(NamedTuple):
+    """JSON response body and its strong (quoted) ETag"""
+    body: bytes
+    etag: str
+
+
+class CatalogSnapshot(NamedTuple):
+    """One data version of the catalog"""
+    fingerprint: Hashable
+    from_repository: bool
+    methods: tuple
+    all: SerializedPayload
+    by_id: Dict[int, SerializedPayload]
+    by_name: Dict[str, SerializedPayload]
+
+    def find_by_name(self, name: str) -> Optional[SerializedPayload]:
+        """Response body for one method by name (case-insensitive), None if unknown"""
+        return self.by_name.get(_name_key(name))
+
+
+def _dumps(payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+
+
+def serialize(payload: Any, dumps: Callable[[Any], str] = _dumps) -> SerializedPayload:
+    """Serialize a response payload and derive its ETag from the bytes"""
+    body = dumps(payload).encode('utf-8')
+    return SerializedPayload(body, '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"')
+
+
+class PrefermentCatalog:
+    """
+    Cached, pre-serialized preferment methods
+
+    Args:
+        repository: Source with get_all() and fingerprint(), defaults to
+            MySQLPrefermentMethodRepository
+        fallback: Source used while the repository fails, defaults to the
+            seed data
+        ttl: Seconds between fingerprint checks
+        dumps: JSON serializer, e.g. the Flask app's app.json.dumps
+    """
+
+    def __init__(
+        self,
+        repository=None,
+        fallback=None,
+        ttl: float = 30.0,
+        dumps: Callable[[Any], str] = _dumps,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if repository is None:
+            from src.repositories.preferment_repository import MySQLPrefermentMethodRepository
+            repository = MySQLPrefermentMethodRepository()
+        if fallback is None:
+            from src.repositories.preferment_repository import StaticPrefermentMethodRepository
+            fallback = StaticPrefermentMethodRepository()
+        self.repository = repository
+        self.fallback = fallback
+        self.ttl = ttl
+        self._dumps = dumps
+        self._clock = clock
+        # _lock schützt nur den Zustand, _refresh_lock lässt einen Thread laden
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._next_check = 0.0
+        self._generation = 0
+
+    def snapshot(self) -> CatalogSnapshot:
+        """
+        Current data version, refreshed if the TTL has expired
+
+        While one thread queries the repository, the others get the current
+        version right away; only the very first load is waited for.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and self._clock() < self._next_check:
+            return snapshot
+        if not self._refresh_lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            with self._lock:
+                current = self._snapshot
+                if current is not None and self._clock() < self._next_check:
+                    return current
+                generation = self._generation
+            snapshot = self._refresh(current)
+            with self._lock:
+                self._snapshot = snapshot
+                # invalidate() während des Ladens: beim nächsten Zugriff erneut prüfen
+                if generation == self._generation:
+                    self._next_check = self._clock() + self.ttl
+            return snapshot
+        finally:
+            self._refresh_lock.release()
+
+    def is_stale(self) -> bool:
+        """True if the next access queries the repository (async callers offload it)"""
+        return self._snapshot is None or self._clock() >= self._next_check
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """Last loaded data version without refreshing, None before the first load"""
+        return self._snapshot
+
+    def all(self) -> SerializedPayload:
+        """Response body with all methods"""
+        return self.snapshot().all
+
+    def by_id(self, method_id: int) -> Optional[SerializedPayload]:
+        """Response body for one method, None if unknown"""
+        return self.snapshot().by_id.get(method_id)
+
+    def by_name(self, name: str) -> Optional[SerializedPayload]:
+        """Response body for one method by name (case-insensitive), None if unknown"""
+        return self.snapshot().find_by_name(name)
+
+    def invalidate(self) -> None:
+        """Force a fingerprint check on the next access, e.g. after writes"""
+        with self._lock:
+            self._generation += 1
+            self._next_check = 0.0
+
+    def _refresh(self, current: Optional[CatalogSnapshot]) -> CatalogSnapshot:
+        try:
+            fingerprint = self.repository.fingerprint()
+            if current is not None and current.from_repository and fingerprint == current.fingerprint:
+                return current
+            return self._build(self.repository.get_all(), fingerprint, True)
+        except Exception as e:
+            logger.warning(f"Loading preferment methods failed, serving cached data: {e}")
+            if current is not None:
+                return current
+            return self._build(self.fallback.get_all(), None, False)
+
+    def _build(self, methods: List[Dict[str, Any]], fingerprint: Hashable, from_repository: bool) -> CatalogSnapshot:
+        methods = tuple(methods)
+        by_id: Dict[int, SerializedPayload] = {}
+        by_name: Dict[str, SerializedPayload] = {}
+        for method in methods:
+            payload = serialize({"success": True, "data": method}, self._dumps)
+            by_id[method["id"]] = payload
+            by_name[_name_key(method["name"])] = payload
+
+        everything = serialize({
+            "success": True,
+            "data": list(methods),
+            "count": len(methods)
+        }, self._dumps)
+        return CatalogSnapshot(fingerprint, from_repository, methods, everything, by_id, by_name)
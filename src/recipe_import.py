@@ -0,0 +1,671 @@
+"""
+Importer for recipe files in data/recipes.
+
+    python -m src.recipe_import [directory] [--workers N]
+
+Supported formats:
+
+- JSON/YAML (.json, .yaml, .yml): a single recipe object, a list of
+  recipes, or an object with "recipes" and optional "pizza_styles" lists.
+  YAML needs PyYAML, which is only imported when a YAML file is found.
+- CSV (.csv): one recipe per row, header with the field names.
+
+A recipe names its style with "pizza_style" (name) or "pizza_style_id" and
+optionally its preferment with "preferment_method" or
+"preferment_method_id". Required: name, pizza style, water_percentage,
+salt_percentage and yeast_percentage.
+
+Files are parsed in a process pool. An on-disk index (path, mtime, size,
+SHA-256) skips files that have not changed since the last run; a file
+whose content is unchanged despite a new mtime is not written again. The
+recipes of a changed file are matched by (source_file, name): existing
+rows are updated in place, so their ids and calculation history survive a
+re-import; only recipes no longer in the file are deleted. Recipes of
+deleted files are removed. A file with an invalid recipe is skipped as a
+whole and retried on the next run.
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.database.columnar import RecipeTable
+from src.database.models import CompactPizzaStyle, CompactRecipe
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECIPES_DIR = os.path.join(BASE_DIR, 'data', 'recipes')
+INDEX_PATH = os.path.join(BASE_DIR, 'data', 'recipe_import_index.db')
+
+EXTENSIONS = ('.json', '.csv', '.yaml', '.yml')
+
+# Files per parse window and database transaction
+DEFAULT_BATCH_FILES = 500
+
+DECIMAL_FIELDS = (
+    'flour_weight',
+    'water_percentage',
+    'salt_percentage',
+    'yeast_percentage',
+    'preferment_percentage',
+    'oil_percentage',
+    'sugar_percentage'
+)
+INT_FIELDS = ('fermentation_time_hours', 'fermentation_temperature')
+REQUIRED_FIELDS = ('name', 'water_percentage', 'salt_percentage', 'yeast_percentage')
+
+# Wertebereiche der DECIMAL-Spalten in recipes (inklusive)
+DECIMAL_LIMITS = {
+    'flour_weight': (Decimal('0.01'), Decimal('999999.99')),
+    'water_percentage': (Decimal('0.00'), Decimal('999.99')),
+    'salt_percentage': (Decimal('0.00'), Decimal('99.99')),
+    'yeast_percentage': (Decimal('0.00'), Decimal('99.99')),
+    'preferment_percentage': (Decimal('0.00'), Decimal('999.99')),
+    'oil_percentage': (Decimal('0.00'), Decimal('99.99')),
+    'sugar_percentage': (Decimal('0.00'), Decimal('99.99'))
+}
+MAX_NAME_LENGTH = 200
+
+STYLE_FIELDS = ('name', 'description', 'typical_hydration', 'typical_salt_percentage', 'typical_yeast_percentage')
+
+# Wertebereiche der DECIMAL-Spalten in pizza_styles (inklusive)
+STYLE_DECIMAL_LIMITS = {
+    'typical_hydration': (Decimal('0.00'), Decimal('999.99')),
+    'typical_salt_percentage': (Decimal('0.00'), Decimal('99.99')),
+    'typical_yeast_percentage': (Decimal('0.00'), Decimal('99.99'))
+}
+MAX_STYLE_NAME_LENGTH = 100
+
+RECIPE_COLUMNS = (
+    'name', 'pizza_style_id', 'preferment_method_id', 'flour_weight', 'water_percentage',
+    'salt_percentage', 'yeast_percentage', 'preferment_percentage', 'oil_percentage',
+    'sugar_percentage', 'fermentation_time_hours', 'fermentation_temperature', 'notes', 'source_file'
+)
+
+
+class ImportedRecipe(NamedTuple):
+    """Parsed recipe whose style and preferment may still be given by name"""
+    recipe: CompactRecipe
+    pizza_style: Optional[str]
+    preferment_method: Optional[str]
+
+
+class ParsedFile(NamedTuple):
+    """Result of parsing one file in a worker process"""
+    path: str
+    mtime_ns: int
+    size: int
+    sha256: str
+    recipes: List[ImportedRecipe]
+    styles: List[CompactPizzaStyle]
+    errors: List[str]
+
+
+class FileError(NamedTuple):
+    """Problem that keeps one file from being imported"""
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+@dataclass
+class ImportReport:
+    scanned: int = 0
+    unchanged: int = 0
+    imported_files: int = 0
+    recipes: int = 0
+    removed_files: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+# --- Parsing (runs in worker processes) ---------------------------------------
+
+def _load_yaml(data: bytes) -> Any:
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError("PyYAML is required to import YAML files (pip install pyyaml)")
+    try:
+        return yaml.safe_load(data)
+    except yaml.YAMLError as e:
+        raise ValueError(f"invalid YAML: {e}")
+
+
+def _record_list(document: Dict[str, Any], key: str) -> List[Any]:
+    value = document.get(key)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f'"{key}" must be a list')
+    return value
+
+
+def _records(path: str, data: bytes) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Raw recipe and style dictionaries of a file"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        text = data.decode('utf-8-sig')
+        try:
+            rows = [{key: value for key, value in row.items() if value not in ('', None)}
+                    for row in csv.DictReader(io.StringIO(text))]
+        except csv.Error as e:
+            raise ValueError(f"invalid CSV: {e}")
+        return rows, []
+
+    document = _load_yaml(data) if extension in ('.yaml', '.yml') else json.loads(data)
+    if isinstance(document, list):
+        return document, []
+    if isinstance(document, dict) and ('recipes' in document or 'pizza_styles' in document):
+        return _record_list(document, 'recipes'), _record_list(document, 'pizza_styles')
+    if isinstance(document, dict):
+        return [document], []
+    raise ValueError("expected an object or a list of recipes")
+
+
+def _decimal(value: Any) -> Decimal:
+    try:
+        result = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"not a number: {value!r}")
+    if not result.is_finite():
+        raise ValueError(f"not a number: {value!r}")
+    return result
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    return None if value in (None, '') else int(value)
+
+
+def _parse_recipe(raw: Any, source_file: str) -> ImportedRecipe:
+    if not isinstance(raw, dict):
+        raise ValueError("recipe must be an object")
+    missing = [name for name in REQUIRED_FIELDS if raw.get(name) in (None, '')]
+    if raw.get('pizza_style') in (None, '') and raw.get('pizza_style_id') in (None, ''):
+        missing.append('pizza_style')
+    if missing:
+        raise ValueError(f"missing required field(s): {', '.join(missing)}")
+
+    values: Dict[str, Any] = {
+        'name': str(raw['name']).strip(),
+        'pizza_style_id': _optional_int(raw.get('pizza_style_id')) or 0,
+        'preferment_method_id': _optional_int(raw.get('preferment_method_id')),
+        'notes': raw.get('notes'),
+        'source_file': source_file
+    }
+    for name in DECIMAL_FIELDS:
+        if raw.get(name) not in (None, ''):
+            values[name] = _decimal(raw[name])
+    for name in INT_FIELDS:
+        if raw.get(name) not in (None, ''):
+            values[name] = int(raw[name])
+
+    style = raw.get('pizza_style')
+    method = raw.get('preferment_method')
+    return ImportedRecipe(
+        CompactRecipe(**values),
+        str(style).strip() if style not in (None, '') else None,
+        str(method).strip() if method not in (None, '') else None
+    )
+
+
+def _parse_style(raw: Any) -> CompactPizzaStyle:
+    if not isinstance(raw, dict) or raw.get('name') in (None, ''):
+        raise ValueError("pizza style needs a name")
+    values = {name: raw[name] for name in STYLE_FIELDS if raw.get(name) not in (None, '')}
+    for name, (low, high) in STYLE_DECIMAL_LIMITS.items():
+        if name in values:
+            values[name] = _decimal(values[name])
+            if not low <= values[name] <= high:
+                raise ValueError(f"{name} must be between {low} and {high}")
+    values['name'] = str(values['name']).strip()
+    if not values['name']:
+        raise ValueError("pizza style needs a name")
+    if len(values['name']) > MAX_STYLE_NAME_LENGTH:
+        raise ValueError(f"pizza style name must be at most {MAX_STYLE_NAME_LENGTH} characters")
+    return CompactPizzaStyle(**values)
+
+
+def parse_file(path: str, relative_path: str) -> ParsedFile:
+    """
+    Read, hash and parse one recipe file
+
+    Never raises: problems are returned in ParsedFile.errors, prefixed with
+    the file and, for single recipes, their position.
+    """
+    recipes: List[ImportedRecipe] = []
+    styles: List[CompactPizzaStyle] = []
+    errors: List[str] = []
+    try:
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return ParsedFile(relative_path, 0, 0, '', [], [], [f"{relative_path}: {e}"])
+
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        raw_recipes, raw_styles = _records(path, data)
+    except (ValueError, UnicodeDecodeError) as e:
+        errors.append(f"{relative_path}: {e}")
+    else:
+        for position, raw in enumerate(raw_styles):
+            try:
+                styles.append(_parse_style(raw))
+            except (ValueError, TypeError) as e:
+                errors.append(f"{relative_path}: pizza style {position + 1}: {e}")
+        names: Dict[str, int] = {}
+        for position, raw in enumerate(raw_recipes):
+            try:
+                item = _parse_recipe(raw, relative_path)
+            except (ValueError, TypeError) as e:
+                errors.append(f"{relative_path}: recipe {position + 1}: {e}")
+                continue
+            # (source_file, name) ist eindeutig, MySQL vergleicht ohne Groß-/Kleinschreibung
+            first = names.setdefault(item.recipe.name.casefold(), position + 1)
+            if first != position + 1:
+                errors.append(f"{relative_path}: recipe {position + 1}: "
+                              f"duplicate name {item.recipe.name!r} (also recipe {first})")
+            recipes.append(item)
+    return ParsedFile(relative_path, stat.st_mtime_ns, stat.st_size, digest, recipes, styles, errors)
+
+
+def _parse_file_args(args: Tuple[str, str]) -> ParsedFile:
+    return parse_file(*args)
+
+
+# --- Bulk validation -----------------------------------------------------------
+
+def validate_recipes(recipes: Sequence[CompactRecipe]) -> Dict[int, List[str]]:
+    """
+    Check the value ranges of many recipes at once on their columns
+
+    Returns:
+        Recipe position -> error messages, only for invalid recipes
+    """
+    if not recipes:
+        return {}
+    table = RecipeTable.from_records(recipes)
+    problems: Dict[int, List[str]] = {}
+
+    def flag(mask: np.ndarray, message: str) -> None:
+        for position in np.flatnonzero(mask).tolist():
+            problems.setdefault(position, []).append(message)
+
+    for name, (low, high) in DECIMAL_LIMITS.items():
+        values = table.array(name)
+        scale = 10 ** RecipeTable._COLUMN_MAP[name].scale
+        flag((values < int(low * scale)) | (values > int(high * scale)), f"{name} must be between {low} and {high}")
+
+    names = table.array('name')
+    lengths = np.fromiter((len(name) for name in names), dtype=np.int64, count=len(names))
+    flag(lengths == 0, "name must not be empty")
+    flag(lengths > MAX_NAME_LENGTH, f"name must be at most {MAX_NAME_LENGTH} characters")
+    return problems
+
+
+# --- Index ----------------------------------------------------------------------
+
+class ImportIndex:
+    """SQLite file index: relative path -> (mtime_ns, size, sha256)"""
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "sha256 TEXT NOT NULL, recipes INTEGER NOT NULL, imported_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def entries(self) -> Dict[str, Tuple[int, int, str]]:
+        """All indexed files"""
+        return {
+            path: (mtime_ns, size, sha256)
+            for path, mtime_ns, size, sha256 in self._connection.execute(
+                "SELECT path, mtime_ns, size, sha256 FROM files"
+            )
+        }
+
+    def update(self, files: Iterable[ParsedFile]) -> None:
+        now = time.time()
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO files (path, mtime_ns, size, sha256, recipes, imported_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(f.path, f.mtime_ns, f.size, f.sha256, len(f.recipes), now) for f in files]
+        )
+        self._connection.commit()
+
+    def remove(self, paths: Iterable[str]) -> None:
+        self._connection.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in paths])
+        self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+# --- Database writer --------------------------------------------------------------
+
+def _default_connection_factory() -> ContextManager[Any]:
+    from src.database.connection import pooled_connection
+    return pooled_connection()
+
+
+class RecipeWriter:
+    """
+    Writes imported recipes in one transaction per batch of files
+
+    Pizza styles and preferment methods given by name are resolved against
+    the database; styles defined in the files are inserted if missing.
+    """
+
+    def __init__(
+        self,
+        connection_factory: Callable[[], ContextManager[Any]] = _default_connection_factory,
+        placeholder: str = '%s',
+        chunk_size: int = 1000
+    ):
+        self._connection_factory = connection_factory
+        self._placeholder = placeholder
+        self._chunk_size = chunk_size
+
+    def _in_clause(self, count: int) -> str:
+        return ', '.join([self._placeholder] * count)
+
+    def write(self, files: Sequence[ParsedFile], removed_paths: Sequence[str] = ()) -> List[FileError]:
+        """
+        Upsert the recipes of the given files and delete those of removed files
+
+        Recipes are matched by (source_file, name): existing rows are updated
+        in place and keep their id (and with it their calculations); recipes
+        that are no longer in their file are deleted.
+
+        Returns:
+            Errors of files skipped because a style or preferment name is unknown
+        """
+        with self._connection_factory() as connection:
+            cursor = connection.cursor()
+            try:
+                if hasattr(connection, 'start_transaction'):
+                    connection.start_transaction()
+                else:
+                    cursor.execute("BEGIN")
+                try:
+                    styles = self._ensure_styles(cursor, [style for f in files for style in f.styles])
+                    cursor.execute("SELECT id, name FROM preferment_methods")
+                    methods = {name.casefold(): method_id for method_id, name in cursor.fetchall()}
+
+                    rows, errors, written = self._rows(files, styles, methods)
+                    existing = self._existing(cursor, [f.path for f in written])
+
+                    inserts: List[Tuple[Any, ...]] = []
+                    updates: List[Tuple[Any, ...]] = []
+                    for row in rows:
+                        recipe_id = existing.pop((row[-1], row[0].casefold()), None)
+                        if recipe_id is None:
+                            inserts.append(row)
+                        else:
+                            updates.append(row + (recipe_id,))
+                    # Übrig: Rezepte, die aus ihrer Datei entfernt wurden
+                    stale_ids = list(existing.values())
+
+                    for start in range(0, len(stale_ids), self._chunk_size):
+                        chunk = stale_ids[start:start + self._chunk_size]
+                        cursor.execute(f"DELETE FROM recipes WHERE id IN ({self._in_clause(len(chunk))})", chunk)
+                    for start in range(0, len(removed_paths), self._chunk_size):
+                        chunk = list(removed_paths[start:start + self._chunk_size])
+                        cursor.execute(
+                            f"DELETE FROM recipes WHERE source_file IN ({self._in_clause(len(chunk))})", chunk
+                        )
+                    update_sql = (f"UPDATE recipes SET "
+                                  f"{', '.join(f'{name} = {self._placeholder}' for name in RECIPE_COLUMNS)} "
+                                  f"WHERE id = {self._placeholder}")
+                    for start in range(0, len(updates), self._chunk_size):
+                        cursor.executemany(update_sql, updates[start:start + self._chunk_size])
+                    insert_sql = (f"INSERT INTO recipes ({', '.join(RECIPE_COLUMNS)}) "
+                                  f"VALUES ({self._in_clause(len(RECIPE_COLUMNS))})")
+                    for start in range(0, len(inserts), self._chunk_size):
+                        cursor.executemany(insert_sql, inserts[start:start + self._chunk_size])
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+            finally:
+                cursor.close()
+        return errors
+
+    def _existing(self, cursor: Any, paths: Sequence[str]) -> Dict[Tuple[str, str], int]:
+        """(source_file, casefolded name) -> id of the recipes imported from the given files"""
+        existing: Dict[Tuple[str, str], int] = {}
+        for start in range(0, len(paths), self._chunk_size):
+            chunk = list(paths[start:start + self._chunk_size])
+            cursor.execute(
+                f"SELECT id, source_file, name FROM recipes WHERE source_file IN ({self._in_clause(len(chunk))})",
+                chunk
+            )
+            for recipe_id, source_file, name in cursor.fetchall():
+                existing[(source_file, name.casefold())] = recipe_id
+        return existing
+
+    def _ensure_styles(self, cursor: Any, defined: Sequence[CompactPizzaStyle]) -> Dict[str, int]:
+        cursor.execute("SELECT id, name FROM pizza_styles")
+        styles = {name.casefold(): style_id for style_id, name in cursor.fetchall()}
+        new_styles = {}
+        for style in defined:
+            if style.name.casefold() not in styles:
+                new_styles.setdefault(style.name.casefold(), style)
+        if new_styles:
+            cursor.executemany(
+                f"INSERT INTO pizza_styles ({', '.join(STYLE_FIELDS)}) VALUES ({self._in_clause(len(STYLE_FIELDS))})",
+                [tuple(getattr(style, name) for name in STYLE_FIELDS) for style in new_styles.values()]
+            )
+            cursor.execute("SELECT id, name FROM pizza_styles")
+            styles = {name.casefold(): style_id for style_id, name in cursor.fetchall()}
+        return styles
+
+    @staticmethod
+    def _rows(
+        files: Sequence[ParsedFile],
+        styles: Dict[str, int],
+        methods: Dict[str, int]
+    ) -> Tuple[List[Tuple[Any, ...]], List[FileError], List[ParsedFile]]:
+        rows: List[Tuple[Any, ...]] = []
+        errors: List[FileError] = []
+        written: List[ParsedFile] = []
+        style_ids = set(styles.values())
+        method_ids = set(methods.values())
+        for parsed in files:
+            file_rows = []
+            file_errors = []
+            for position, item in enumerate(parsed.recipes):
+                recipe = item.recipe
+                style_id = styles.get(item.pizza_style.casefold()) if item.pizza_style else recipe.pizza_style_id
+                method_id = recipe.preferment_method_id
+                if item.preferment_method:
+                    method_id = methods.get(item.preferment_method.casefold())
+                    if method_id is None:
+                        file_errors.append(FileError(parsed.path, f"recipe {position + 1}: "
+                                           f"unknown preferment method {item.preferment_method!r}"))
+                elif method_id is not None and method_id not in method_ids:
+                    file_errors.append(FileError(parsed.path, f"recipe {position + 1}: "
+                                       f"unknown preferment method id {method_id}"))
+                if style_id not in style_ids:
+                    file_errors.append(FileError(parsed.path, f"recipe {position + 1}: "
+                                       f"unknown pizza style {item.pizza_style or style_id!r}"))
+                file_rows.append(tuple(
+                    style_id if name == 'pizza_style_id' else
+                    method_id if name == 'preferment_method_id' else
+                    getattr(recipe, name)
+                    for name in RECIPE_COLUMNS
+                ))
+            if file_errors:
+                errors.extend(file_errors)
+            else:
+                rows.extend(file_rows)
+                written.append(parsed)
+        return rows, errors, written
+
+
+# --- Import ------------------------------------------------------------------------
+
+def scan_directory(directory: str) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """Yield (absolute path, path relative to directory, stat) of all recipe files, recursively."""
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.lower().endswith(EXTENSIONS):
+                    yield entry.path, os.path.relpath(entry.path, directory), entry.stat()
+
+
+def _batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_recipes(
+    directory: str = RECIPES_DIR,
+    index: Optional[ImportIndex] = None,
+    writer: Optional[RecipeWriter] = None,
+    workers: Optional[int] = None,
+    batch_files: int = DEFAULT_BATCH_FILES,
+    executor: Optional[Executor] = None
+) -> ImportReport:
+    """
+    Import new and changed recipe files from a directory
+
+    Args:
+        directory: Recipe directory, default data/recipes
+        index: File index, default data/recipe_import_index.db
+        writer: Database writer, default through the connection pool
+        workers: Parser processes (default: CPU count); 0 parses in this process
+        batch_files: Files per parse window and transaction
+        executor: Existing executor to parse with instead of a new process pool
+
+    Returns:
+        ImportReport with counts and all error messages
+    """
+    own_index = index is None
+    index = index or ImportIndex()
+    writer = writer or RecipeWriter()
+    report = ImportReport()
+
+    own_executor = executor is None and workers != 0
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        known = index.entries()
+        seen = set()
+
+        def changed_files() -> Iterator[Tuple[str, str]]:
+            for path, relative_path, stat in scan_directory(directory):
+                report.scanned += 1
+                seen.add(relative_path)
+                entry = known.get(relative_path)
+                if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                    report.unchanged += 1
+                    continue
+                yield path, relative_path
+
+        for batch in _batches(changed_files(), batch_files):
+            if executor is None:
+                parsed_files = [parse_file(*args) for args in batch]
+            else:
+                parsed_files = list(executor.map(_parse_file_args, batch, chunksize=max(1, len(batch) // 32)))
+
+            to_write: List[ParsedFile] = []
+            touched: List[ParsedFile] = []
+            for parsed in parsed_files:
+                entry = known.get(parsed.path)
+                if parsed.errors:
+                    report.errors.extend(parsed.errors)
+                elif entry is not None and entry[2] == parsed.sha256:
+                    # Nur mtime geändert, Inhalt identisch
+                    report.unchanged += 1
+                    touched.append(parsed)
+                else:
+                    to_write.append(parsed)
+
+            # Bereichsprüfung für alle Rezepte des Batches auf einmal
+            recipes = [(parsed, number, item)
+                       for parsed in to_write for number, item in enumerate(parsed.recipes, 1)]
+            problems = validate_recipes([item.recipe for _, _, item in recipes])
+            invalid_paths = set()
+            for position, messages in sorted(problems.items()):
+                parsed, number, _ = recipes[position]
+                invalid_paths.add(parsed.path)
+                report.errors.extend(f"{parsed.path}: recipe {number}: {message}" for message in messages)
+            to_write = [parsed for parsed in to_write if parsed.path not in invalid_paths]
+
+            if to_write:
+                errors = writer.write(to_write)
+                report.errors.extend(str(error) for error in errors)
+                failed = {error.path for error in errors}
+                to_write = [parsed for parsed in to_write if parsed.path not in failed]
+                report.imported_files += len(to_write)
+                report.recipes += sum(len(parsed.recipes) for parsed in to_write)
+            index.update(to_write + touched)
+
+        removed = [path for path in known if path not in seen]
+        if removed:
+            writer.write([], removed)
+            index.remove(removed)
+            report.removed_files = len(removed)
+    finally:
+        if own_executor:
+            executor.shutdown()
+        if own_index:
+            index.close()
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import recipe files into the database")
+    parser.add_argument('directory', nargs='?', default=RECIPES_DIR)
+    parser.add_argument('--index', default=INDEX_PATH, help='SQLite file index')
+    parser.add_argument('--workers', type=int, default=None, help='parser processes (0 = no pool)')
+    parser.add_argument('--batch-files', type=int, default=DEFAULT_BATCH_FILES)
+    args = parser.parse_args(argv)
+
+    index = ImportIndex(args.index)
+    try:
+        report = import_recipes(args.directory, index, workers=args.workers, batch_files=args.batch_files)
+    finally:
+        index.close()
+
+    print(f"Scanned {report.scanned} files: {report.imported_files} imported ({report.recipes} recipes), "
+          f"{report.unchanged} unchanged, {report.removed_files} removed, {len(report.errors)} errors")
+    for error in report.errors:
+        print(f"  {error}")
+    return 1 if report.errors else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,202 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, TypeVar
+
+from src.models.widget import Widget
+from src.repositories.widget_repository import WidgetListener, WidgetRepository
+
+T = TypeVar('T')
+
+_DEFAULT = object()
+
+
+class RepositoryTimeoutError(TimeoutError):
+    """Ein Repository-Aufruf hat sein Zeitlimit überschritten"""
+
+
+class ThreadOffloader:
+    """
+    Führt blockierende Aufrufe (mysql.connector) in einem begrenzten Threadpool aus
+
+    Die Zahl der Threads entspricht standardmäßig DB_POOL_SIZE, damit kein
+    Thread auf eine freie Pool-Verbindung warten muss. Weitere Aufrufe warten
+    in der Queue des Executors; das Zeitlimit gilt ab dem Einreihen. Wird der
+    wartende Task abgebrochen oder läuft das Zeitlimit ab, bevor der Aufruf
+    gestartet ist, wird er nicht mehr ausgeführt. Ein bereits laufender
+    Aufruf läuft im Thread zu Ende, sein Ergebnis wird verworfen.
+
+    Der Threadpool entsteht beim ersten Aufruf und nach close() neu, sodass
+    ein Offloader mehrere Lifespan-Zyklen einer App überlebt.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: Optional[float] = 10.0):
+        if max_workers is None:
+            max_workers = int(os.getenv('DB_POOL_SIZE', 5))
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='repository')
+            return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, timeout: Any = _DEFAULT) -> T:
+        """
+        Ruft func(*args) im Threadpool auf und wartet asynchron auf das Ergebnis
+
+        Raises:
+            RepositoryTimeoutError: Wenn das Zeitlimit überschritten wird
+        """
+        if timeout is _DEFAULT:
+            timeout = self.timeout
+        future = asyncio.get_running_loop().run_in_executor(self._pool(), functools.partial(func, *args))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise RepositoryTimeoutError(f"{getattr(func, '__name__', 'call')} timed out after {timeout}s")
+
+    def close(self) -> None:
+        """Beendet den Threadpool; noch nicht gestartete Aufrufe werden verworfen"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncWidgetRepository:
+    """
+    Asynchrone Variante eines Widget-Repositorys
+
+    Bietet dieselben Methoden wie WidgetRepository als Coroutinen. Die
+    Aufrufe gehen an ein blockierendes Backend (z. B. MySQLWidgetRepository
+    oder CachedWidgetRepository) im ThreadOffloader, sodass gleichzeitige
+    Requests parallel auf die Datenbank warten statt die Event-Loop zu
+    blockieren.
+    """
+
+    def __init__(self, backend, offloader: Optional[ThreadOffloader] = None):
+        self.backend = backend
+        self._owns_offloader = offloader is None
+        self.offloader = offloader or ThreadOffloader()
+
+    async def get_by_id(self, widget_id: int) -> Optional[Widget]:
+        """Holt Widget anhand der ID"""
+        return await self.offloader.run(self.backend.get_by_id, widget_id)
+
+    async def get_by_key(self, widget_key: str) -> Optional[Widget]:
+        """Holt Widget anhand des eindeutigen Schlüssels"""
+        return await self.offloader.run(self.backend.get_by_key, widget_key)
+
+    async def get_active(self) -> List[Widget]:
+        """Holt alle aktiven Widgets"""
+        return await self.offloader.run(self.backend.get_active)
+
+    async def get_by_allowed_domain(self, domain: str) -> List[Widget]:
+        """Holt alle Widgets, deren Domain-Liste den Eintrag enthält"""
+        return await self.offloader.run(self.backend.get_by_allowed_domain, domain)
+
+    async def get_all(self) -> List[Widget]:
+        """Holt alle Widgets"""
+        return await self.offloader.run(self.backend.get_all)
+
+    async def save(self, widget: Widget) -> Widget:
+        """Speichert Widget"""
+        return await self.offloader.run(self.backend.save, widget)
+
+    async def delete(self, widget_id: int) -> bool:
+        """Löscht Widget anhand der ID"""
+        return await self.offloader.run(self.backend.delete, widget_id)
+
+    def add_listener(self, listener: WidgetListener) -> None:
+        """Registriert einen Listener beim Backend"""
+        self.backend.add_listener(listener)
+
+    def remove_listener(self, listener: WidgetListener) -> None:
+        """Entfernt einen Listener beim Backend"""
+        self.backend.remove_listener(listener)
+
+    def close(self) -> None:
+        """Beendet den eigenen Threadpool (ein übergebener bleibt bestehen)"""
+        if self._owns_offloader:
+            self.offloader.close()
+
+    async def __aenter__(self) -> 'AsyncWidgetRepository':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+class InMemoryAsyncWidgetRepository:
+    """
+    Asynchrones Fake-Repository für Tests
+
+    Arbeitet direkt auf einem WidgetRepository in der Event-Loop. Mit
+    latency lässt sich eine nicht blockierende Datenbank-Latenz simulieren.
+    """
+
+    def __init__(self, repository: Optional[WidgetRepository] = None, latency: float = 0.0):
+        self.repository = repository or WidgetRepository()
+        self.latency = latency
+
+    async def _io(self) -> None:
+        # Auch ohne Latenz einmal an die Event-Loop abgeben, wie ein echter Treiber
+        await asyncio.sleep(self.latency)
+
+    async def get_by_id(self, widget_id: int) -> Optional[Widget]:
+        """Holt Widget anhand der ID"""
+        await self._io()
+        return self.repository.get_by_id(widget_id)
+
+    async def get_by_key(self, widget_key: str) -> Optional[Widget]:
+        """Holt Widget anhand des eindeutigen Schlüssels"""
+        await self._io()
+        return self.repository.get_by_key(widget_key)
+
+    async def get_active(self) -> List[Widget]:
+        """Holt alle aktiven Widgets"""
+        await self._io()
+        return self.repository.get_active()
+
+    async def get_by_allowed_domain(self, domain: str) -> List[Widget]:
+        """Holt alle Widgets, deren Domain-Liste den Eintrag enthält"""
+        await self._io()
+        return self.repository.get_by_allowed_domain(domain)
+
+    async def get_all(self) -> List[Widget]:
+        """Holt alle Widgets"""
+        await self._io()
+        return self.repository.get_all()
+
+    async def save(self, widget: Widget) -> Widget:
+        """Speichert Widget"""
+        await self._io()
+        return self.repository.save(widget)
+
+    async def delete(self, widget_id: int) -> bool:
+        """Löscht Widget anhand der ID"""
+        await self._io()
+        return self.repository.delete(widget_id)
+
+    def add_listener(self, listener: WidgetListener) -> None:
+        """Registriert einen Listener"""
+        self.repository.add_listener(listener)
+
+    def remove_listener(self, listener: WidgetListener) -> None:
+        """Entfernt einen Listener"""
+        self.repository.remove_listener(listener)
+
+    def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> 'InMemoryAsyncWidgetRepository':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,153 @@
+import json
+from typing import Any, ContextManager, Callable, List, Optional, Sequence
+
+from src.database.connection import pooled_connection
+from src.models.widget import Widget
+from src.repositories.widget_repository import WidgetChangeNotifier
+
+# MySQL error "Duplicate entry ... for key ..."
+ER_DUP_ENTRY = 1062
+
+_COLUMNS = (
+    "id, widget_key, name, theme, config, allowed_domains, "
+    "created_at, updated_at, is_active"
+)
+
+
+def _load_json(value: Any) -> Any:
+    if value is None or isinstance(value, (dict, list)):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8')
+    return json.loads(value)
+
+
+def _row_to_widget(row: Sequence[Any]) -> Widget:
+    return Widget(
+        id=row[0],
+        key=row[1],
+        name=row[2],
+        theme=row[3],
+        config=_load_json(row[4]),
+        allowed_domains=_load_json(row[5]),
+        created_at=row[6],
+        updated_at=row[7],
+        is_active=bool(row[8])
+    )
+
+
+class MySQLWidgetRepository(WidgetChangeNotifier):
+    """
+    Widget-Repository auf der Tabelle embed_widgets
+
+    Verbindungen kommen aus dem Pool in src.database.connection. Für den
+    Einsatz im Request-Pfad mit CachedWidgetRepository kombinieren.
+    """
+
+    def __init__(self, connection_factory: Callable[[], ContextManager[Any]] = pooled_connection):
+        super().__init__()
+        self._connection_factory = connection_factory
+
+    def _fetch(self, where: str = "", params: Sequence[Any] = ()) -> List[Widget]:
+        with self._connection_factory() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(f"SELECT {_COLUMNS} FROM embed_widgets {where} ORDER BY id", tuple(params))
+                return [_row_to_widget(row) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+
+    def get_by_id(self, widget_id: int) -> Optional[Widget]:
+        """Holt Widget anhand der ID"""
+        widgets = self._fetch("WHERE id = %s", (widget_id,))
+        return widgets[0] if widgets else None
+
+    def get_by_key(self, widget_key: str) -> Optional[Widget]:
+        """Holt Widget anhand des eindeutigen Schlüssels"""
+        widgets = self._fetch("WHERE widget_key = %s", (widget_key,))
+        return widgets[0] if widgets else None
+
+    def get_active(self) -> List[Widget]:
+        """Holt alle aktiven Widgets"""
+        return self._fetch("WHERE is_active = TRUE")
+
+    def get_by_allowed_domain(self, domain: str) -> List[Widget]:
+        """Holt alle Widgets, deren Domain-Liste den Eintrag enthält (nutzt den Multi-Valued-Index)"""
+        return self._fetch("WHERE %s MEMBER OF (allowed_domains)", (domain.lower(),))
+
+    def get_all(self) -> List[Widget]:
+        """Holt alle Widgets"""
+        return self._fetch()
+
+    def save(self, widget: Widget) -> Widget:
+        """Speichert Widget (Insert oder Update)"""
+        domains = [domain.lower() for domain in widget.allowed_domains] if widget.allowed_domains is not None else None
+        values = (
+            widget.key,
+            widget.name,
+            widget.theme,
+            json.dumps(widget.config) if widget.config is not None else None,
+            json.dumps(domains) if domains is not None else None,
+            widget.is_active
+        )
+
+        with self._connection_factory() as connection:
+            cursor = connection.cursor()
+            try:
+                if widget.id is None:
+                    self._insert(cursor, widget, "", values)
+                    widget.id = cursor.lastrowid
+                else:
+                    # Kein Upsert: embed_widgets hat zwei eindeutige Schlüssel (id, widget_key),
+                    # ON DUPLICATE KEY UPDATE träfe bei fremdem Schlüssel die andere Zeile
+                    self._execute(
+                        cursor, widget,
+                        "UPDATE embed_widgets SET widget_key = %s, name = %s, theme = %s, config = %s, "
+                        "allowed_domains = %s, is_active = %s WHERE id = %s",
+                        values + (widget.id,)
+                    )
+                    if cursor.rowcount == 0:
+                        # Keine Zeile geändert: ID unbekannt oder Werte unverändert
+                        cursor.execute("SELECT 1 FROM embed_widgets WHERE id = %s", (widget.id,))
+                        if cursor.fetchone() is None:
+                            self._insert(cursor, widget, "id, ", (widget.id,) + values)
+            finally:
+                cursor.close()
+        self._notify(widget)
+        return widget
+
+    def _insert(self, cursor: Any, widget: Widget, id_column: str, params: Sequence[Any]) -> None:
+        placeholders = ', '.join(['%s'] * len(params))
+        self._execute(
+            cursor, widget,
+            f"INSERT INTO embed_widgets ({id_column}widget_key, name, theme, config, allowed_domains, is_active) "
+            f"VALUES ({placeholders})",
+            params
+        )
+
+    @staticmethod
+    def _execute(cursor: Any, widget: Widget, sql: str, params: Sequence[Any]) -> None:
+        """Führt sql aus; ein doppelter Schlüssel wird wie in WidgetRepository zum ValueError"""
+        try:
+            cursor.execute(sql, tuple(params))
+        except Exception as e:
+            if getattr(e, 'errno', None) == ER_DUP_ENTRY:
+                raise ValueError(f"Widget key already exists: {widget.key}") from e
+            raise
+
+    def delete(self, widget_id: int) -> bool:
+        """Löscht Widget anhand der ID"""
+        widget = self.get_by_id(widget_id)
+        if widget is None:
+            return False
+
+        with self._connection_factory() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("DELETE FROM embed_widgets WHERE id = %s", (widget_id,))
+                deleted = cursor.rowcount > 0
+            finally:
+                cursor.close()
+        if deleted:
+            self._notify(widget)
+        return deleted
@@ -0,0 +1,70 @@
+from decimal import Decimal
+from typing import Any, Callable, ContextManager, Dict, Hashable, List, Sequence
+
+from src.database.connection import pooled_connection
+from src.database.seeds import PREFERMENT_METHODS
+
+_COLUMNS = (
+    "id, name, description, flour_ratio, water_ratio, yeast_ratio, "
+    "fermentation_time, temperature"
+)
+
+
+def _row_to_dict(row: Sequence[Any]) -> Dict[str, Any]:
+    """Zeile im Format der API (Verhältnisse als float wie in den Seeds)"""
+    item = dict(zip(("id", "name", "description", "flour_ratio", "water_ratio",
+                     "yeast_ratio", "fermentation_time", "temperature"), row))
+    for field in ("flour_ratio", "water_ratio", "yeast_ratio"):
+        if isinstance(item[field], Decimal):
+            item[field] = float(item[field])
+    return item
+
+
+class StaticPrefermentMethodRepository:
+    """Vorteig-Methoden aus einer festen Liste (Standard: Seed-Daten)"""
+
+    def __init__(self, methods: List[Dict[str, Any]] = PREFERMENT_METHODS):
+        self._methods = methods
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        """Holt alle Vorteig-Methoden"""
+        return [dict(method) for method in self._methods]
+
+    def fingerprint(self) -> Hashable:
+        """Ändert sich nur, wenn die Liste ersetzt wird"""
+        return id(self._methods)
+
+
+class MySQLPrefermentMethodRepository:
+    """
+    Vorteig-Methoden aus der Tabelle preferment_methods
+
+    fingerprint() ist eine einzelne Aggregat-Abfrage, mit der Aufrufer
+    günstig prüfen können, ob sich die Tabelle seit dem letzten Laden
+    geändert hat.
+    """
+
+    def __init__(self, connection_factory: Callable[[], ContextManager[Any]] = pooled_connection):
+        self._connection_factory = connection_factory
+
+    def _query(self, sql: str) -> List[Sequence[Any]]:
+        with self._connection_factory() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        """Holt alle Vorteig-Methoden"""
+        return [_row_to_dict(row) for row in self._query(
+            f"SELECT {_COLUMNS} FROM preferment_methods ORDER BY id"
+        )]
+
+    def fingerprint(self) -> Hashable:
+        """Anzahl, ID-Summe und letzte Änderung der Tabelle"""
+        rows = self._query(
+            "SELECT COUNT(*), COALESCE(SUM(id), 0), MAX(updated_at) FROM preferment_methods"
+        )
+        return tuple(rows[0]) if rows else None
@@ -1,39 +1,243 @@
-from typing import Optional, List
+import threading
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from src.cache import LRUCache
 from src.models.widget import Widget
 
 
-class WidgetRepository:
+class _IndexEntry(NamedTuple):
+    """Werte, unter denen ein Widget zuletzt indiziert wurde"""
+    key: str
+    is_active: bool
+    domains: Tuple[str, ...]
+
+
+class _Snapshot(NamedTuple):
+    """Unveränderlicher Stand aller Widgets samt Sekundärindizes"""
+    by_id: Dict[int, Widget]
+    by_key: Dict[str, Widget]
+    active_ids: FrozenSet[int]
+    by_domain: Dict[str, Tuple[int, ...]]
+    indexed: Dict[int, _IndexEntry]
+
+
+_EMPTY = _Snapshot({}, {}, frozenset(), {}, {})
+
+
+def _normalize_domains(widget: Widget) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(domain.lower() for domain in widget.allowed_domains or ()))
+
+
+WidgetListener = Callable[[Widget], None]
+
+
+class WidgetChangeNotifier:
+    """Benachrichtigt registrierte Listener nach jedem save() und delete()"""
+
     def __init__(self):
-        # In-memory storage for now, would be replaced with actual database
-        self._widgets = {}
-        self._widgets_by_key = {}
-    
+        self._listeners: List[WidgetListener] = []
+
+    def add_listener(self, listener: WidgetListener) -> None:
+        """Registriert einen Listener, der das geänderte bzw. gelöschte Widget erhält"""
+        self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener: WidgetListener) -> None:
+        """Entfernt einen registrierten Listener"""
+        self._listeners = [l for l in self._listeners if l != listener]
+
+    def _notify(self, widget: Widget) -> None:
+        for listener in self._listeners:
+            listener(widget)
+
+
+class WidgetRepository(WidgetChangeNotifier):
+    """
+    In-Memory-Repository für Widgets
+
+    Lesezugriffe arbeiten ohne Sperre auf einem unveränderlichen Snapshot.
+    Schreibzugriffe bauen unter einer Sperre einen neuen Snapshot und tauschen
+    ihn atomar aus (Copy-on-Write), da Widgets selten geändert, aber bei jedem
+    Embed-Request gelesen werden.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._snapshot = _EMPTY
+        self._write_lock = threading.Lock()
+        # IDs werden nie wiederverwendet, auch nicht nach dem Löschen
+        self._next_id = 1
+
     def get_by_id(self, widget_id: int) -> Optional[Widget]:
         """Holt Widget anhand der ID"""
-        return self._widgets.get(widget_id)
-    
+        return self._snapshot.by_id.get(widget_id)
+
     def get_by_key(self, widget_key: str) -> Optional[Widget]:
         """Holt Widget anhand des eindeutigen Schlüssels"""
-        return self._widgets_by_key.get(widget_key)
-    
+        return self._snapshot.by_key.get(widget_key)
+
+    def get_active(self) -> List[Widget]:
+        """Holt alle aktiven Widgets"""
+        snapshot = self._snapshot
+        return [widget for widget_id, widget in snapshot.by_id.items() if widget_id in snapshot.active_ids]
+
+    def get_by_allowed_domain(self, domain: str) -> List[Widget]:
+        """Holt alle Widgets, deren Domain-Liste den Eintrag enthält (z. B. '*.example.com')"""
+        snapshot = self._snapshot
+        return [snapshot.by_id[widget_id] for widget_id in snapshot.by_domain.get(domain.lower(), ())]
+
     def save(self, widget: Widget) -> Widget:
         """Speichert Widget"""
-        if widget.id is None:
-            widget.id = len(self._widgets) + 1
-        
-        self._widgets[widget.id] = widget
-        self._widgets_by_key[widget.key] = widget
+        with self._write_lock:
+            snapshot = self._snapshot
+
+            existing = snapshot.by_key.get(widget.key)
+            if existing is not None and existing.id != widget.id:
+                raise ValueError(f"Widget key already exists: {widget.key}")
+
+            if widget.id is None:
+                widget.id = self._next_id
+            self._next_id = max(self._next_id, widget.id + 1)
+
+            by_id = dict(snapshot.by_id)
+            by_key = dict(snapshot.by_key)
+            by_domain = dict(snapshot.by_domain)
+            indexed = dict(snapshot.indexed)
+            active_ids = snapshot.active_ids
+
+            previous = indexed.get(widget.id)
+            if previous is not None:
+                del by_key[previous.key]
+                active_ids = active_ids - {widget.id}
+                for domain in previous.domains:
+                    by_domain[domain] = tuple(i for i in by_domain[domain] if i != widget.id)
+                    if not by_domain[domain]:
+                        del by_domain[domain]
+
+            entry = _IndexEntry(widget.key, widget.is_active, _normalize_domains(widget))
+            by_id[widget.id] = widget
+            by_key[entry.key] = widget
+            if entry.is_active:
+                active_ids = active_ids | {widget.id}
+            for domain in entry.domains:
+                by_domain[domain] = by_domain.get(domain, ()) + (widget.id,)
+            indexed[widget.id] = entry
+
+            self._snapshot = _Snapshot(by_id, by_key, active_ids, by_domain, indexed)
+        self._notify(widget)
         return widget
-    
+
     def get_all(self) -> List[Widget]:
         """Holt alle Widgets"""
-        return list(self._widgets.values())
-    
+        return list(self._snapshot.by_id.values())
+
     def delete(self, widget_id: int) -> bool:
         """Löscht Widget anhand der ID"""
-        widget = self._widgets.get(widget_id)
-        if widget:
-            del self._widgets[widget_id]
-            del self._widgets_by_key[widget.key]
-            return True
-        return False
\ No newline at end of file
+        with self._write_lock:
+            snapshot = self._snapshot
+            previous = snapshot.indexed.get(widget_id)
+            if previous is None:
+                return False
+
+            by_id = dict(snapshot.by_id)
+            by_key = dict(snapshot.by_key)
+            by_domain = dict(snapshot.by_domain)
+            indexed = dict(snapshot.indexed)
+
+            widget = by_id.pop(widget_id)
+            del by_key[previous.key]
+            del indexed[widget_id]
+            for domain in previous.domains:
+                by_domain[domain] = tuple(i for i in by_domain[domain] if i != widget_id)
+                if not by_domain[domain]:
+                    del by_domain[domain]
+
+            self._snapshot = _Snapshot(by_id, by_key, snapshot.active_ids - {widget_id}, by_domain, indexed)
+        self._notify(widget)
+        return True
+
+
+class CachedWidgetRepository:
+    """
+    LRU-Read-Through-Cache vor einem Widget-Repository (z. B. MySQLWidgetRepository)
+
+    Einzelabfragen per ID und Schlüssel werden gecacht; save() und delete()
+    invalidieren die betroffenen Einträge. Listenabfragen gehen direkt an das
+    Backend.
+    """
+
+    def __init__(self, backend, maxsize: int = 1024):
+        self.backend = backend
+        self._by_id: LRUCache[Widget] = LRUCache(maxsize)
+        self._by_key: LRUCache[Widget] = LRUCache(maxsize, on_evict=self._key_evicted)
+        # ID -> Schlüssel, unter dem das Widget gecacht wurde (für Schlüsseländerungen);
+        # Einträge fallen mit ihrem Eintrag in _by_key weg, höchstens maxsize
+        self._cached_keys: Dict[int, str] = {}
+
+    def get_by_id(self, widget_id: int) -> Optional[Widget]:
+        """Holt Widget anhand der ID"""
+        return self._by_id.get_or_load(widget_id, lambda: self.backend.get_by_id(widget_id))
+
+    def get_by_key(self, widget_key: str) -> Optional[Widget]:
+        """Holt Widget anhand des eindeutigen Schlüssels"""
+        def load() -> Optional[Widget]:
+            widget = self.backend.get_by_key(widget_key)
+            if widget is not None:
+                self._cached_keys[widget.id] = widget_key
+            return widget
+
+        return self._by_key.get_or_load(widget_key, load)
+
+    def get_active(self) -> List[Widget]:
+        """Holt alle aktiven Widgets"""
+        return self.backend.get_active()
+
+    def get_by_allowed_domain(self, domain: str) -> List[Widget]:
+        """Holt alle Widgets, deren Domain-Liste den Eintrag enthält"""
+        return self.backend.get_by_allowed_domain(domain)
+
+    def get_all(self) -> List[Widget]:
+        """Holt alle Widgets"""
+        return self.backend.get_all()
+
+    def save(self, widget: Widget) -> Widget:
+        """Speichert Widget und invalidiert den Cache"""
+        self._invalidate(widget.id, widget.key)
+        saved = self.backend.save(widget)
+        self._invalidate(saved.id, saved.key)
+        return saved
+
+    def delete(self, widget_id: int) -> bool:
+        """Löscht Widget und invalidiert den Cache"""
+        self._invalidate(widget_id, None)
+        deleted = self.backend.delete(widget_id)
+        # Erneut, falls zwischenzeitlich ein Lesezugriff den alten Stand geladen hat
+        self._invalidate(widget_id, None)
+        return deleted
+
+    def add_listener(self, listener: WidgetListener) -> None:
+        """Registriert einen Listener beim Backend"""
+        self.backend.add_listener(listener)
+
+    def remove_listener(self, listener: WidgetListener) -> None:
+        """Entfernt einen Listener beim Backend"""
+        self.backend.remove_listener(listener)
+
+    def invalidate_all(self) -> None:
+        """Leert den Cache, z. B. nach Änderungen durch andere Prozesse"""
+        self._by_id.clear()
+        self._by_key.clear()
+        self._cached_keys.clear()
+
+    def _key_evicted(self, widget_key: str, widget: Widget) -> None:
+        if self._cached_keys.get(widget.id) == widget_key:
+            self._cached_keys.pop(widget.id, None)
+
+    def _invalidate(self, widget_id: Optional[int], widget_key: Optional[str]) -> None:
+        if widget_id is not None:
+            self._by_id.pop(widget_id)
+            # Auch den alten Schlüssel entfernen, falls er sich geändert hat
+            cached_key = self._cached_keys.pop(widget_id, None)
+            if cached_key is not None:
+                self._by_key.pop(cached_key)
+        if widget_key is not None:
+            self._by_key.pop(widget_key)
@@ -0,0 +1,266 @@
+"""
+Widget store shared by all workers of a multi-process deployment.
+
+With ``uvicorn --workers N`` every worker used to hold its own WidgetStore,
+and an update reached only the worker that handled it. SharedWidgetStore
+keeps the encoded widget set in memory-mapped files instead:
+
+    <directory>/version         8-byte version counter (mapped by every worker)
+    <directory>/widgets.<n>.bin snapshot n: index + UTF-8 and gzip bodies
+
+A write builds the next snapshot file next to the current one, renames it
+into place and then bumps the counter, all under an exclusive file lock.
+Readers compare the counter on every access and map the new snapshot when
+it changed, so all workers serve the same version without a restart. The
+snapshot pages live once in the OS page cache however many workers map
+them; a request only copies the body it sends.
+
+Enable it with ``WIDGET_STORE_PATH=data/widgets`` (see src/main.py).
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from src.widget_store import EncodedWidget, encode_widget
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: nur ein Prozess pro Verzeichnis
+    fcntl = None
+
+MAGIC = b'PZWS'
+FORMAT_VERSION = 1
+# magic, format version, length of the JSON index
+_HEADER = struct.Struct('<4sII')
+_COUNTER = struct.Struct('<Q')
+
+# Vorherige Snapshots bleiben liegen, bis Leser sie sicher geöffnet haben
+KEEP_SNAPSHOTS = 2
+
+
+class _Snapshot(NamedTuple):
+    version: int
+    buffer: Any  # mmap, or b'' for the empty version 0
+    index: Dict[str, Dict[str, Any]]
+    data_offset: int
+
+    def slice(self, span: Optional[list]) -> Optional[bytes]:
+        if span is None:
+            return None
+        start = self.data_offset + span[0]
+        return self.buffer[start:start + span[1]]
+
+    def encoded(self, entry: Dict[str, Any]) -> EncodedWidget:
+        body = self.slice(entry['body'])
+        return EncodedWidget(
+            body.decode('utf-8'), body, entry['etag'], self.slice(entry['gzip']), entry['gzip_etag']
+        )
+
+
+_EMPTY = _Snapshot(0, b'', {}, 0)
+
+
+class SharedWidgetStore(MutableMapping):
+    """
+    Widget records (dicts with "html" and "status") in memory-mapped snapshots
+
+    Behaves like WidgetStore, with one difference: records are read from
+    the snapshot, so changing a returned dict in place has no effect; store
+    it again to publish the change.
+
+    Args:
+        directory: Directory of the control and snapshot files, shared by all workers
+        widgets: Initial widgets, published only if the directory has no snapshot yet
+    """
+
+    def __init__(self, directory: str, widgets: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock_path = os.path.join(directory, 'lock')
+        self._thread_lock = threading.Lock()
+        self._snapshot = _EMPTY
+
+        counter_path = os.path.join(directory, 'version')
+        with self._write_lock():
+            if not os.path.exists(counter_path) or os.path.getsize(counter_path) < _COUNTER.size:
+                with open(counter_path, 'wb') as f:
+                    f.write(_COUNTER.pack(0))
+            with open(counter_path, 'r+b') as f:
+                self._counter = mmap.mmap(f.fileno(), _COUNTER.size)
+            if widgets and self._read_counter() == 0:
+                self._publish(dict(widgets), set())
+
+    # --- Reading ------------------------------------------------------------------
+
+    def _read_counter(self) -> int:
+        return _COUNTER.unpack_from(self._counter)[0]
+
+    def _path(self, version: int) -> str:
+        return os.path.join(self.directory, f'widgets.{version}.bin')
+
+    def _current(self) -> _Snapshot:
+        """Snapshot of the published version; maps a new one when the counter moved."""
+        snapshot = self._snapshot
+        version = self._read_counter()
+        if version == snapshot.version:
+            return snapshot
+        while version != 0:
+            try:
+                snapshot = self._map(version)
+                break
+            except FileNotFoundError:
+                # Inzwischen ersetzt: neuen Zählerstand lesen
+                version = self._read_counter()
+        else:
+            snapshot = _EMPTY
+        # Alte Maps werden vom GC geschlossen, sobald kein Request sie mehr nutzt
+        self._snapshot = snapshot
+        return snapshot
+
+    def _map(self, version: int) -> _Snapshot:
+        with open(self._path(version), 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, format_version, index_length = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"{self._path(version)} is not a widget snapshot of format {FORMAT_VERSION}")
+        start = _HEADER.size
+        index = json.loads(buffer[start:start + index_length])
+        return _Snapshot(version, buffer, index, start + index_length)
+
+    @property
+    def version(self) -> int:
+        """Published version this worker currently serves"""
+        return self._current().version
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        snapshot = self._current()
+        entry = snapshot.index[key]
+        return {**entry['record'], 'html': snapshot.slice(entry['body']).decode('utf-8')}
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._current().index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._current().index))
+
+    def __len__(self) -> int:
+        return len(self._current().index)
+
+    def encoded(self, key: str) -> EncodedWidget:
+        """Pre-encoded representations of a stored widget (KeyError if unknown)"""
+        snapshot = self._current()
+        return snapshot.encoded(snapshot.index[key])
+
+    def lookup(self, key: str) -> Optional[Tuple[Dict[str, Any], EncodedWidget]]:
+        """
+        Record (without "html") and encodings of a widget, or None if unknown
+
+        Both come from the same snapshot, so a concurrent publish cannot mix
+        versions or remove the widget between the two reads.
+        """
+        snapshot = self._current()
+        entry = snapshot.index.get(key)
+        if entry is None:
+            return None
+        return entry['record'], snapshot.encoded(entry)
+
+    # --- Writing ------------------------------------------------------------------
+
+    def __setitem__(self, key: str, widget: Dict[str, Any]) -> None:
+        with self._write_lock():
+            self._publish({key: widget}, set())
+
+    def __delitem__(self, key: str) -> None:
+        with self._write_lock():
+            if key not in self._current().index:
+                raise KeyError(key)
+            self._publish({}, {key})
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        """Publish several widgets as one new version."""
+        with self._write_lock():
+            self._publish(dict(*args, **kwargs), set())
+
+    def _write_lock(self) -> '_WriteLock':
+        return _WriteLock(self._lock_path, self._thread_lock)
+
+    def _publish(self, changed: Dict[str, Dict[str, Any]], removed: set) -> None:
+        """Write the next snapshot and bump the counter (write lock held)."""
+        current = self._current()
+        index: Dict[str, Dict[str, Any]] = {}
+        chunks = []
+        offset = 0
+
+        def add(data: Optional[bytes]) -> Optional[list]:
+            nonlocal offset
+            if data is None:
+                return None
+            chunks.append(data)
+            offset += len(data)
+            return [offset - len(data), len(data)]
+
+        for key, entry in current.index.items():
+            if key in changed or key in removed:
+                continue
+            # Unveränderte Widgets werden nicht neu kodiert, nur kopiert
+            index[key] = {**entry, 'body': add(current.slice(entry['body'])),
+                          'gzip': add(current.slice(entry['gzip']))}
+        for key, widget in changed.items():
+            encoded = encode_widget(widget['html'])
+            index[key] = {
+                'record': {name: value for name, value in widget.items() if name != 'html'},
+                'body': add(encoded.body),
+                'etag': encoded.etag,
+                'gzip': add(encoded.gzip_body),
+                'gzip_etag': encoded.gzip_etag
+            }
+
+        version = current.version + 1
+        index_bytes = json.dumps(index, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        path = self._path(version)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(index_bytes)))
+            f.write(index_bytes)
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _COUNTER.pack_into(self._counter, 0, version)
+        self._counter.flush()
+
+        stale = self._path(version - KEEP_SNAPSHOTS)
+        if version > KEEP_SNAPSHOTS and os.path.exists(stale):
+            os.remove(stale)
+
+    def close(self) -> None:
+        self._snapshot = _EMPTY
+        self._counter.close()
+
+
+class _WriteLock:
+    """Exclusive lock across threads (threading.Lock) and processes (flock on a lock file)"""
+
+    def __init__(self, path: str, thread_lock: threading.Lock):
+        self.path = path
+        self.thread_lock = thread_lock
+        self._file = None
+
+    def __enter__(self) -> None:
+        self.thread_lock.acquire()
+        if fcntl is not None:
+            self._file = open(self.path, 'a+b')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self.thread_lock.release()
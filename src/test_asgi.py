@@ -0,0 +1,180 @@
+import json
+import time
+import unittest
+
+from fastapi.testclient import TestClient
+
+from src import asgi
+from src.business_logic import fermentation
+from src.business_logic.sync_index import SyncIndex
+from src.business_logic.sync_jobs import SyncJobQueue, SyncJobStore
+from src.preferment_catalog import PrefermentCatalog
+from src.repositories.async_repository import ThreadOffloader
+from src.repositories.preferment_repository import StaticPrefermentMethodRepository
+
+
+class SlowPrefermentRepository(StaticPrefermentMethodRepository):
+    def fingerprint(self):
+        time.sleep(0.3)
+        return super().fingerprint()
+
+
+def ndjson(items):
+    return b''.join(json.dumps(item).encode() + b'\n' for item in items)
+
+
+class TestAsgiApp(unittest.TestCase):
+    def setUp(self):
+        self._catalog = asgi.preferment_catalog
+        asgi.preferment_catalog = PrefermentCatalog(StaticPrefermentMethodRepository())
+        self.client = TestClient(asgi.create_app(
+            sync_index=SyncIndex(':memory:'), sync_jobs=SyncJobQueue(workers=1, store=SyncJobStore(':memory:'))
+        ))
+
+    def tearDown(self):
+        asgi.preferment_catalog = self._catalog
+
+    def test_sync_json(self):
+        response = self.client.post('/api/sync', json={'data': [{'id': 1}, {'id': 2}]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'message': 'Data synchronized successfully', 'synced_count': 2,
+            'created': 2, 'updated': 0, 'unchanged': 0, 'status': 'success'
+        })
+        resent = self.client.post('/api/sync', json={'data': [{'id': 1}, {'id': 2, 'name': 'x'}]}).json()
+        self.assertEqual((resent['created'], resent['updated'], resent['unchanged']), (0, 1, 1))
+        self.assertEqual(self.client.post('/api/sync', json={'data': [{'x': 1}]}).json(),
+                         {'error': 'Data item at index 0 missing required field: id'})
+        self.assertEqual(self.client.post('/api/sync', content=b'{', headers={'Content-Type': 'application/json'}).json(),
+                         {'error': 'Invalid JSON format'})
+        self.assertEqual(self.client.post('/api/sync', content=b'x', headers={'Content-Type': 'text/plain'}).status_code, 400)
+
+    def test_sync_ndjson(self):
+        response = self.client.post(
+            '/api/sync?batch_size=2', content=ndjson([{'id': i} for i in range(5)]),
+            headers={'Content-Type': 'application/x-ndjson'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['synced_count'], 5)
+        self.assertEqual(len(response.json()['batches']), 3)
+
+        error = self.client.post(
+            '/api/sync?batch_size=2', content=ndjson([{'id': 1}, {'id': 2}, {'x': 3}]),
+            headers={'Content-Type': 'application/x-ndjson'}
+        )
+        self.assertEqual(error.status_code, 400)
+        self.assertEqual(error.json()['synced_count'], 2)
+
+        self.assertEqual(self.client.post(
+            '/api/sync?batch_size=0', content=b'', headers={'Content-Type': 'application/x-ndjson'}
+        ).status_code, 400)
+
+    def test_sync_async_job(self):
+        response = self.client.post(
+            '/api/sync?batch_size=2', content=ndjson([{'id': i} for i in range(5)]),
+            headers={'Content-Type': 'application/x-ndjson', 'Prefer': 'respond-async'}
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.headers['location'], response.json()['status_url'])
+
+        for _ in range(500):
+            status = self.client.get(response.json()['status_url']).json()
+            if status['status'] == 'succeeded':
+                break
+            time.sleep(0.01)
+        self.assertEqual(status['result']['synced_count'], 5)
+        self.assertEqual(status['batches'], 3)
+
+        accepted = self.client.post('/api/sync?mode=async', json={'data': [{'id': 1}]})
+        self.assertEqual(accepted.status_code, 202)
+        self.assertEqual(self.client.get('/api/sync/unknown').status_code, 404)
+
+    def test_sync_async_limits(self):
+        self.client.app.state.sync_job_max_body_bytes = 10
+        too_large = self.client.post(
+            '/api/sync', content=ndjson([{'id': i} for i in range(5)]),
+            headers={'Content-Type': 'application/x-ndjson', 'Prefer': 'respond-async'}
+        )
+        self.assertEqual(too_large.status_code, 413)
+        self.assertEqual(self.client.app.state.sync_jobs.pending, 0)
+
+        self.client.app.state.sync_jobs.max_pending = 0
+        full = self.client.post(
+            '/api/sync', content=b'{"id": 1}\n',
+            headers={'Content-Type': 'application/x-ndjson', 'Prefer': 'respond-async'}
+        )
+        self.assertEqual(full.status_code, 503)
+        self.assertEqual(full.headers['retry-after'], '1')
+
+    def test_repeated_lifespan(self):
+        asgi.preferment_catalog = PrefermentCatalog(StaticPrefermentMethodRepository(), ttl=0)
+        app = asgi.create_app(sync_index=SyncIndex(':memory:'),
+                              sync_jobs=SyncJobQueue(workers=1, store=SyncJobStore(':memory:')))
+        fermentation._table = None
+        for _ in range(2):
+            # Startup und Shutdown je Zyklus; Offloader und Job-Pool müssen danach weiterlaufen
+            with TestClient(app) as client:
+                self.assertIsNotNone(fermentation._table)
+                self.assertEqual(client.get('/api/preferment-methods').status_code, 200)
+                accepted = client.post('/api/sync?mode=async', json={'data': [{'id': 1}]})
+                self.assertEqual(accepted.status_code, 202)
+                for _ in range(500):
+                    if client.get(accepted.json()['status_url']).json()['status'] == 'succeeded':
+                        break
+                    time.sleep(0.01)
+                else:
+                    self.fail('sync job did not finish')
+
+    def test_preferment_methods(self):
+        response = self.client.get('/api/preferment-methods', headers={'Origin': 'https://partner.example'})
+        self.assertEqual(response.json()['count'], 4)
+        self.assertEqual(response.headers['access-control-allow-origin'], '*')
+        cached = self.client.get('/api/preferment-methods', headers={'If-None-Match': response.headers['etag']})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(self.client.get('/api/preferment-methods?name=Biga').json()['data']['id'], 2)
+
+    def test_slow_catalog_refresh_does_not_block(self):
+        asgi.preferment_catalog = PrefermentCatalog(SlowPrefermentRepository(), ttl=0)
+        client = TestClient(asgi.create_app(ThreadOffloader(max_workers=2, timeout=0.05), SyncIndex(':memory:')))
+        self.assertEqual(client.get('/api/preferment-methods').status_code, 503)
+
+        asgi.preferment_catalog.snapshot()
+        response = client.get('/api/preferment-methods?id=1')
+        # Refresh läuft in das Zeitlimit, ausgeliefert wird der letzte Stand
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['name'], 'Poolish')
+
+    def test_error_shapes_per_prefix(self):
+        self.assertEqual(self.client.get('/api/preferment-methods/unknown').json(), {
+            'success': False, 'error': 'Not found', 'message': 'The requested resource was not found'
+        })
+        self.assertEqual(self.client.post('/api/preferment-methods').json()['error'], 'Method not allowed')
+        self.assertEqual(self.client.get('/api/sync').status_code, 405)
+        self.assertIn('error', self.client.get('/api/sync').json())
+        self.assertIn('detail', self.client.get('/widget/missing-widget').json())
+        self.assertNotIn('access-control-allow-origin', self.client.post(
+            '/api/sync', json={'data': []}, headers={'Origin': 'https://partner.example'}
+        ).headers)
+
+    def test_recipe_sweep(self):
+        body = {'ranges': {'water_percentage': {'start': 60, 'stop': 70, 'step': 5}, 'pizza_weight': [250, 280]},
+                'filters': {'total_dough': {'max': 1000}}, 'limit': 2}
+        page = self.client.post('/api/recipe-sweep', json=body).json()
+        self.assertEqual(page['total_points'], 6)
+        self.assertEqual([row['water_percentage'] for row in page['rows']], [60, 65])
+        self.assertEqual(page['next_cursor'], 3)
+
+        stream = self.client.post('/api/recipe-sweep', json=body, headers={'Accept': 'application/x-ndjson'})
+        self.assertEqual([json.loads(line)['index'] for line in stream.text.splitlines()], [0, 2, 4])
+
+        error = self.client.post('/api/recipe-sweep', json={'ranges': {'flour': [1]}})
+        self.assertEqual(error.status_code, 400)
+        self.assertIn('flour', error.json()['error'])
+
+    def test_widget_routes_and_metrics(self):
+        self.assertEqual(self.client.get('/widget/sample-widget').status_code, 200)
+        self.assertIn('app="pizza"', self.client.get('/metrics').text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from src.models.widget import Widget
+from src.repositories.async_repository import (
+    AsyncWidgetRepository,
+    InMemoryAsyncWidgetRepository,
+    RepositoryTimeoutError,
+    ThreadOffloader,
+)
+from src.repositories.widget_repository import WidgetRepository
+
+
+class SlowRepository(WidgetRepository):
+    """Blockierendes Backend wie mysql.connector"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+
+    def get_by_key(self, widget_key):
+        self.calls += 1
+        time.sleep(self.delay)
+        return super().get_by_key(widget_key)
+
+
+class TestAsyncWidgetRepository(unittest.IsolatedAsyncioTestCase):
+    async def test_same_methods_as_sync_repository(self):
+        async with AsyncWidgetRepository(WidgetRepository()) as repository:
+            widget = await repository.save(Widget(id=None, key='a', name='A', allowed_domains=['x.org']))
+            self.assertIs(await repository.get_by_id(widget.id), widget)
+            self.assertIs(await repository.get_by_key('a'), widget)
+            self.assertEqual(await repository.get_active(), [widget])
+            self.assertEqual(await repository.get_by_allowed_domain('X.org'), [widget])
+            self.assertEqual(await repository.get_all(), [widget])
+            self.assertTrue(await repository.delete(widget.id))
+            self.assertIsNone(await repository.get_by_key('a'))
+
+    async def test_concurrent_calls_do_not_serialize(self):
+        backend = SlowRepository(0.1)
+        backend.save(Widget(id=None, key='a', name='A'))
+        async with AsyncWidgetRepository(backend, ThreadOffloader(max_workers=8)) as repository:
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticking = asyncio.create_task(ticker())
+            start = time.perf_counter()
+            results = await asyncio.gather(*(repository.get_by_key('a') for _ in range(8)))
+            elapsed = time.perf_counter() - start
+            ticking.cancel()
+
+        self.assertTrue(all(widget.key == 'a' for widget in results))
+        # Acht Aufrufe à 100 ms parallel, nicht 800 ms hintereinander
+        self.assertLess(elapsed, 0.5)
+        # Die Event-Loop lief währenddessen weiter
+        self.assertGreater(ticks, 3)
+
+    async def test_timeout(self):
+        offloader = ThreadOffloader(max_workers=1, timeout=0.05)
+        repository = AsyncWidgetRepository(SlowRepository(0.3), offloader)
+        with self.assertRaises(RepositoryTimeoutError):
+            await repository.get_by_key('a')
+        offloader.close()
+
+    async def test_cancelled_queued_call_never_runs(self):
+        backend = SlowRepository(0.2)
+        offloader = ThreadOffloader(max_workers=1)
+        repository = AsyncWidgetRepository(backend, offloader)
+        running = asyncio.create_task(repository.get_by_key('a'))
+        await asyncio.sleep(0.02)
+        queued = asyncio.create_task(repository.get_by_key('b'))
+        await asyncio.sleep(0.02)
+        queued.cancel()
+        await running
+        with self.assertRaises(asyncio.CancelledError):
+            await queued
+        await asyncio.sleep(0.05)
+        self.assertEqual(backend.calls, 1)
+        offloader.close()
+
+    async def test_in_memory_fake(self):
+        repository = InMemoryAsyncWidgetRepository(latency=0.001)
+        changed = []
+        repository.add_listener(changed.append)
+        widget = await repository.save(Widget(id=None, key='fake', name='Fake'))
+        self.assertEqual(await repository.get_by_key('fake'), widget)
+        self.assertEqual(changed, [widget])
+
+
+class TestThreadOffloader(unittest.IsolatedAsyncioTestCase):
+    async def test_runs_in_worker_thread(self):
+        offloader = ThreadOffloader(max_workers=2)
+        name = await offloader.run(lambda: threading.current_thread().name)
+        self.assertTrue(name.startswith('repository'))
+        self.assertEqual(await offloader.run(pow, 2, 10, timeout=None), 1024)
+        offloader.close()
+
+    async def test_usable_after_close(self):
+        offloader = ThreadOffloader(max_workers=1)
+        offloader.close()
+        self.assertEqual(await offloader.run(pow, 2, 3), 8)
+        offloader.close()
+        offloader.close()
+        self.assertEqual(await offloader.run(pow, 2, 4), 16)
+        offloader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import sys
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+
+from src.business_logic.dough_calculation import calculate_calculations, compute_dough_arrays, recipe_arrays
+from src.database.columnar import CalculationTable, RecipeTable
+from src.database.models import CompactRecipe, Recipe, convert_model
+
+
+def make_recipes():
+    return [
+        Recipe(id=1, name='Neapolitanisch', pizza_style_id=1, water_percentage=Decimal('62.50'),
+               salt_percentage=Decimal('2.80'), yeast_percentage=Decimal('0.10'),
+               created_at=datetime(2024, 1, 2, 3, 4, 5)),
+        Recipe(id=2, name='Römisch', pizza_style_id=2, preferment_method_id=1,
+               water_percentage=Decimal('70.00'), oil_percentage=Decimal('3.00'),
+               preferment_percentage=Decimal('20.00'), notes='Mit Poolish'),
+        Recipe(id=None, name='Entwurf', water_percentage=Decimal('65.004')),
+    ]
+
+
+class TestCompactModels(unittest.TestCase):
+    def test_no_instance_dict(self):
+        recipe = CompactRecipe(name='x')
+        self.assertFalse(hasattr(recipe, '__dict__'))
+        self.assertEqual(recipe.water_percentage, Decimal('65.00'))
+        self.assertLess(sys.getsizeof(recipe), sys.getsizeof(Recipe()) + sys.getsizeof(Recipe().__dict__))
+
+    def test_convert_roundtrip(self):
+        recipe = make_recipes()[1]
+        self.assertEqual(convert_model(convert_model(recipe, CompactRecipe), Recipe), recipe)
+
+
+class TestRecipeTable(unittest.TestCase):
+    def setUp(self):
+        self.recipes = make_recipes()
+        self.table = RecipeTable.from_records(self.recipes)
+
+    def test_roundtrip(self):
+        records = self.table.to_records()
+        self.assertEqual(records[:2], self.recipes[:2])
+        # Auf zwei Stellen gerundet wie die DECIMAL(5,2)-Spalte
+        self.assertEqual(records[2].water_percentage, Decimal('65.00'))
+        self.assertIsNone(records[2].id)
+        self.assertIsInstance(self.table.to_records(CompactRecipe)[0], CompactRecipe)
+
+    def test_scaled_integers_and_masks(self):
+        self.assertEqual(self.table.array('water_percentage').tolist(), [6250, 7000, 6500])
+        self.assertEqual(self.table.mask('preferment_method_id').tolist(), [False, True, False])
+
+    def test_row_views_are_zero_copy(self):
+        row = self.table[1]
+        self.assertEqual(row.name, 'Römisch')
+        self.assertEqual(row.oil_percentage, Decimal('3.00'))
+        self.assertEqual(row.preferment_method_id, 1)
+        self.assertIsNone(self.table[0].preferment_method_id)
+        self.assertEqual(self.table[0].created_at, datetime(2024, 1, 2, 3, 4, 5))
+        self.assertIsNone(self.table[-1].created_at)
+        self.assertEqual(row.to_record(), self.recipes[1])
+        with self.assertRaises(AttributeError):
+            row.unknown
+
+        part = self.table[1:]
+        self.assertEqual(len(part), 2)
+        self.assertTrue(np.shares_memory(part.array('salt_percentage'), self.table.array('salt_percentage')))
+
+    def test_percentages_match_recipe_arrays(self):
+        expected = recipe_arrays(self.table.to_records())
+        for name, values in self.table.percentage_arrays().items():
+            np.testing.assert_allclose(values, expected[name])
+
+
+class TestCalculationTable(unittest.TestCase):
+    def test_from_dough_arrays_matches_calculations(self):
+        recipes = make_recipes()[:2]
+        table = RecipeTable.from_records(recipes)
+        results = compute_dough_arrays(table.percentage_arrays(), 4, 250)
+        calculations = CalculationTable.from_dough_arrays([1, 2], 4, 250, results)
+        self.assertEqual(calculations.to_records(), calculate_calculations(recipes, 4, 250))
+        self.assertLess(calculations.nbytes, 2 * 20 * 8 + 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
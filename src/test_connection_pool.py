@@ -0,0 +1,158 @@
+import sqlite3
+import threading
+import unittest
+
+from mysql.connector import Error
+
+from src.database import connection as db_connection
+from src.database.pool import ConnectionPool, PoolClosedError, PoolTimeoutError
+
+
+def sqlite_connect():
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeConnection:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+    def test_connection_is_reused(self):
+        pool = ConnectionPool(sqlite_connect, size=2)
+        with pool.connection() as conn:
+            first = conn.raw_connection
+            conn.execute('SELECT 1')
+        with pool.connection() as conn:
+            self.assertIs(conn.raw_connection, first)
+
+        stats = pool.stats()
+        self.assertEqual(stats.created, 1)
+        self.assertEqual(stats.checkouts, 2)
+        self.assertEqual(stats.idle, 1)
+        self.assertEqual(stats.in_use, 0)
+
+    def test_close_returns_connection(self):
+        pool = ConnectionPool(sqlite_connect, size=1)
+        conn = pool.acquire()
+        conn.close()
+        conn.close()
+        self.assertEqual(pool.stats().idle, 1)
+        with self.assertRaises(PoolClosedError):
+            conn.cursor()
+
+    def test_timeout_when_exhausted(self):
+        pool = ConnectionPool(sqlite_connect, size=1, timeout=0.01)
+        held = pool.acquire()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+        held.close()
+
+        stats = pool.stats()
+        self.assertEqual(stats.waits, 1)
+        self.assertEqual(stats.timeouts, 1)
+
+    def test_waiter_gets_released_connection(self):
+        pool = ConnectionPool(sqlite_connect, size=1, timeout=5)
+        held = pool.acquire()
+        result = []
+
+        def worker():
+            with pool.connection() as conn:
+                result.append(conn.raw_connection)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        while pool.stats().waits == 0:
+            pass
+        raw = held.raw_connection
+        held.close()
+        thread.join()
+
+        self.assertEqual(result, [raw])
+        self.assertEqual(pool.stats().timeouts, 0)
+
+    def test_max_lifetime_recycles(self):
+        clock = FakeClock()
+        pool = ConnectionPool(FakeConnection, size=1, max_lifetime=60, clock=clock)
+        with pool.connection() as conn:
+            old = conn.raw_connection
+        clock.now = 61
+        with pool.connection() as conn:
+            self.assertIsNot(conn.raw_connection, old)
+        self.assertTrue(old.closed)
+        self.assertEqual(pool.stats().recycled, 1)
+
+    def test_pre_ping_replaces_dead_connection(self):
+        pool = ConnectionPool(FakeConnection, size=1)
+        with pool.connection() as conn:
+            dead = conn.raw_connection
+        dead.connected = False
+        with pool.connection() as conn:
+            self.assertIsNot(conn.raw_connection, dead)
+        self.assertEqual(pool.stats().invalidated, 1)
+        self.assertEqual(pool.stats().created, 2)
+
+    def test_failed_connect_frees_slot(self):
+        attempts = []
+
+        def flaky_connect():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("connection refused")
+            return FakeConnection()
+
+        pool = ConnectionPool(flaky_connect, size=1, timeout=0.01)
+        with self.assertRaises(OSError):
+            pool.acquire()
+        with pool.connection():
+            pass
+
+    def test_invalidate_discards(self):
+        pool = ConnectionPool(FakeConnection, size=1)
+        with pool.connection() as conn:
+            raw = conn.raw_connection
+            conn.invalidate()
+        self.assertTrue(raw.closed)
+        self.assertEqual(pool.stats().idle, 0)
+
+
+class TestProcessPool(unittest.TestCase):
+    def setUp(self):
+        self._previous = (db_connection._pool, db_connection._pool_pid)
+
+    def tearDown(self):
+        db_connection.get_pool().close()
+        db_connection._pool, db_connection._pool_pid = self._previous
+
+    def test_get_connection_uses_configured_pool(self):
+        db_connection.configure_pool(sqlite_connect, size=1)
+        with db_connection.pooled_connection() as conn:
+            self.assertEqual(conn.execute('SELECT 1').fetchone(), (1,))
+        self.assertEqual(db_connection.get_pool_stats().checkouts, 1)
+
+    def test_timeout_is_reported_as_database_error(self):
+        db_connection.configure_pool(sqlite_connect, size=1, timeout=0.01)
+        held = db_connection.get_connection()
+        with self.assertRaises(Error):
+            db_connection.get_connection()
+        held.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,9 @@
+import io
+import json
 import unittest
+
+import numpy as np
+
 from converter import UnitConverter
 
 
@@ -50,6 +55,54 @@ class TestUnitConverter(unittest.TestCase):
         self.assertIn('cm', units)
         self.assertIn('ft', units)
 
+    
+    def test_weight_many_matches_scalar(self):
+        values = [1, 2.5, 0, 16]
+        result = self.converter.convert_weight_many(values, 'lb', 'g')
+        self.assertIsInstance(result, np.ndarray)
+        for value, converted in zip(values, result):
+            self.assertAlmostEqual(converted, self.converter.convert_weight(value, 'lb', 'g'))
+    
+    def test_weight_many_with_unit_per_value(self):
+        result = self.converter.convert_weight_many(np.array([1, 1, 1]), ['lb', 'oz', 'kg'], 'g')
+        np.testing.assert_allclose(result, [453.592, 28.3495, 1000])
+    
+    def test_length_many(self):
+        result = self.converter.convert_length_many([1, 2], 'km', 'm')
+        np.testing.assert_allclose(result, [1000, 2000])
+    
+    def test_invalid_unit_many(self):
+        with self.assertRaises(ValueError):
+            self.converter.convert_weight_many([1, 2], ['kg', 'invalid'], 'g')
+        with self.assertRaises(ValueError):
+            self.converter.convert_length_many([1], 'm', 'invalid')
+    
+    def test_convert_csv(self):
+        infile = io.StringIO("name,value,unit\nMehl,2,LB\nSalz,1,oz\n")
+        outfile = io.StringIO()
+        count = self.converter.convert_csv(infile, outfile, 'weight', 'g', chunk_size=1)
+        self.assertEqual(count, 2)
+        lines = outfile.getvalue().splitlines()
+        self.assertEqual(lines[0], 'name,value,unit')
+        self.assertEqual(lines[1], 'Mehl,907.184,g')
+        self.assertEqual(lines[2], 'Salz,28.3495,g')
+    
+    def test_convert_ndjson(self):
+        infile = io.StringIO('{"id": 1, "value": 2, "unit": "kg"}\n\n{"id": 2, "value": 500, "unit": "g"}\n')
+        outfile = io.StringIO()
+        count = self.converter.convert_ndjson(infile, outfile, 'weight', 'kg')
+        self.assertEqual(count, 2)
+        records = [json.loads(line) for line in outfile.getvalue().splitlines()]
+        self.assertEqual(records, [
+            {"id": 1, "value": 2.0, "unit": "kg"},
+            {"id": 2, "value": 0.5, "unit": "kg"}
+        ])
+    
+    def test_convert_stream_reports_bad_record(self):
+        infile = io.StringIO('{"value": 1, "unit": "kg"}\n{"value": "x", "unit": "kg"}\n')
+        with self.assertRaisesRegex(ValueError, 'Datensatz 2'):
+            self.converter.convert_ndjson(infile, io.StringIO(), 'weight', 'g')
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,84 @@
+import random
+import unittest
+
+from src.business_logic.domain_matcher import DomainMatcher
+from src.business_logic.widget_embed import WidgetEmbedService
+from src.models.widget import Widget
+from src.repositories.widget_repository import WidgetRepository
+
+
+def linear_is_allowed(allowed_domains, domain):
+    """Bisherige Implementierung von _is_domain_allowed als Referenz"""
+    normalized_domain = domain.lower()
+    if '://' in normalized_domain:
+        normalized_domain = normalized_domain.split('://', 1)[1]
+    if ':' in normalized_domain:
+        normalized_domain = normalized_domain.split(':', 1)[0]
+    for allowed_domain in allowed_domains:
+        allowed_normalized = allowed_domain.lower()
+        if normalized_domain == allowed_normalized:
+            return True
+        if allowed_normalized.startswith('*.'):
+            wildcard_domain = allowed_normalized[2:]
+            if normalized_domain.endswith('.' + wildcard_domain) or normalized_domain == wildcard_domain:
+                return True
+    return False
+
+
+class TestDomainMatcher(unittest.TestCase):
+    def test_exact_and_wildcard(self):
+        matcher = DomainMatcher(['Example.com', '*.shop.example.org'])
+        self.assertTrue(matcher.matches('https://EXAMPLE.com:8443'))
+        self.assertFalse(matcher.matches('www.example.com'))
+        self.assertTrue(matcher.matches('shop.example.org'))
+        self.assertTrue(matcher.matches('eu.shop.example.org'))
+        self.assertFalse(matcher.matches('evilshop.example.org'))
+        self.assertFalse(matcher.matches('example.org'))
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(42)
+        labels = ['a', 'b', 'shop', 'example', 'com', 'org', 'de']
+        allowed = []
+        for _ in range(200):
+            domain = '.'.join(rng.choice(labels) for _ in range(rng.randint(1, 3)))
+            allowed.append(('*.' + domain) if rng.random() < 0.3 else domain.upper())
+        matcher = DomainMatcher(allowed)
+
+        for _ in range(2000):
+            domain = '.'.join(rng.choice(labels) for _ in range(rng.randint(1, 4)))
+            if rng.random() < 0.2:
+                domain = 'http://' + domain + ':80'
+            self.assertEqual(matcher.matches(domain), linear_is_allowed(allowed, domain), domain)
+
+
+class TestWidgetEmbedDomainCache(unittest.TestCase):
+    def setUp(self):
+        self.repository = WidgetRepository()
+        self.service = WidgetEmbedService(self.repository)
+        self.widget = self.repository.save(
+            Widget(id=None, key='shop', name='Shop', allowed_domains=['example.com'])
+        )
+
+    def test_matcher_is_reused(self):
+        self.assertTrue(self.service._is_domain_allowed(self.widget, 'example.com'))
+        matcher = self.service._get_domain_matcher(self.widget)
+        self.assertIs(self.service._get_domain_matcher(self.widget), matcher)
+
+    def test_save_rebuilds_matcher(self):
+        self.assertFalse(self.service._is_domain_allowed(self.widget, 'other.net'))
+        self.widget.allowed_domains.append('other.net')
+        self.repository.save(self.widget)
+        self.assertTrue(self.service._is_domain_allowed(self.widget, 'other.net'))
+
+    def test_replaced_list_rebuilds_matcher(self):
+        self.service._is_domain_allowed(self.widget, 'example.com')
+        self.widget.allowed_domains = ['other.net']
+        self.assertFalse(self.service._is_domain_allowed(self.widget, 'example.com'))
+
+    def test_no_restriction(self):
+        widget = Widget(id=None, key='open', name='Open')
+        self.assertTrue(self.service._is_domain_allowed(widget, 'anything.org'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from decimal import Decimal
+
+from src.business_logic.dough_calculation import (
+    calculate_calculations,
+    calculate_calculation_grid,
+)
+from src.database.models import Recipe
+
+
+class TestDoughCalculation(unittest.TestCase):
+    def setUp(self):
+        self.recipe = Recipe(
+            id=1,
+            water_percentage=Decimal('60.00'),
+            salt_percentage=Decimal('2.00'),
+            yeast_percentage=Decimal('1.00'),
+            oil_percentage=Decimal('3.00'),
+            sugar_percentage=Decimal('2.00')
+        )
+
+    def test_totals_add_up_to_dough_weight(self):
+        calculation = calculate_calculations([self.recipe], 4, 250)[0]
+        # 1000 g Teig / 168 % = 5.952... g pro Prozent
+        self.assertEqual(calculation.total_flour, Decimal('595.24'))
+        self.assertEqual(calculation.total_water, Decimal('357.14'))
+        self.assertEqual(calculation.total_salt, Decimal('11.90'))
+        self.assertEqual(calculation.total_oil, Decimal('17.86'))
+        self.assertEqual(calculation.number_of_pizzas, 4)
+        self.assertEqual(calculation.pizza_weight, Decimal('250.00'))
+        self.assertEqual(calculation.recipe_id, 1)
+
+    def test_without_preferment_main_dough_equals_totals(self):
+        calculation = calculate_calculations([self.recipe], 4, 250)[0]
+        self.assertEqual(calculation.preferment_flour, Decimal('0.00'))
+        self.assertEqual(calculation.main_dough_flour, calculation.total_flour)
+        self.assertEqual(calculation.main_dough_water, calculation.total_water)
+        self.assertEqual(calculation.main_dough_yeast, calculation.total_yeast)
+
+    def test_preferment_split(self):
+        self.recipe.preferment_percentage = Decimal('20.00')
+        calculation = calculate_calculations([self.recipe], 4, 250)[0]
+        self.assertEqual(calculation.preferment_flour, Decimal('119.05'))
+        self.assertEqual(calculation.preferment_water, Decimal('119.05'))
+        self.assertEqual(calculation.main_dough_flour, Decimal('476.19'))
+        self.assertEqual(calculation.main_dough_water, Decimal('238.10'))
+        self.assertEqual(calculation.main_dough_salt, calculation.total_salt)
+
+    def test_preferment_water_is_capped_at_total_water(self):
+        self.recipe.preferment_percentage = Decimal('100.00')
+        calculation = calculate_calculations([self.recipe], 4, 250)[0]
+        self.assertEqual(calculation.preferment_water, calculation.total_water)
+        self.assertEqual(calculation.main_dough_water, Decimal('0.00'))
+
+    def test_per_recipe_arrays(self):
+        other = Recipe(id=2)
+        calculations = calculate_calculations([self.recipe, other], [2, 6], [200, 280])
+        self.assertEqual([c.recipe_id for c in calculations], [1, 2])
+        self.assertEqual([c.number_of_pizzas for c in calculations], [2, 6])
+        self.assertEqual(calculations[1].pizza_weight, Decimal('280.00'))
+
+    def test_mismatched_lengths(self):
+        with self.assertRaises(ValueError):
+            calculate_calculations([self.recipe], [2, 3], 250)
+
+    def test_grid(self):
+        other = Recipe(id=2)
+        calculations = calculate_calculation_grid([self.recipe, other], [2, 4], [250, 300, 350])
+        self.assertEqual(len(calculations), 12)
+        first = calculations[0]
+        self.assertEqual((first.recipe_id, first.number_of_pizzas, first.pizza_weight),
+                         (1, 2, Decimal('250.00')))
+        last = calculations[-1]
+        self.assertEqual((last.recipe_id, last.number_of_pizzas, last.pizza_weight),
+                         (2, 4, Decimal('350.00')))
+        single = calculate_calculations([other], 4, 350)[0]
+        self.assertEqual(last, single)
+
+
+if __name__ == '__main__':
+    unittest.main()
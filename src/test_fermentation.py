@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+import numpy as np
+
+from src.business_logic.fermentation import YeastTable, model_yeast_percentage
+from src.database.models import Recipe
+
+
+class TestYeastTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.table = YeastTable.compute()
+
+    def test_calibration_and_trends(self):
+        self.assertAlmostEqual(self.table.yeast_percentage(24, 20), 0.25, places=4)
+        self.assertEqual(self.table.recipe_yeast_percentage(Recipe()), Decimal('0.25'))
+        # Länger oder wärmer: weniger Hefe
+        self.assertLess(self.table.yeast_percentage(48, 20), self.table.yeast_percentage(24, 20))
+        self.assertLess(self.table.yeast_percentage(24, 25), self.table.yeast_percentage(24, 20))
+
+    def test_interpolation_matches_model(self):
+        rng = np.random.default_rng(1)
+        hours = rng.uniform(1, 120, 5000)
+        temperatures = rng.uniform(3, 40, 5000)
+        batch = self.table.yeast_percentages(hours, temperatures)
+        exact = model_yeast_percentage(hours, temperatures)
+        np.testing.assert_allclose(batch, exact, rtol=5e-4)
+        for index in range(0, 5000, 500):
+            self.assertAlmostEqual(self.table.yeast_percentage(hours[index], temperatures[index]), batch[index])
+
+    def test_grid_corners_and_broadcasting(self):
+        self.assertAlmostEqual(self.table.yeast_percentage(120, 40), float(model_yeast_percentage(120, 40)))
+        self.assertAlmostEqual(self.table.yeast_percentage(1, 3), float(model_yeast_percentage(1, 3)))
+        self.assertEqual(self.table.yeast_percentages([12, 24, 48], 20).shape, (3,))
+
+    def test_out_of_range(self):
+        for hours, temperature in ((0.5, 20), (121, 20), (24, 2), (24, 41), (float('nan'), 20)):
+            with self.assertRaises(ValueError):
+                self.table.yeast_percentage(hours, temperature)
+        with self.assertRaises(ValueError):
+            self.table.yeast_percentages([24, 200], 20)
+        with self.assertRaises(ValueError):
+            YeastTable.compute(temperatures=(0, 30, 1))
+
+    def test_save_and_load_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'yeast.npy')
+            self.table.save(path)
+            loaded = YeastTable.load(path)
+            self.assertIsInstance(loaded.log_values, np.memmap)
+            self.assertFalse(loaded.log_values.flags.writeable)
+            self.assertEqual(loaded.yeast_percentage(13.3, 18.7), self.table.yeast_percentage(13.3, 18.7))
+
+            with open(path + '.json', 'w') as f:
+                f.write('{"version": 99}')
+            with self.assertRaises(ValueError):
+                YeastTable.load(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
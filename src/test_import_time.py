@@ -0,0 +1,32 @@
+import unittest
+
+from benchmarks.import_time import ENTRY_POINTS, best_profile, budget_ms, loaded_modules, parse_importtime
+
+HEAVY_MODULES = ['numpy', 'mysql.connector', 'pydantic', 'fastapi']
+
+
+class TestImportTime(unittest.TestCase):
+    def test_heavy_dependencies_load_lazily(self):
+        self.assertEqual(loaded_modules('app', HEAVY_MODULES), [])
+        self.assertEqual(loaded_modules('src.app', HEAVY_MODULES), [])
+        self.assertEqual(loaded_modules('src.converter', HEAVY_MODULES), [])
+        self.assertEqual(loaded_modules('src.database.models', HEAVY_MODULES), [])
+        self.assertEqual(loaded_modules('src.asgi', ['numpy', 'mysql.connector']), [])
+
+    def test_entry_points_within_budget(self):
+        for module in ENTRY_POINTS.values():
+            profile = best_profile(module, repeat=2)
+            self.assertLessEqual(profile.total_ms, budget_ms(module), f"{module} imports too slowly")
+
+    def test_parse_importtime(self):
+        modules = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   json.decoder\n"
+            "import time:       300 |        420 | json\n"
+        )
+        self.assertEqual([(m.name, m.depth) for m in modules], [('json.decoder', 1), ('json', 0)])
+        self.assertEqual(modules[1].cumulative_ms, 0.42)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import gc
+import threading
+import unittest
+
+from fastapi.testclient import TestClient
+
+from src import app as flask_app
+from src import main
+from src.metrics import MetricsRegistry
+
+
+class TestHistogram(unittest.TestCase):
+    def test_shards_are_merged(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency_seconds', 'Latency', ('route',), (0.1, 1.0))
+
+        def worker():
+            for _ in range(1000):
+                histogram.observe(0.05, '/a')
+                histogram.observe(0.5, '/a')
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        histogram.observe(5.0, '/b')
+
+        series = histogram.collect()[('/a',)]
+        self.assertEqual(series[:3], [4000, 4000, 0])
+        self.assertAlmostEqual(series[3], 2200.0)
+        text = registry.render()
+        self.assertIn('# TYPE latency_seconds histogram', text)
+        self.assertIn('latency_seconds_bucket{route="/a",le="0.1"} 4000', text)
+        self.assertIn('latency_seconds_bucket{route="/a",le="+Inf"} 8000', text)
+        self.assertIn('latency_seconds_count{route="/b"} 1', text)
+        self.assertIn('latency_seconds_sum{route="/b"} 5', text)
+
+    def test_finished_threads_are_folded(self):
+        histogram = MetricsRegistry().histogram('x', 'X', ('route',), (1.0,))
+
+        for _ in range(50):
+            thread = threading.Thread(target=histogram.observe, args=(0.5, '/a'))
+            thread.start()
+            thread.join()
+        gc.collect()
+
+        self.assertLessEqual(len(histogram._shards), 1)
+        self.assertEqual(histogram.collect()[('/a',)], [50, 0, 25.0])
+
+    def test_label_escaping(self):
+        registry = MetricsRegistry()
+        registry.histogram('x', 'X', ('route',)).observe(0.0, 'a"b\\c')
+        self.assertIn('route="a\\"b\\\\c"', registry.render())
+
+    def test_gauge_reads_callback(self):
+        registry = MetricsRegistry()
+        depth = [3]
+        registry.gauge('queue_depth', 'Depth', ('queue',)).set_function(lambda: depth[0], 'calc')
+        depth[0] = 7
+        text = registry.render()
+        self.assertIn('# TYPE queue_depth gauge', text)
+        self.assertIn('queue_depth{queue="calc"} 7', text)
+
+
+class TestFlaskInstrumentation(unittest.TestCase):
+    def test_metrics_endpoint(self):
+        client = flask_app.app.test_client()
+        client.get('/api/preferment-methods?id=abc')
+        client.get('/does-not-exist')
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        text = response.get_data(as_text=True)
+        self.assertIn('app="preferment",method="GET",route="/api/preferment-methods",status="400"', text)
+        self.assertIn('route="unmatched",status="404"', text)
+
+
+class TestAsgiMiddleware(unittest.TestCase):
+    def test_route_template_label(self):
+        client = TestClient(main.app)
+        client.get('/widget/sample-widget')
+        client.get('/widget/missing-widget')
+        text = client.get('/metrics').text
+        self.assertIn('app="widget",method="GET",route="/widget/{key}",status="200"', text)
+        self.assertIn('app="widget",method="GET",route="/widget/{key}",status="404"', text)
+        self.assertIn('http_response_size_bytes_bucket{app="widget"', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from src.database.migrate import (
+    MigrationError,
+    _applied_checksums,
+    apply_migrations,
+    load_steps,
+    split_sql_statements,
+)
+from src.database.seeds import PREFERMENT_METHODS, SeedData
+
+
+SCHEMA = """
+-- Test schema; with a comment
+CREATE TABLE IF NOT EXISTS methods (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(100) NOT NULL UNIQUE
+);
+"""
+
+SEEDS = (
+    SeedData(
+        table='methods',
+        sql='INSERT OR REPLACE INTO methods (id, name) VALUES (?, ?)',
+        rows=((1, 'Poolish'), (2, 'Biga'))
+    ),
+)
+
+
+class TestSplitSqlStatements(unittest.TestCase):
+    def test_semicolons_in_strings_and_comments(self):
+        sql = (
+            "INSERT INTO t VALUES ('a;b', \"c;d\"); -- trailing; comment\n"
+            "/* block; comment */ SELECT 'it''s; fine';\n"
+            "# hash; comment\n"
+            "SELECT 1"
+        )
+        self.assertEqual(split_sql_statements(sql), [
+            "INSERT INTO t VALUES ('a;b', \"c;d\")",
+            "SELECT 'it''s; fine'",
+            "SELECT 1"
+        ])
+
+    def test_project_schema(self):
+        steps = load_steps()
+        self.assertEqual(steps[0].name, 'schema.sql')
+        self.assertEqual(steps[-1].name, 'seeds')
+        statements = steps[0].statements
+        self.assertTrue(statements[0].startswith('CREATE DATABASE IF NOT EXISTS'))
+        self.assertTrue(all('CREATE TABLE IF NOT EXISTS' in s for s in statements[2:]))
+        seeded = {seed.table: len(seed.rows) for seed in steps[-1].seeds}
+        self.assertEqual(seeded['preferment_methods'], len(PREFERMENT_METHODS))
+
+
+class TestApplyMigrations(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.schema_path = os.path.join(self.directory.name, 'schema.sql')
+        self.migrations_dir = os.path.join(self.directory.name, 'migrations')
+        os.mkdir(self.migrations_dir)
+        with open(self.schema_path, 'w') as file:
+            file.write(SCHEMA)
+        self.write_migration('0001_description.sql', 'ALTER TABLE methods ADD COLUMN description TEXT;')
+        self.connection = sqlite3.connect(':memory:')
+
+    def tearDown(self):
+        self.connection.close()
+        self.directory.cleanup()
+
+    def write_migration(self, name, sql):
+        with open(os.path.join(self.migrations_dir, name), 'w') as file:
+            file.write(sql)
+
+    def steps(self):
+        load_steps.cache_clear()
+        return load_steps(self.schema_path, self.migrations_dir, SEEDS)
+
+    def test_cold_then_warm_start(self):
+        applied = apply_migrations(self.connection, self.steps(), placeholder='?')
+        self.assertEqual(applied, ['schema.sql', '0001_description.sql', 'seeds'])
+        rows = self.connection.execute('SELECT id, name, description FROM methods ORDER BY id').fetchall()
+        self.assertEqual(rows, [(1, 'Poolish', None), (2, 'Biga', None)])
+
+        self.assertEqual(apply_migrations(self.connection, self.steps(), placeholder='?'), [])
+
+    def test_only_new_migration_is_applied(self):
+        apply_migrations(self.connection, self.steps(), placeholder='?')
+        self.write_migration('0002_index.sql', 'CREATE INDEX idx_methods_name ON methods(name);')
+        applied = apply_migrations(self.connection, self.steps(), placeholder='?')
+        self.assertEqual(applied, ['0002_index.sql'])
+
+    def test_changed_migration_is_rejected(self):
+        apply_migrations(self.connection, self.steps(), placeholder='?')
+        self.write_migration('0001_description.sql', 'ALTER TABLE methods ADD COLUMN notes TEXT;')
+        with self.assertRaises(MigrationError):
+            apply_migrations(self.connection, self.steps(), placeholder='?')
+
+    def test_failed_step_rolls_back_bookkeeping(self):
+        self.write_migration('0002_broken.sql', 'INSERT INTO missing_table VALUES (1);')
+        with self.assertRaises(sqlite3.OperationalError):
+            apply_migrations(self.connection, self.steps(), placeholder='?')
+        tables = self.connection.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'schema_migrations'"
+        ).fetchall()
+        self.assertEqual(tables, [])
+
+
+class LockingConnection(sqlite3.Connection):
+    """sqlite3 connection that looks like mysql-connector: start_transaction and GET_LOCK"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock_calls = []
+        self.lock_available = 1
+        self.create_function('GET_LOCK', 2, self._get_lock)
+        self.create_function('RELEASE_LOCK', 1, self._release_lock)
+
+    def _get_lock(self, name, timeout):
+        self.lock_calls.append(('GET_LOCK', name, timeout))
+        return self.lock_available
+
+    def _release_lock(self, name):
+        self.lock_calls.append(('RELEASE_LOCK', name))
+        return 1
+
+    def start_transaction(self):
+        self.execute('BEGIN')
+
+
+class TestMigrationLock(TestApplyMigrations):
+    def setUp(self):
+        super().setUp()
+        self.connection.close()
+        self.connection = sqlite3.connect(':memory:', factory=LockingConnection)
+
+    def test_lock_around_run(self):
+        apply_migrations(self.connection, self.steps(), placeholder='?', lock_timeout=5)
+        self.assertEqual(self.connection.lock_calls, [
+            ('GET_LOCK', 'schema_migrations', 5), ('RELEASE_LOCK', 'schema_migrations')
+        ])
+        # Warmstart ohne Lock
+        apply_migrations(self.connection, self.steps(), placeholder='?')
+        self.assertEqual(len(self.connection.lock_calls), 2)
+
+    def test_lock_timeout(self):
+        self.connection.lock_available = 0
+        with self.assertRaises(MigrationError):
+            apply_migrations(self.connection, self.steps(), placeholder='?')
+        self.assertEqual(self.connection.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'methods'"
+        ).fetchone(), (0,))
+
+
+class TestAppliedChecksums(unittest.TestCase):
+    def cursor(self, error):
+        cursor = mock.Mock()
+        cursor.execute.side_effect = error
+        return cursor
+
+    def test_missing_table(self):
+        self.assertEqual(_applied_checksums(self.cursor(sqlite3.OperationalError('no such table: x'))), {})
+        missing = Exception("Table 'pizza.schema_migrations' doesn't exist")
+        missing.errno = 1146
+        self.assertEqual(_applied_checksums(self.cursor(missing)), {})
+
+    def test_other_errors_propagate(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            _applied_checksums(self.cursor(sqlite3.OperationalError('database is locked')))
+        lost = ConnectionError('Lost connection to MySQL server')
+        lost.errno = 2013
+        with self.assertRaises(ConnectionError):
+            _applied_checksums(self.cursor(lost))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import json
+import threading
+import unittest
+
+from src import app as flask_app
+from src.database.seeds import PREFERMENT_METHODS
+from src.preferment_catalog import PrefermentCatalog
+from src.repositories.preferment_repository import StaticPrefermentMethodRepository
+
+
+class FakeRepository:
+    def __init__(self, methods):
+        self.methods = methods
+        self.version = 1
+        self.loads = 0
+        self.fingerprints = 0
+        self.fail = False
+
+    def fingerprint(self):
+        self.fingerprints += 1
+        if self.fail:
+            raise ConnectionError("database down")
+        return self.version
+
+    def get_all(self):
+        self.loads += 1
+        return [dict(method) for method in self.methods]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPrefermentCatalog(unittest.TestCase):
+    def setUp(self):
+        self.repository = FakeRepository(PREFERMENT_METHODS)
+        self.clock = FakeClock()
+        self.catalog = PrefermentCatalog(self.repository, ttl=10, clock=self.clock)
+
+    def test_serialized_once_per_version(self):
+        first = self.catalog.all()
+        self.assertIs(self.catalog.all(), first)
+        self.assertEqual(json.loads(first.body)["count"], 4)
+
+        # Nach Ablauf der TTL nur Fingerprint prüfen, nicht neu laden
+        self.clock.now = 11
+        self.assertIs(self.catalog.all(), first)
+        self.assertEqual((self.repository.loads, self.repository.fingerprints), (1, 2))
+
+        self.repository.methods = PREFERMENT_METHODS[:2]
+        self.repository.version = 2
+        self.clock.now = 22
+        second = self.catalog.all()
+        self.assertEqual(json.loads(second.body)["count"], 2)
+        self.assertNotEqual(second.etag, first.etag)
+
+    def test_invalidate_forces_check(self):
+        self.catalog.all()
+        self.repository.version = 2
+        self.catalog.invalidate()
+        self.catalog.all()
+        self.assertEqual(self.repository.loads, 2)
+
+    def test_lookup_by_id_and_name(self):
+        biga = json.loads(self.catalog.by_id(2).body)
+        self.assertEqual(biga["data"]["name"], "Biga")
+        self.assertIs(self.catalog.by_name(" biga "), self.catalog.by_id(2))
+        self.assertIsNone(self.catalog.by_id(99))
+        self.assertIsNone(self.catalog.by_name("Unbekannt"))
+
+    def test_fallback_and_keep_last_good(self):
+        self.repository.fail = True
+        catalog = PrefermentCatalog(self.repository, StaticPrefermentMethodRepository(), clock=self.clock)
+        self.assertFalse(catalog.snapshot().from_repository)
+        self.assertEqual(len(catalog.snapshot().methods), 4)
+
+        self.repository.fail = False
+        self.catalog.all()
+        self.repository.fail = True
+        self.clock.now = 11
+        self.assertTrue(self.catalog.snapshot().from_repository)
+
+    def test_one_thread_refreshes(self):
+        first = self.catalog.snapshot()
+        entered, release = threading.Event(), threading.Event()
+
+        def blocking_fingerprint():
+            entered.set()
+            release.wait(5)
+            return 2
+
+        self.repository.fingerprint = blocking_fingerprint
+        self.clock.now = 11
+        refresher = threading.Thread(target=self.catalog.snapshot)
+        refresher.start()
+        self.assertTrue(entered.wait(5))
+
+        # Während der Abfrage: sofort der bisherige Stand, kein zweiter Refresh
+        self.assertIs(self.catalog.snapshot(), first)
+        self.catalog.invalidate()
+        release.set()
+        refresher.join(5)
+        self.assertEqual(self.repository.loads, 2)
+        # Invalidiert während des Ladens: nächster Zugriff prüft erneut
+        self.assertTrue(self.catalog.is_stale())
+
+
+class TestPrefermentMethodsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self._catalog = flask_app.preferment_catalog
+        flask_app.preferment_catalog = PrefermentCatalog(
+            StaticPrefermentMethodRepository(), dumps=flask_app.app.json.dumps
+        )
+        self.client = flask_app.app.test_client()
+
+    def tearDown(self):
+        flask_app.preferment_catalog = self._catalog
+
+    def test_all_with_etag(self):
+        response = self.client.get('/api/preferment-methods')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["count"], 4)
+        etag = response.headers["ETag"]
+
+        cached = self.client.get('/api/preferment-methods', headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b"")
+
+    def test_filters(self):
+        self.assertEqual(self.client.get('/api/preferment-methods?id=4').get_json()["data"]["name"], "Sauerteig")
+        self.assertEqual(self.client.get('/api/preferment-methods?name=poolish').get_json()["data"]["id"], 1)
+        self.assertEqual(self.client.get('/api/preferment-methods?id=9').status_code, 404)
+        bad = self.client.get('/api/preferment-methods?id=abc')
+        self.assertEqual(bad.status_code, 400)
+        self.assertFalse(bad.get_json()["success"])
+
+
+if __name__ == '__main__':
+    unittest.main()
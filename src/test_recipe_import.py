@@ -0,0 +1,270 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from contextlib import contextmanager
+from decimal import Decimal
+
+from src.database.models import CompactRecipe
+from src.recipe_import import ImportIndex, RecipeWriter, import_recipes, parse_file, validate_recipes
+
+SCHEMA = """
+CREATE TABLE pizza_styles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE, description TEXT,
+    typical_hydration REAL, typical_salt_percentage REAL, typical_yeast_percentage REAL
+);
+CREATE TABLE preferment_methods (id INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE recipes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, pizza_style_id INTEGER, preferment_method_id INTEGER,
+    flour_weight REAL, water_percentage REAL, salt_percentage REAL, yeast_percentage REAL,
+    preferment_percentage REAL, oil_percentage REAL, sugar_percentage REAL,
+    fermentation_time_hours INTEGER, fermentation_temperature INTEGER, notes TEXT, source_file TEXT,
+    UNIQUE (source_file, name)
+);
+INSERT INTO pizza_styles (name) VALUES ('Neapolitan');
+INSERT INTO preferment_methods (id, name) VALUES (1, 'Poolish');
+"""
+
+# mysql-connector bindet Decimal direkt, sqlite3 braucht einen Adapter
+sqlite3.register_adapter(Decimal, float)
+
+
+class TestRecipeImport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.recipes_dir = os.path.join(self.tmp, 'recipes')
+        os.makedirs(os.path.join(self.recipes_dir, 'sub'))
+        self.db_path = os.path.join(self.tmp, 'pizza.db')
+        with sqlite3.connect(self.db_path) as connection:
+            connection.executescript(SCHEMA)
+
+        @contextmanager
+        def connection_factory():
+            connection = sqlite3.connect(self.db_path, isolation_level=None)
+            try:
+                yield connection
+            finally:
+                connection.close()
+
+        self.writer = RecipeWriter(connection_factory, placeholder='?')
+        self.index = ImportIndex(os.path.join(self.tmp, 'index.db'))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.recipes_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content if isinstance(content, str) else json.dumps(content))
+        return path
+
+    def run_import(self, **kwargs):
+        kwargs.setdefault('workers', 0)
+        return import_recipes(self.recipes_dir, self.index, self.writer, **kwargs)
+
+    def rows(self):
+        with sqlite3.connect(self.db_path) as connection:
+            return connection.execute(
+                "SELECT r.name, s.name, r.preferment_method_id, r.water_percentage, r.source_file "
+                "FROM recipes r JOIN pizza_styles s ON s.id = r.pizza_style_id ORDER BY r.name"
+            ).fetchall()
+
+    def test_formats_and_styles(self):
+        self.write_file('a.json', {
+            'pizza_styles': [{'name': 'Roman', 'typical_hydration': 75}],
+            'recipes': [
+                {'name': 'Classic', 'pizza_style': 'neapolitan', 'water_percentage': 62.5,
+                 'salt_percentage': 2.8, 'yeast_percentage': 0.1},
+                {'name': 'Teglia', 'pizza_style': 'Roman', 'preferment_method': 'Poolish',
+                 'water_percentage': '80', 'salt_percentage': '2.5', 'yeast_percentage': '0.3'}
+            ]
+        })
+        self.write_file('sub/b.csv', "name,pizza_style_id,water_percentage,salt_percentage,yeast_percentage,notes\n"
+                                     "Schnell,1,65,2,1.5,\n")
+
+        report = self.run_import()
+
+        self.assertEqual(report.errors, [])
+        self.assertEqual((report.scanned, report.imported_files, report.recipes), (2, 2, 3))
+        self.assertEqual(self.rows(), [
+            ('Classic', 'Neapolitan', None, 62.5, 'a.json'),
+            ('Schnell', 'Neapolitan', None, 65, os.path.join('sub', 'b.csv')),
+            ('Teglia', 'Roman', 1, 80, 'a.json'),
+        ])
+
+    def test_reimport_only_changed_files(self):
+        recipe = {'name': 'One', 'pizza_style': 'Neapolitan', 'water_percentage': 60,
+                  'salt_percentage': 2, 'yeast_percentage': 0.2}
+        self.write_file('one.json', recipe)
+        path = self.write_file('two.json', [dict(recipe, name='Two')])
+        self.run_import()
+
+        report = self.run_import()
+        self.assertEqual((report.unchanged, report.imported_files), (2, 0))
+
+        # Neue mtime, gleicher Inhalt: kein erneuter Import
+        os.utime(path, ns=(1, 1))
+        report = self.run_import()
+        self.assertEqual((report.unchanged, report.imported_files), (2, 0))
+
+        self.write_file('two.json', [dict(recipe, name='Two', water_percentage=70)])
+        os.remove(os.path.join(self.recipes_dir, 'one.json'))
+        report = self.run_import()
+        self.assertEqual((report.imported_files, report.removed_files), (1, 1))
+        self.assertEqual(self.rows(), [('Two', 'Neapolitan', None, 70, 'two.json')])
+
+    def recipe_ids(self):
+        with sqlite3.connect(self.db_path) as connection:
+            return dict(connection.execute("SELECT name, id FROM recipes").fetchall())
+
+    def test_reimport_updates_in_place(self):
+        recipe = {'pizza_style': 'Neapolitan', 'water_percentage': 60,
+                  'salt_percentage': 2, 'yeast_percentage': 0.2}
+        self.write_file('many.json', [dict(recipe, name=name) for name in ('A', 'B', 'C')])
+        self.run_import()
+        ids = self.recipe_ids()
+
+        # B geändert, C entfernt, D neu: A und B behalten ihre ids (und damit ihre Berechnungen)
+        self.write_file('many.json', [dict(recipe, name='A'), dict(recipe, name='B', water_percentage=70),
+                                      dict(recipe, name='D')])
+        report = self.run_import()
+
+        self.assertEqual(report.errors, [])
+        new_ids = self.recipe_ids()
+        self.assertEqual(sorted(new_ids), ['A', 'B', 'D'])
+        self.assertEqual((new_ids['A'], new_ids['B']), (ids['A'], ids['B']))
+        self.assertNotIn(new_ids['D'], ids.values())
+        self.assertEqual([row[3] for row in self.rows()], [60, 70, 60])
+
+    def test_invalid_file_is_skipped_and_retried(self):
+        path = self.write_file('bad.json', [
+            {'name': 'Ok', 'pizza_style': 'Neapolitan', 'water_percentage': 60,
+             'salt_percentage': 2, 'yeast_percentage': 0.2},
+            {'name': 'Salty', 'pizza_style': 'Neapolitan', 'water_percentage': 60,
+             'salt_percentage': 120, 'yeast_percentage': 0.2},
+            {'name': 'Unknown', 'pizza_style': 'Detroit', 'water_percentage': 60,
+             'salt_percentage': 2, 'yeast_percentage': 0.2},
+        ])
+        self.write_file('broken.json', '{not json')
+        self.write_file('missing.json', {'name': 'No style', 'water_percentage': 60})
+
+        report = self.run_import()
+
+        self.assertEqual(report.imported_files, 0)
+        self.assertEqual(self.rows(), [])
+        self.assertTrue(any('bad.json: recipe 2: salt_percentage' in error for error in report.errors))
+        self.assertTrue(any(error.startswith('broken.json:') for error in report.errors))
+        self.assertTrue(any('missing required field(s)' in error for error in report.errors))
+
+        # Nicht im Index: wird beim nächsten Lauf erneut geprüft
+        self.write_file('bad.json', [{'name': 'Ok', 'pizza_style': 'Neapolitan', 'water_percentage': 60,
+                                      'salt_percentage': 2, 'yeast_percentage': 0.2}])
+        os.utime(path, ns=(2, 2))
+        report = self.run_import()
+        self.assertEqual(report.imported_files, 1)
+
+    def test_unknown_style_rolls_back_only_that_file(self):
+        self.write_file('good.json', {'name': 'Good', 'pizza_style': 'Neapolitan', 'water_percentage': 60,
+                                      'salt_percentage': 2, 'yeast_percentage': 0.2})
+        self.write_file('unknown.json', {'name': 'X', 'pizza_style': 'Detroit', 'water_percentage': 60,
+                                         'salt_percentage': 2, 'yeast_percentage': 0.2})
+        report = self.run_import()
+        self.assertEqual(report.imported_files, 1)
+        self.assertEqual([error.split(':')[0] for error in report.errors], ['unknown.json'])
+        self.assertEqual(list(self.index.entries()), ['good.json'])
+
+    def test_failed_path_containing_colon(self):
+        self.write_file('12:30.json', {'name': 'X', 'pizza_style': 'Detroit', 'water_percentage': 60,
+                                       'salt_percentage': 2, 'yeast_percentage': 0.2})
+        report = self.run_import()
+        self.assertEqual(report.errors, ["12:30.json: recipe 1: unknown pizza style 'Detroit'"])
+        self.assertEqual(list(self.index.entries()), [])
+
+    def test_process_pool(self):
+        for number in range(6):
+            self.write_file(f'r{number}.json', {'name': f'R{number}', 'pizza_style_id': 1, 'water_percentage': 60,
+                                                'salt_percentage': 2, 'yeast_percentage': 0.2})
+        report = self.run_import(workers=2, batch_files=4)
+        self.assertEqual((report.imported_files, report.recipes, report.errors), (6, 6, []))
+        self.assertEqual(len(self.rows()), 6)
+
+
+class TestParsing(unittest.TestCase):
+    def test_parse_file_reports_positions(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump([{'name': 'A', 'pizza_style': 'x', 'water_percentage': 'abc',
+                        'salt_percentage': 2, 'yeast_percentage': 0.1}], f)
+        try:
+            parsed = parse_file(f.name, 'a.json')
+        finally:
+            os.remove(f.name)
+        self.assertEqual(len(parsed.sha256), 64)
+        self.assertEqual(parsed.errors, ["a.json: recipe 1: not a number: 'abc'"])
+
+    def parse(self, name, content):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, name)
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            return parse_file(path, name)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_invalid_yaml_is_a_file_error(self):
+        try:
+            import yaml  # noqa: F401
+        except ImportError:
+            self.skipTest('PyYAML not installed')
+        parsed = self.parse('bad.yaml', 'recipes: [unclosed\n')
+        self.assertEqual(parsed.recipes, [])
+        self.assertEqual(len(parsed.errors), 1)
+        self.assertTrue(parsed.errors[0].startswith('bad.yaml: invalid YAML'))
+
+    def test_invalid_csv_is_a_file_error(self):
+        parsed = self.parse('bad.csv', 'name\n"' + 'x' * 200000 + '"\n')
+        self.assertEqual(len(parsed.errors), 1)
+        self.assertTrue(parsed.errors[0].startswith('bad.csv: invalid CSV'))
+
+    def test_records_must_be_lists(self):
+        parsed = self.parse('a.json', json.dumps({'recipes': 5}))
+        self.assertEqual(parsed.errors, ['a.json: "recipes" must be a list'])
+        parsed = self.parse('b.json', json.dumps({'recipes': [], 'pizza_styles': {'name': 'Roman'}}))
+        self.assertEqual(parsed.errors, ['b.json: "pizza_styles" must be a list'])
+
+    def test_invalid_styles_are_file_errors(self):
+        parsed = self.parse('styles.json', json.dumps({'recipes': [], 'pizza_styles': [
+            {'name': 'R' * 101},
+            {'name': '   '},
+            {'name': 'Roman', 'typical_hydration': 1000},
+            {'name': 'Detroit', 'typical_salt_percentage': -1},
+            {'name': 'Chicago', 'typical_yeast_percentage': 0.5},
+        ]}))
+        self.assertEqual([style.name for style in parsed.styles], ['Chicago'])
+        self.assertEqual(parsed.errors, [
+            'styles.json: pizza style 1: pizza style name must be at most 100 characters',
+            'styles.json: pizza style 2: pizza style needs a name',
+            'styles.json: pizza style 3: typical_hydration must be between 0.00 and 999.99',
+            'styles.json: pizza style 4: typical_salt_percentage must be between 0.00 and 99.99',
+        ])
+
+    def test_duplicate_names_in_one_file(self):
+        recipe = {'name': 'Same', 'pizza_style': 'x', 'water_percentage': 60,
+                  'salt_percentage': 2, 'yeast_percentage': 0.1}
+        parsed = self.parse('dup.json', json.dumps([recipe, dict(recipe, name='same')]))
+        self.assertEqual(parsed.errors, ["dup.json: recipe 2: duplicate name 'same' (also recipe 1)"])
+
+    def test_validate_recipes(self):
+        problems = validate_recipes([
+            CompactRecipe(name='ok'),
+            CompactRecipe(name='', flour_weight=Decimal('0')),
+        ])
+        self.assertEqual(list(problems), [1])
+        self.assertEqual(len(problems[1]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
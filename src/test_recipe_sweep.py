@@ -0,0 +1,97 @@
+import json
+import time
+import unittest
+from decimal import Decimal
+
+import numpy as np
+
+from src.business_logic.dough_calculation import calculate_calculations
+from src.business_logic.recipe_sweep import RecipeSweep, SweepRange, iter_ndjson, parse_sweep_request
+from src.database.models import Recipe
+
+
+class TestRecipeSweep(unittest.TestCase):
+    def setUp(self):
+        self.base = Recipe(id=1, oil_percentage=Decimal('3.00'), preferment_percentage=Decimal('20.00'))
+
+    def test_grid_matches_calculate_calculations(self):
+        sweep = RecipeSweep(self.base, {
+            'water_percentage': SweepRange(60, 70, 2.5),
+            'salt_percentage': [2, 3],
+            'pizza_weight': [250, 280]
+        }, number_of_pizzas=4)
+        self.assertEqual(sweep.shape, (5, 2, 1, 1, 2))
+        rows = list(sweep.rows(chunk_size=3))
+        self.assertEqual([row['index'] for row in rows], list(range(20)))
+
+        row = rows[11]  # water 65, salt 3, weight 280
+        self.assertEqual((row['water_percentage'], row['salt_percentage'], row['pizza_weight']), (65, 3, 280))
+        variant = Recipe(water_percentage=Decimal('65'), salt_percentage=Decimal('3'),
+                         oil_percentage=Decimal('3.00'), preferment_percentage=Decimal('20.00'))
+        expected = calculate_calculations([variant], 4, 280)[0]
+        self.assertEqual(Decimal(str(row['total_flour'])), expected.total_flour)
+        self.assertEqual(Decimal(str(row['preferment_water'])), expected.preferment_water)
+        self.assertEqual(row['total_dough'], 1120)
+
+    def test_filters_and_paging(self):
+        sweep = RecipeSweep(self.base, {'water_percentage': SweepRange(55, 80, 1), 'pizza_weight': [200, 300]},
+                            filters={'total_dough': (None, 1000), 'total_water': (300, None)})
+        expected = [row['index'] for row in sweep.rows()
+                    if row['total_dough'] <= 1000 and row['total_water'] >= 300]
+        self.assertTrue(expected)
+        self.assertEqual(sweep.count(), len(expected))
+
+        seen, cursor = [], 0
+        while cursor is not None:
+            page = sweep.page(cursor, limit=4)
+            seen.extend(row['index'] for row in page.rows)
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            RecipeSweep(self.base, {'flour_weight': [1]})
+        with self.assertRaises(ValueError):
+            RecipeSweep(self.base, {}, filters={'unknown': (0, 1)})
+        with self.assertRaises(ValueError):
+            RecipeSweep(self.base, {'water_percentage': SweepRange(70, 60, 1)})
+        with self.assertRaises(ValueError):
+            RecipeSweep(self.base, {'water_percentage': SweepRange(0, 99999, 0.01)})
+        with self.assertRaises(ValueError):
+            parse_sweep_request({'ranges': {'water_percentage': {'start': 60}}})
+
+    def test_non_finite_input(self):
+        for body in (
+            '{"ranges": {"water_percentage": {"start": 60, "stop": Infinity, "step": 1}}}',
+            '{"ranges": {"salt_percentage": {"start": NaN, "stop": 3, "step": 0.1}}}',
+            '{"base": {"oil_percentage": Infinity}}',
+            '{"base": {"oil_percentage": NaN}}',
+        ):
+            with self.subTest(body=body), self.assertRaises(ValueError):
+                parse_sweep_request(json.loads(body))
+        with self.assertRaises(ValueError):
+            SweepRange(0, float('inf'), 1).values()
+
+    def test_million_point_stream(self):
+        sweep, cursor, limit = parse_sweep_request({
+            'ranges': {
+                'water_percentage': {'start': 55, 'stop': 79.75, 'step': 0.25},
+                'salt_percentage': {'start': 2, 'stop': 3.9, 'step': 0.1},
+                'yeast_percentage': [0.05, 0.1, 0.2, 0.5, 1],
+                'pizza_weight': {'start': 200, 'stop': 295, 'step': 1}
+            },
+            'filters': {'total_dough': {'max': 1000}}
+        })
+        self.assertEqual(sweep.size, 100 * 20 * 5 * 96)
+        start = time.perf_counter()
+        matched = sum(len(chunk.index) for chunk in sweep.chunks())
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual(matched, 100 * 20 * 5 * 51)
+        self.assertTrue(np.all(next(sweep.chunks()).results['total_dough'] <= 1000))
+
+        first = next(iter_ndjson(sweep, chunk_size=10))
+        self.assertEqual(first.count(b'\n'), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
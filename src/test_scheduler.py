@@ -0,0 +1,86 @@
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from src.business_logic import calculate_timing_schedule
+from src.business_logic.scheduler import ProductionCapacity, schedule_production
+
+
+class TestScheduleProduction(unittest.TestCase):
+    def setUp(self):
+        self.deadline = datetime(2024, 5, 1, 18, 0)
+
+    def test_single_order_matches_timing_schedule(self):
+        plan = schedule_production([{'order_id': 'a', 'target_finish_time': self.deadline}])
+        schedule = plan['schedules']['a']
+        expected = calculate_timing_schedule({}, self.deadline)
+        for key, value in expected.items():
+            self.assertEqual(schedule[key], value)
+        self.assertFalse(schedule['late'])
+        self.assertEqual(plan['late_orders'], [])
+
+    def test_shared_oven_shifts_second_order(self):
+        orders = [
+            {'order_id': 'a', 'target_finish_time': self.deadline},
+            {'order_id': 'b', 'target_finish_time': self.deadline}
+        ]
+        plan = schedule_production(orders, ProductionCapacity(mixers=2, proofing_slots=2, oven_slots=1))
+        ends = sorted(plan['schedules'][o]['back_ende'] for o in ('a', 'b'))
+        self.assertEqual(ends, [self.deadline - timedelta(minutes=30), self.deadline])
+
+    def test_capacity_is_never_exceeded(self):
+        orders = [
+            {'order_id': i, 'target_finish_time': self.deadline - timedelta(minutes=10 * (i % 7)),
+             'recipe_data': {'back_zeit': 20 + i % 3}}
+            for i in range(60)
+        ]
+        capacity = ProductionCapacity(mixers=2, proofing_slots=6, oven_slots=3)
+        plan = schedule_production(orders, capacity)
+
+        checks = [
+            ('mixer', 'knet_start', 'knet_ende', capacity.mixers),
+            ('proofing_slot', 'stockgare_start', 'stueckgare_ende', capacity.proofing_slots),
+            ('oven_slot', 'back_start', 'back_ende', capacity.oven_slots)
+        ]
+        for unit_key, start_key, end_key, count in checks:
+            by_unit = {}
+            for schedule in plan['schedules'].values():
+                self.assertLess(schedule[unit_key], count)
+                by_unit.setdefault(schedule[unit_key], []).append((schedule[start_key], schedule[end_key]))
+            for intervals in by_unit.values():
+                intervals.sort()
+                for (_, end), (start, _) in zip(intervals, intervals[1:]):
+                    self.assertLessEqual(end, start)
+
+        for order in orders:
+            schedule = plan['schedules'][order['order_id']]
+            self.assertLessEqual(schedule['back_ende'], order['target_finish_time'])
+        for value in plan['utilization'].values():
+            self.assertTrue(0 < value <= 1)
+
+    def test_late_orders_are_reported(self):
+        orders = [{'order_id': i, 'target_finish_time': self.deadline} for i in range(3)]
+        earliest = self.deadline - timedelta(hours=4)
+        plan = schedule_production(orders, ProductionCapacity(oven_slots=1, mixers=3, proofing_slots=3),
+                                   earliest_start=earliest)
+        # 235 Minuten pro Auftrag, jeder weitere Auftrag 30 Minuten früher
+        self.assertEqual(len(plan['late_orders']), 2)
+        self.assertEqual(sorted(late['delay_minutes'] for late in plan['late_orders']), [25.0, 55.0])
+
+    def test_full_day_is_fast(self):
+        orders = [
+            {'order_id': i, 'target_finish_time': self.deadline - timedelta(minutes=i)}
+            for i in range(1000)
+        ]
+        start = time.perf_counter()
+        plan = schedule_production(orders, ProductionCapacity(mixers=4, proofing_slots=40, oven_slots=8))
+        self.assertEqual(len(plan['schedules']), 1000)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_invalid_capacity(self):
+        with self.assertRaises(ValueError):
+            schedule_production([], ProductionCapacity(oven_slots=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
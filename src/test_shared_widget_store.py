@@ -0,0 +1,95 @@
+import gzip
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+from src import main
+from src.shared_widget_store import SharedWidgetStore
+
+LARGE_HTML = "<div>" + "<p>Pizza Widget</p>" * 50 + "</div>"
+
+
+def publish_in_child(directory, html):
+    store = SharedWidgetStore(directory)
+    store["from-child"] = {"html": html, "status": "active"}
+    store.close()
+
+
+class TestSharedWidgetStore(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.store = SharedWidgetStore(self.directory, {"w": {"html": LARGE_HTML, "status": "active"}})
+
+    def tearDown(self):
+        self.store.close()
+        self._directory.cleanup()
+
+    def test_workers_see_the_same_version(self):
+        other = SharedWidgetStore(self.directory, {"ignored": {"html": "<p>x</p>", "status": "active"}})
+        self.assertEqual(list(other), ["w"])  # Seed nur bei leerem Verzeichnis
+
+        other["w"] = {"html": "<p>neu</p>", "status": "inactive"}
+        self.assertEqual(self.store.version, other.version)
+        self.assertEqual(self.store["w"], {"html": "<p>neu</p>", "status": "inactive"})
+        self.assertEqual(self.store.encoded("w").body, b"<p>neu</p>")
+
+        del self.store["w"]
+        self.assertNotIn("w", other)
+        with self.assertRaises(KeyError):
+            del other["w"]
+        other.close()
+
+    def test_unchanged_widgets_keep_their_encoding(self):
+        before = self.store.encoded("w")
+        self.store["x"] = {"html": "<p>x</p>", "status": "active"}
+        after = self.store.encoded("w")
+        self.assertEqual((after.etag, after.gzip_etag), (before.etag, before.gzip_etag))
+        self.assertEqual(gzip.decompress(after.gzip_body), LARGE_HTML.encode('utf-8'))
+        self.assertIsNone(self.store.encoded("x").gzip_body)
+
+        for i in range(5):
+            self.store["x"] = {"html": f"<p>{i}</p>", "status": "active"}
+        snapshots = [name for name in os.listdir(self.directory) if name.startswith("widgets.")]
+        self.assertEqual(len(snapshots), 2)
+
+    def test_update_from_other_process(self):
+        process = multiprocessing.get_context("fork").Process(
+            target=publish_in_child, args=(self.directory, "<p>child</p>")
+        )
+        process.start()
+        process.join(10)
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(self.store["from-child"]["html"], "<p>child</p>")
+
+    def test_lookup_reads_one_snapshot(self):
+        record, encoded = self.store.lookup("w")
+        self.assertEqual(record, {"status": "active"})
+        self.assertEqual(encoded.body, LARGE_HTML.encode("utf-8"))
+        self.assertIsNone(self.store.lookup("missing"))
+
+        # Widget verschwindet nach dem Lesen: das Ergebnis bleibt gültig
+        del self.store["w"]
+        self.assertEqual(gzip.decompress(encoded.gzip_body), LARGE_HTML.encode("utf-8"))
+        self.assertIsNone(self.store.lookup("w"))
+
+    def test_widget_endpoint(self):
+        original = main.widgets_db
+        main.widgets_db = self.store
+        self.store["large-widget"] = self.store["w"]
+        try:
+            client = TestClient(main.app)
+            response = client.get("/widget/large-widget", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(response.headers["content-encoding"], "gzip")
+            self.assertEqual(response.text, LARGE_HTML)
+            etag = response.headers["etag"]
+            self.assertEqual(client.get("/widget/large-widget", headers={"If-None-Match": etag}).status_code, 304)
+        finally:
+            main.widgets_db = original
+
+
+if __name__ == '__main__':
+    unittest.main()
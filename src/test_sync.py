@@ -0,0 +1,263 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from src.business_logic.sync import (
+    SyncError,
+    iter_ndjson_lines,
+    sync_json,
+    sync_json_bytes,
+    sync_ndjson,
+    validate_items,
+)
+from src.business_logic.sync_index import SyncIndex
+from src.business_logic.sync_jobs import (
+    SyncBodyTooLargeError,
+    SyncJobQueue,
+    SyncJobStore,
+    SyncQueueFullError,
+    copy_body,
+    ndjson_job,
+    wants_async,
+)
+
+
+def ndjson(items):
+    return io.BytesIO(b''.join(json.dumps(item).encode() + b'\n' for item in items))
+
+
+class TestValidateItems(unittest.TestCase):
+    def test_valid(self):
+        self.assertIsNone(validate_items([{'id': 1}, {'id': 2, 'x': 3}]))
+
+    def test_messages(self):
+        self.assertEqual(validate_items([{'id': 1}, 'x']),
+                         'Data item at index 1 must be an object')
+        self.assertEqual(validate_items([{'name': 'x'}]),
+                         'Data item at index 0 missing required field: id')
+
+
+class TestSyncJsonBytes(unittest.TestCase):
+    def test_same_messages_as_parsed_payload(self):
+        payloads = [None, [], {'x': 1}, {'data': {}}, {'data': []}, {'data': [{'id': 1}, 2]},
+                    {'data': [{'id': 1}, {'name': 'x'}]}, {'data': [{'id': i} for i in range(1001)]},
+                    {'data': [{'id': 'a', 'nested': {'id': 1}}]}]
+        for payload in payloads:
+            expected = sync_json(payload) if payload is not None else ({'error': 'Invalid JSON payload'}, 400)
+            self.assertEqual(sync_json_bytes(json.dumps(payload).encode()), expected, payload)
+        self.assertEqual(sync_json_bytes(b'{"data": ['), ({'error': 'Invalid JSON format'}, 400))
+
+
+class TestSyncNdjson(unittest.TestCase):
+    def setUp(self):
+        self.committed = []
+
+    def commit(self, items):
+        self.committed.append(list(items))
+        return len(items)
+
+    def run_sync(self, stream, **kwargs):
+        return sync_ndjson(iter_ndjson_lines(stream.readline), commit=self.commit, **kwargs)
+
+    def test_batches(self):
+        stream = ndjson([{'id': i} for i in range(25)])
+        synced_count, batches = self.run_sync(stream, batch_size=10)
+        self.assertEqual(synced_count, 25)
+        self.assertEqual([len(batch) for batch in self.committed], [10, 10, 5])
+        self.assertEqual(batches[-1], {'batch': 3, 'items': 5, 'synced_count': 25})
+
+    def test_blank_lines_are_skipped(self):
+        stream = io.BytesIO(b'{"id": 1}\n\n  \n{"id": 2}')
+        self.assertEqual(self.run_sync(stream)[0], 2)
+
+    def test_error_keeps_committed_batches(self):
+        items = [{'id': i} for i in range(12)] + [{'name': 'no id'}]
+        with self.assertRaises(SyncError) as context:
+            self.run_sync(ndjson(items), batch_size=5)
+        self.assertEqual(context.exception.message, 'Data item at index 12 missing required field: id')
+        self.assertEqual(context.exception.synced_count, 10)
+        self.assertEqual(len(context.exception.batches), 2)
+        self.assertEqual(len(self.committed), 2)
+
+    def test_invalid_json(self):
+        with self.assertRaisesRegex(SyncError, 'Invalid JSON at index 1'):
+            self.run_sync(io.BytesIO(b'{"id": 1}\n{oops\n'))
+
+    def test_item_limit(self):
+        with self.assertRaisesRegex(SyncError, 'Maximum 3 items'):
+            self.run_sync(ndjson([{'id': i} for i in range(4)]), max_items=3)
+
+    def test_line_limit(self):
+        stream = io.BytesIO(b'{"id": 1, "data": "' + b'x' * 100 + b'"}\n')
+        with self.assertRaisesRegex(SyncError, 'exceeds maximum size'):
+            sync_ndjson(iter_ndjson_lines(stream.readline, max_line_bytes=50), commit=self.commit)
+
+
+class TestDeltaSync(unittest.TestCase):
+    def setUp(self):
+        self.committed = []
+        self.index = SyncIndex(':memory:', cache_size=2)
+
+    def commit(self, items):
+        self.committed.append([item['id'] for item in items])
+        return len(items)
+
+    def test_unchanged_items_are_not_written(self):
+        items = [{'id': i, 'value': i} for i in range(10)]
+        body, _ = sync_json({'data': items}, self.index, self.commit)
+        self.assertEqual((body['created'], body['updated'], body['unchanged']), (10, 0, 0))
+
+        items[3] = {'id': 3, 'value': 'changed'}
+        items.append({'id': '3', 'value': 3})  # anderer Typ, anderes Item
+        body, _ = sync_json({'data': items}, self.index, self.commit)
+        self.assertEqual((body['created'], body['updated'], body['unchanged'], body['synced_count']), (1, 1, 9, 11))
+        self.assertEqual(self.committed[-1], ['3', 3])
+
+        sync_json({'data': items}, self.index, self.commit)
+        self.assertEqual(len(self.committed), 2)
+
+    def test_failed_commit_is_retried(self):
+        def failing(items):
+            raise RuntimeError('cloud unavailable')
+
+        with self.assertRaises(RuntimeError):
+            sync_json({'data': [{'id': 1}]}, self.index, failing)
+        body, _ = sync_json({'data': [{'id': 1}]}, self.index, self.commit)
+        self.assertEqual(body['created'], 1)
+
+    def test_ndjson_batches_report_counts(self):
+        lines = [{'id': i} for i in range(6)]
+        sync_ndjson(iter_ndjson_lines(ndjson(lines).readline), batch_size=4, commit=self.commit, index=self.index)
+        lines[5] = {'id': 5, 'x': 1}
+        lines.append({'id': 5, 'x': 1})
+        synced_count, batches = sync_ndjson(
+            iter_ndjson_lines(ndjson(lines).readline), batch_size=4, commit=self.commit, index=self.index
+        )
+        self.assertEqual(synced_count, 7)
+        self.assertEqual(batches[-1], {'batch': 2, 'items': 3, 'created': 0, 'updated': 1, 'unchanged': 2,
+                                       'synced_count': 7})
+        self.assertEqual(self.committed[-1], [5])
+
+    def test_persisted_across_instances(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sync_index.db')
+            index = SyncIndex(path)
+            index.record(index.diff([{'id': 1, 'a': [1, 2]}]))
+            index.close()
+
+            reopened = SyncIndex(path)
+            delta = reopened.diff([{'a': [1, 2], 'id': 1}, {'id': 2}])
+            self.assertEqual((len(delta.created), len(delta.updated), delta.unchanged), (1, 0, 1))
+            reopened.close()
+
+    def test_shared_by_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sync_index.db')
+            worker_a, worker_b = SyncIndex(path), SyncIndex(path)
+            v1, v2 = {'id': 1, 'v': 1}, {'id': 1, 'v': 2}
+            worker_a.record(worker_a.diff([v1]))
+            worker_b.record(worker_b.diff([v2]))
+
+            # A hat v1 noch im Cache, v2 von B muss trotzdem gelten
+            delta = worker_a.diff([v1])
+            self.assertEqual((len(delta.updated), delta.unchanged), (1, 0))
+            worker_a.close()
+            worker_b.close()
+
+
+class TestSyncJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.jobs = SyncJobQueue(workers=1, max_pending=2, store=SyncJobStore(':memory:'))
+
+    def tearDown(self):
+        self.jobs.close()
+
+    def wait(self, job):
+        for _ in range(500):
+            if job.finished:
+                return job
+            threading.Event().wait(0.01)
+        self.fail('job did not finish')
+
+    def test_ndjson_job_reports_progress_and_result(self):
+        job = self.wait(self.jobs.submit('ndjson', ndjson_job(ndjson([{'id': i} for i in range(5)]), None, 2)))
+        status = job.to_dict()
+        self.assertEqual((status['status'], status['processed_count'], status['batches']), ('succeeded', 5, 3))
+        self.assertEqual(status['result']['synced_count'], 5)
+
+        failed = self.wait(self.jobs.submit('ndjson', ndjson_job(ndjson([{'id': 1}, {'x': 2}]), None)))
+        self.assertEqual((failed.status, failed.result_status), ('failed', 400))
+
+    def test_full_queue_rejects_and_cleans_up(self):
+        release = threading.Event()
+        cleaned = []
+
+        def blocking(job):
+            release.wait(5)
+            return {}, 200
+
+        blocked = [self.jobs.submit('json', blocking) for _ in range(2)]
+        with self.assertRaises(SyncQueueFullError):
+            self.jobs.submit('json', lambda job: ({}, 200), lambda: cleaned.append(True))
+        self.assertEqual(cleaned, [True])
+        release.set()
+        for job in blocked:
+            self.wait(job)
+        self.assertEqual(self.jobs.submit('json', lambda job: ({}, 200)).status, 'queued')
+
+    def test_reserved_slot(self):
+        self.jobs.reserve()
+        self.jobs.reserve()
+        with self.assertRaises(SyncQueueFullError):
+            self.jobs.reserve()
+        self.jobs.release()
+        job = self.wait(self.jobs.submit('json', lambda job: ({}, 200), reserved=True))
+        self.assertEqual(job.status, 'succeeded')
+        for _ in range(500):
+            if self.jobs.pending == 0:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(self.jobs.pending, 0)
+
+    def test_status_shared_between_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sync_jobs.db')
+            worker_a = SyncJobQueue(workers=1, store=SyncJobStore(path))
+            worker_b = SyncJobQueue(workers=1, store=SyncJobStore(path))
+            try:
+                job = self.wait(worker_a.submit('json', lambda job: ({'synced_count': 3}, 200)))
+                status = worker_b.status(job.id)
+                self.assertEqual((status['status'], status['result']), ('succeeded', {'synced_count': 3}))
+                self.assertIsNone(worker_b.status('unknown'))
+            finally:
+                for worker in (worker_a, worker_b):
+                    worker.close()
+                    worker.store.close()
+
+    def test_finished_jobs_are_pruned(self):
+        jobs = SyncJobQueue(workers=1, max_finished=1, store=SyncJobStore(':memory:'))
+        first = self.wait(jobs.submit('json', lambda job: ({}, 200)))
+        second = self.wait(jobs.submit('json', lambda job: ({}, 200)))
+        jobs.submit('json', lambda job: ({}, 200))
+        jobs.close()
+        self.assertIsNone(jobs.status(first.id))
+        self.assertIsNotNone(jobs.status(second.id))
+
+    def test_copy_body_limit(self):
+        target = io.BytesIO()
+        copy_body(io.BytesIO(b'x' * 10), target, max_bytes=10)
+        self.assertEqual(target.read(), b'x' * 10)
+        with self.assertRaises(SyncBodyTooLargeError):
+            copy_body(io.BytesIO(b'x' * 11), io.BytesIO(), max_bytes=10)
+
+    def test_wants_async(self):
+        self.assertTrue(wants_async('respond-async, wait=10', None))
+        self.assertTrue(wants_async(None, 'async'))
+        self.assertFalse(wants_async('return=minimal', None))
+
+
+if __name__ == '__main__':
+    unittest.main()
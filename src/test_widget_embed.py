@@ -0,0 +1,64 @@
+import unittest
+
+from src.business_logic.widget_embed import WidgetEmbedService, config_hash
+from src.models.widget import Widget
+from src.repositories.widget_repository import WidgetRepository
+
+
+class TestWidgetEmbedRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.repository = WidgetRepository()
+        self.service = WidgetEmbedService(self.repository)
+        self.widget = self.repository.save(Widget(
+            id=None, key='shop', name='Shop', theme='dark',
+            config={'size': 'large'}, allowed_domains=['example.com']
+        ))
+
+    def test_rendered_fragment_is_cached(self):
+        first = self.service.render_widget_embed('shop', 'example.com')
+        second = self.service.render_widget_embed('shop', 'example.com')
+        self.assertIs(first, second)
+        self.assertIn("theme: 'dark'", first.html)
+        self.assertTrue(first.etag.startswith('"') and first.etag.endswith('"'))
+        self.assertEqual(self.service.generate_widget_embed_code('shop', 'example.com'), first.html)
+
+    def test_theme_and_config_are_part_of_key(self):
+        base = self.service.render_widget_embed('shop', 'example.com')
+        light = self.service.render_widget_embed('shop', 'example.com', theme='light')
+        small = self.service.render_widget_embed('shop', 'example.com', config={'size': 'small'})
+        self.assertEqual(len({base.etag, light.etag, small.etag}), 3)
+        self.assertIn("theme: 'light'", light.html)
+        self.assertIn('small', small.html)
+
+    def test_config_hash_ignores_key_order(self):
+        self.assertEqual(config_hash({'a': 1, 'b': 2}), config_hash({'b': 2, 'a': 1}))
+        self.assertNotEqual(config_hash({'a': 1}), config_hash({'a': 2}))
+
+    def test_save_invalidates(self):
+        before = self.service.render_widget_embed('shop', 'example.com')
+        self.widget.theme = 'light'
+        self.repository.save(self.widget)
+        after = self.service.render_widget_embed('shop', 'example.com')
+        self.assertNotEqual(before.etag, after.etag)
+        self.assertIn("theme: 'light'", after.html)
+
+    def test_delete_invalidates(self):
+        self.service.render_widget_embed('shop', 'example.com')
+        self.repository.delete(self.widget.id)
+        with self.assertRaises(ValueError):
+            self.service.render_widget_embed('shop', 'example.com')
+
+    def test_domain_checked_on_cache_hit(self):
+        self.service.render_widget_embed('shop', 'example.com')
+        with self.assertRaises(ValueError):
+            self.service.render_widget_embed('shop', 'evil.net')
+
+    def test_html_is_escaped(self):
+        self.repository.save(Widget(id=None, key='x', name='X', config={'t': '</script>'}))
+        rendered = self.service.render_widget_embed('x', 'any.org')
+        self.assertNotIn('</script>"', rendered.html)
+        self.assertIn('&lt;/script&gt;', rendered.html)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import sqlite3
+import threading
+import unittest
+from contextlib import contextmanager
+
+from src.models.widget import Widget
+from src.repositories.mysql_widget_repository import MySQLWidgetRepository
+from src.repositories.widget_repository import CachedWidgetRepository, WidgetRepository
+
+
+def make_widget(key, **kwargs):
+    return Widget(id=None, key=key, name=key, **kwargs)
+
+
+class CountingRepository(WidgetRepository):
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get_by_id(self, widget_id):
+        self.reads += 1
+        return super().get_by_id(widget_id)
+
+    def get_by_key(self, widget_key):
+        self.reads += 1
+        return super().get_by_key(widget_key)
+
+
+class TestWidgetRepository(unittest.TestCase):
+    def setUp(self):
+        self.repository = WidgetRepository()
+
+    def test_ids_are_not_reused_after_delete(self):
+        first = self.repository.save(make_widget('first'))
+        second = self.repository.save(make_widget('second'))
+        self.assertTrue(self.repository.delete(first.id))
+        third = self.repository.save(make_widget('third'))
+        self.assertNotIn(third.id, (first.id, second.id))
+        self.assertIs(self.repository.get_by_id(second.id), second)
+
+    def test_duplicate_key_is_rejected(self):
+        self.repository.save(make_widget('same'))
+        with self.assertRaises(ValueError):
+            self.repository.save(make_widget('same'))
+
+    def test_key_change_updates_index(self):
+        widget = self.repository.save(make_widget('old'))
+        widget.key = 'new'
+        self.repository.save(widget)
+        self.assertIsNone(self.repository.get_by_key('old'))
+        self.assertIs(self.repository.get_by_key('new'), widget)
+
+    def test_active_index(self):
+        active = self.repository.save(make_widget('active'))
+        inactive = self.repository.save(make_widget('inactive', is_active=False))
+        self.assertEqual(self.repository.get_active(), [active])
+        inactive.is_active = True
+        self.repository.save(inactive)
+        self.assertEqual(self.repository.get_active(), [active, inactive])
+
+    def test_domain_index(self):
+        widget = self.repository.save(make_widget('shop', allowed_domains=['Example.com', '*.example.org']))
+        self.assertEqual(self.repository.get_by_allowed_domain('example.com'), [widget])
+        self.assertEqual(self.repository.get_by_allowed_domain('*.example.org'), [widget])
+        widget.allowed_domains = ['other.net']
+        self.repository.save(widget)
+        self.assertEqual(self.repository.get_by_allowed_domain('example.com'), [])
+        self.repository.delete(widget.id)
+        self.assertEqual(self.repository.get_by_allowed_domain('other.net'), [])
+
+    def test_concurrent_saves_get_unique_ids(self):
+        def worker(offset):
+            for i in range(100):
+                self.repository.save(make_widget(f'w-{offset}-{i}'))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ids = [widget.id for widget in self.repository.get_all()]
+        self.assertEqual(len(ids), 400)
+        self.assertEqual(len(set(ids)), 400)
+
+
+class TestCachedWidgetRepository(unittest.TestCase):
+    def setUp(self):
+        self.backend = CountingRepository()
+        self.repository = CachedWidgetRepository(self.backend, maxsize=2)
+
+    def test_read_through(self):
+        widget = self.repository.save(make_widget('cached'))
+        self.assertIs(self.repository.get_by_key('cached'), widget)
+        self.assertIs(self.repository.get_by_key('cached'), widget)
+        self.assertEqual(self.backend.reads, 1)
+
+    def test_misses_are_not_cached(self):
+        self.assertIsNone(self.repository.get_by_key('missing'))
+        self.repository.save(make_widget('missing'))
+        self.assertIsNotNone(self.repository.get_by_key('missing'))
+
+    def test_save_invalidates_old_key(self):
+        widget = self.repository.save(make_widget('old'))
+        self.repository.get_by_key('old')
+        widget.key = 'new'
+        self.repository.save(widget)
+        self.assertIsNone(self.repository.get_by_key('old'))
+        self.assertIs(self.repository.get_by_key('new'), widget)
+
+    def test_delete_invalidates(self):
+        widget = self.repository.save(make_widget('gone'))
+        self.repository.get_by_id(widget.id)
+        self.repository.get_by_key('gone')
+        self.assertTrue(self.repository.delete(widget.id))
+        self.assertIsNone(self.repository.get_by_id(widget.id))
+        self.assertIsNone(self.repository.get_by_key('gone'))
+
+    def test_lru_eviction(self):
+        for key in ('a', 'b', 'c'):
+            self.repository.save(make_widget(key))
+            self.repository.get_by_key(key)
+        reads = self.backend.reads
+        self.repository.get_by_key('a')
+        self.assertEqual(self.backend.reads, reads + 1)
+
+    def test_key_map_bounded_by_cache(self):
+        for number in range(10):
+            self.repository.save(make_widget(f'key-{number}'))
+            self.repository.get_by_key(f'key-{number}')
+        self.assertEqual(len(self.repository._cached_keys), 2)
+        self.repository.invalidate_all()
+        self.assertEqual(self.repository._cached_keys, {})
+
+
+class DuplicateEntry(Exception):
+    errno = 1062
+
+
+class SqliteCursor:
+    """Cursor mit %s-Platzhaltern und MySQL-Fehlernummer für doppelte Schlüssel"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        try:
+            self._cursor.execute(sql.replace('%s', '?'), params)
+        except sqlite3.IntegrityError as e:
+            raise DuplicateEntry(str(e))
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SqliteConnection:
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self):
+        return SqliteCursor(self._connection.cursor())
+
+
+class TestMySQLWidgetRepository(unittest.TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:', isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE embed_widgets (id INTEGER PRIMARY KEY AUTOINCREMENT, widget_key TEXT UNIQUE, "
+            "name TEXT, theme TEXT, config TEXT, allowed_domains TEXT, "
+            "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP, is_active BOOLEAN)"
+        )
+
+        @contextmanager
+        def connection_factory():
+            yield SqliteConnection(self.connection)
+
+        self.repository = MySQLWidgetRepository(connection_factory)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_insert_and_update_by_id(self):
+        widget = self.repository.save(make_widget('first'))
+        widget.name = 'Renamed'
+        self.repository.save(widget)
+        self.repository.save(widget)  # unverändert
+        self.assertEqual(self.repository.get_by_id(widget.id).name, 'Renamed')
+
+        explicit = make_widget('explicit')
+        explicit.id = 42
+        self.repository.save(explicit)
+        self.assertEqual(self.repository.get_by_key('explicit').id, 42)
+
+    def test_key_collision_leaves_other_widget_alone(self):
+        other = self.repository.save(make_widget('taken'))
+        for widget_id in (None, other.id + 100):
+            widget = make_widget('taken')
+            widget.id = widget_id
+            widget.name = 'Intruder'
+            with self.assertRaises(ValueError):
+                self.repository.save(widget)
+
+        existing = self.repository.save(make_widget('mine'))
+        existing.key = 'taken'
+        with self.assertRaises(ValueError):
+            self.repository.save(existing)
+        self.assertEqual(self.repository.get_by_key('taken').name, other.name)
+        self.assertEqual([w.key for w in self.repository.get_all()], ['taken', 'mine'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import gzip
+import unittest
+
+from fastapi.testclient import TestClient
+
+from src import main
+from src.widget_store import WidgetStore, accepts_gzip, encode_widget, etag_matches
+
+LARGE_HTML = "<div>" + "<p>Pizza Widget</p>" * 50 + "</div>"
+
+
+class TestWidgetStore(unittest.TestCase):
+    def test_encode_small_body_without_gzip(self):
+        encoded = encode_widget("<p>Hi</p>")
+        self.assertEqual(encoded.body, b"<p>Hi</p>")
+        self.assertIsNone(encoded.gzip_body)
+        self.assertEqual(encoded.etags, (encoded.etag,))
+
+    def test_encode_large_body_with_gzip(self):
+        encoded = encode_widget(LARGE_HTML)
+        self.assertEqual(gzip.decompress(encoded.gzip_body), LARGE_HTML.encode('utf-8'))
+        self.assertNotEqual(encoded.etag, encoded.gzip_etag)
+        # Deterministisch, damit alle Worker dieselben Bytes liefern
+        self.assertEqual(encode_widget(LARGE_HTML).gzip_body, encoded.gzip_body)
+
+    def test_store_reencodes_replaced_html(self):
+        store = WidgetStore({"w": {"html": "<p>a</p>", "status": "active"}})
+        first = store.encoded("w")
+        self.assertIs(store.encoded("w"), first)
+        store["w"]["html"] = "<p>b</p>"
+        self.assertEqual(store.encoded("w").body, b"<p>b</p>")
+        del store["w"]
+        self.assertNotIn("w", store)
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"a", W/"b"', ['"b"']))
+        self.assertTrue(etag_matches('*', ['"x"']))
+        self.assertFalse(etag_matches('"a"', ['"b"']))
+        self.assertFalse(etag_matches(None, ['"b"']))
+
+    def test_accepts_gzip(self):
+        self.assertTrue(accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(accepts_gzip("br;q=1.0, *;q=0.5"))
+        self.assertFalse(accepts_gzip("gzip;q=0, *"))
+        self.assertFalse(accepts_gzip("identity"))
+        self.assertFalse(accepts_gzip(None))
+
+
+class TestWidgetEndpoint(unittest.TestCase):
+    def setUp(self):
+        main.widgets_db["large-widget"] = {"html": LARGE_HTML, "status": "active"}
+        self.client = TestClient(main.app)
+
+    def tearDown(self):
+        del main.widgets_db["large-widget"]
+
+    def test_gzip_and_etag(self):
+        response = self.client.get("/widget/large-widget", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.headers["vary"], "Accept-Encoding")
+        self.assertEqual(response.text, LARGE_HTML)
+
+        plain = self.client.get("/widget/large-widget", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", plain.headers)
+        self.assertNotEqual(plain.headers["etag"], response.headers["etag"])
+        self.assertTrue(plain.headers["content-type"].startswith("text/html"))
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get("/widget/large-widget").headers["etag"]
+        response = self.client.get("/widget/large-widget", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["etag"], etag)
+
+    def test_errors_unchanged(self):
+        self.assertEqual(self.client.get("/widget/missing-widget").status_code, 404)
+        self.assertEqual(self.client.get("/widget/bad_key!").status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
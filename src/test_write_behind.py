@@ -0,0 +1,126 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import contextmanager
+from decimal import Decimal
+
+from src.business_logic.dough_calculation import calculate_calculations
+from src.database.models import Calculation, Recipe
+from src.database.write_behind import CalculationWriter, WriteBehindFullError, WriterClosedError
+from src.metrics import MetricsRegistry
+
+SCHEMA = """
+CREATE TABLE calculations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, recipe_id INTEGER, number_of_pizzas INTEGER, pizza_weight REAL,
+    total_flour REAL, total_water REAL, total_salt REAL, total_yeast REAL, total_oil REAL, total_sugar REAL,
+    preferment_flour REAL, preferment_water REAL, preferment_yeast REAL, main_dough_flour REAL,
+    main_dough_water REAL, main_dough_salt REAL, main_dough_yeast REAL, calculated_at TEXT
+)
+"""
+
+sqlite3.register_adapter(Decimal, float)
+
+
+class TestCalculationWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, 'pizza.db')
+        with sqlite3.connect(self.db_path) as connection:
+            connection.execute(SCHEMA)
+        self.connections = 0
+        self.fail_next = 0
+        self.gate = threading.Event()
+        self.gate.set()
+        self.registry = MetricsRegistry()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    @contextmanager
+    def connection_factory(self):
+        self.gate.wait()
+        self.connections += 1
+        if self.fail_next:
+            self.fail_next -= 1
+            raise sqlite3.OperationalError('database is locked')
+        connection = sqlite3.connect(self.db_path)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def writer(self, **options):
+        options.setdefault('flush_interval', 10)
+        return CalculationWriter(self.connection_factory, placeholder='?', registry=self.registry,
+                                 retry_delay=0.001, **options)
+
+    def count(self):
+        with sqlite3.connect(self.db_path) as connection:
+            return connection.execute("SELECT COUNT(*) FROM calculations").fetchone()[0]
+
+    def calculations(self, count):
+        return calculate_calculations([Recipe(id=index) for index in range(count)], 4, 250)
+
+    def test_batches_by_size_and_flushes_on_close(self):
+        writer = self.writer(batch_size=100)
+        writer.submit_many(self.calculations(250))
+        self.assertTrue(writer.flush(timeout=5))
+        writer.submit(Calculation(recipe_id=1))
+        writer.close()
+
+        stats = writer.stats()
+        self.assertEqual((stats.submitted, stats.written, stats.failed), (251, 251, 0))
+        self.assertEqual(stats.flushes, 4)  # 100 + 100 + 50 (flush) + 1 (close)
+        self.assertEqual(self.count(), 251)
+        with sqlite3.connect(self.db_path) as connection:
+            self.assertIsNotNone(connection.execute("SELECT calculated_at FROM calculations").fetchone()[0])
+        with self.assertRaises(WriterClosedError):
+            writer.submit(Calculation())
+
+    def test_flushes_after_interval(self):
+        writer = self.writer(batch_size=1000, flush_interval=0.05)
+        writer.submit_many(self.calculations(3))
+        deadline = time.monotonic() + 5
+        while self.count() < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.count(), 3)
+        self.assertEqual(writer.stats().flushes, 1)
+        writer.close()
+
+    def test_backpressure_when_queue_is_full(self):
+        self.gate.clear()  # Datenbank hängt
+        writer = self.writer(batch_size=1, max_queue=5, put_timeout=0.01)
+        with self.assertRaises(WriteBehindFullError):
+            for calculation in self.calculations(20):
+                writer.submit(calculation)
+        self.assertEqual(writer.stats().rejected, 1)
+        self.assertIn('write_behind_queue_depth{writer="calculations"} 5', self.registry.render())
+
+        self.gate.set()
+        writer.close()
+        self.assertEqual(self.count(), writer.stats().submitted)
+
+    def test_retries_then_drops(self):
+        writer = self.writer(batch_size=10, max_retries=2)
+        self.fail_next = 2
+        writer.submit_many(self.calculations(10))
+        writer.flush(timeout=5)
+        self.assertEqual(self.count(), 10)
+        self.assertEqual(writer.stats().retries, 2)
+
+        self.fail_next = 3
+        writer.submit_many(self.calculations(10))
+        writer.close()
+        stats = writer.stats()
+        self.assertEqual((stats.written, stats.failed), (10, 10))
+        text = self.registry.render()
+        self.assertIn('write_behind_flush_duration_seconds_count{writer="calculations",outcome="error"} 5', text)
+        self.assertIn('write_behind_flush_duration_seconds_count{writer="calculations",outcome="ok"} 1', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Pre-encoded widget bodies for the FastAPI widget endpoint.
+
+Widgets are encoded once when they are stored: the UTF-8 body, a gzip
+variant and a strong ETag per representation. Requests then only pick the
+matching bytes instead of re-encoding the HTML string each time.
+"""
+
+import gzip
+import hashlib
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+# Below this size gzip overhead outweighs the savings
+GZIP_MIN_SIZE = 256
+GZIP_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class EncodedWidget:
+    """Ready-to-send representations of one widget body"""
+    source: str
+    body: bytes
+    etag: str
+    gzip_body: Optional[bytes] = None
+    gzip_etag: Optional[str] = None
+
+    @property
+    def etags(self) -> tuple:
+        return (self.etag, self.gzip_etag) if self.gzip_etag else (self.etag,)
+
+
+def encode_widget(html: str, min_gzip_size: int = GZIP_MIN_SIZE) -> EncodedWidget:
+    """Encode an HTML body and, if worthwhile, its gzip variant"""
+    body = html.encode('utf-8')
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    etag = f'"{digest}"'
+
+    gzip_body = None
+    gzip_etag = None
+    if len(body) >= min_gzip_size:
+        # mtime=0 keeps the compressed bytes deterministic across workers
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(compressed) < len(body):
+            gzip_body = compressed
+            gzip_etag = f'"{digest}-gzip"'
+
+    return EncodedWidget(html, body, etag, gzip_body, gzip_etag)
+
+
+def _parse_tokens(header: str) -> Iterable[str]:
+    for token in header.split(','):
+        token = token.strip()
+        if token:
+            yield token
+
+
+def etag_matches(if_none_match: Optional[str], etags: Iterable[str]) -> bool:
+    """Weak comparison of an If-None-Match header against our ETags (RFC 9110)"""
+    if not if_none_match:
+        return False
+    candidates = set(etags)
+    for token in _parse_tokens(if_none_match):
+        if token == '*':
+            return True
+        if token.startswith('W/'):
+            token = token[2:]
+        if token in candidates:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """True if the Accept-Encoding header allows gzip (explicitly or via *)"""
+    if not accept_encoding:
+        return False
+    wildcard = False
+    for token in _parse_tokens(accept_encoding.lower()):
+        coding, _, params = token.partition(';')
+        coding = coding.strip()
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding in ('gzip', 'x-gzip'):
+            return quality > 0
+        if coding == '*':
+            wildcard = quality > 0
+    return wildcard
+
+
+class WidgetStore(MutableMapping):
+    """
+    Widget records (dicts with "html" and "status") plus their encodings
+
+    Behaves like the plain dict it replaces. Storing a record encodes its
+    body right away; if a record's "html" is replaced in place afterwards,
+    encoded() notices the new string and re-encodes once.
+    """
+
+    def __init__(self, widgets: Optional[Dict[str, Dict[str, Any]]] = None):
+        self._widgets: Dict[str, Dict[str, Any]] = {}
+        self._encoded: Dict[str, EncodedWidget] = {}
+        if widgets:
+            self.update(widgets)
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        return self._widgets[key]
+
+    def __setitem__(self, key: str, widget: Dict[str, Any]) -> None:
+        self._encoded[key] = encode_widget(widget["html"])
+        self._widgets[key] = widget
+
+    def __delitem__(self, key: str) -> None:
+        del self._widgets[key]
+        self._encoded.pop(key, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._widgets)
+
+    def __len__(self) -> int:
+        return len(self._widgets)
+
+    def encoded(self, key: str) -> EncodedWidget:
+        """Pre-encoded representations of a stored widget (KeyError if unknown)"""
+        html = self._widgets[key]["html"]
+        encoded = self._encoded.get(key)
+        if encoded is None or encoded.source is not html:
+            encoded = encode_widget(html)
+            self._encoded[key] = encoded
+        return encoded
+
+    def lookup(self, key: str) -> Optional[Tuple[Dict[str, Any], EncodedWidget]]:
+        """Record and encodings of a widget, or None if unknown"""
+        if key not in self._widgets:
+            return None
+        return self._widgets[key], self.encoded(key)